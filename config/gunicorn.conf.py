@@ -0,0 +1,31 @@
+"""
+Gunicorn hooks; start.sh passes -c config/gunicorn.conf.py.
+
+With --preload (start.sh does so under FAST_BOOT) the master loads Django
+once and warms it (core.startup.warm) before forking the workers, which
+start ready to answer. Without it each worker warms itself before taking
+requests. A failed warm-up (say, the database is still starting) is
+logged and the server starts anyway: everything it fills is filled on
+demand too.
+"""
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        _warm(server.log)
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        _warm(worker.log)
+
+
+def _warm(log):
+    from core.startup import warm
+
+    try:
+        timings = warm()
+    except Exception:
+        log.exception('Warm-up failed')
+        return
+    log.info('Warmed up: %s', ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in timings.items()))
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.models import User, Group
-from .models import AuditLog
+from .models import AuditLog, AuditLogArchive
 
 
 @admin.register(AuditLog)
@@ -16,3 +16,11 @@ class AuditLogAdmin(admin.ModelAdmin):
     
     def has_change_permission(self, request, obj=None):
         return False
+
+
+@admin.register(AuditLogArchive)
+class AuditLogArchiveAdmin(AuditLogAdmin):
+    search_fields = ['model', 'record_id']
+
+    def has_delete_permission(self, request, obj=None):
+        return False
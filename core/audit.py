@@ -0,0 +1,290 @@
+"""
+Audit trail capture.
+
+Model saves and deletes in AUDITED_APPS, and logins/logouts, become
+AuditLog rows. Capturing is cheap and never writes synchronously:
+
+  * Entries are built in the signal handler and queued with
+    transaction.on_commit, so rolled-back work is never logged. Updates
+    carry a field-level diff against the row the instance was loaded
+    from, which a from_db hook keeps by reference, so neither reads nor
+    saves pay an extra query or copy.
+  * Queued entries sit in an in-process buffer that a daemon thread
+    writes with one bulk_create every AUDIT_FLUSH_INTERVAL seconds, or
+    as soon as a finished request leaves AUDIT_BATCH_SIZE entries queued.
+  * Whatever is left is flushed at interpreter exit.
+
+The acting user and client IP come from the request that
+AuditContextMiddleware stores in a context variable; entries recorded
+outside a request (management commands, cron jobs) have neither.
+"""
+import atexit
+import logging
+import os
+import threading
+from contextvars import ContextVar
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from uuid import UUID
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.core.signals import request_finished
+from django.db import connection, transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+logger = logging.getLogger('core.audit')
+
+AUDITED_APPS = ('sales', 'expenses', 'inventory', 'flock', 'customers')
+
+# Derived tables maintained by signals or jobs; auditing them would only
+# repeat the change that caused them.
+EXCLUDED_MODELS = {
+    'expenses.CategoryMonthSpend',
+    'flock.FlockDailyPopulation',
+    'flock.FlockLayRateState',
+    'flock.LayRateAlert',
+}
+
+current_request = ContextVar('audit_request', default=None)
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (date, time, Decimal, UUID)):
+        return str(value)
+    if isinstance(value, (list, dict)):
+        return value
+    return str(value)
+
+
+@lru_cache(maxsize=None)
+def _audited_fields(model):
+    """Concrete fields worth diffing: auto_now timestamps change on every save."""
+    return tuple(
+        field for field in model._meta.concrete_fields
+        if not getattr(field, 'auto_now', False)
+    )
+
+
+@lru_cache(maxsize=None)
+def _attnames(model):
+    return tuple(field.attname for field in _audited_fields(model))
+
+
+def _values(instance, fields):
+    return {field.attname: _json_value(field.value_from_object(instance)) for field in fields}
+
+
+def client_ip(request):
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if forwarded:
+        return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR') or None
+
+
+class AuditBuffer:
+    """Thread-safe queue of unsaved AuditLog rows with a background writer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+        self._ensure_writer()
+
+    def wake(self):
+        """Ask the writer to flush now instead of waiting for the interval."""
+        self._wake.set()
+
+    def flush(self):
+        """Write every queued entry. Returns the number written."""
+        from .models import AuditLog
+
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if not entries:
+            return 0
+        try:
+            AuditLog.objects.bulk_create(entries, batch_size=500)
+        except Exception:
+            logger.exception('Dropped %d audit log entries', len(entries))
+            return 0
+        return len(entries)
+
+    def _after_fork_in_child(self):
+        # The parent's entries are still queued (and written) in the
+        # parent; a copy here would be written again by every worker
+        # forked from it (gunicorn --preload). The lock may have been held
+        # by another parent thread at fork time.
+        self._lock = threading.Lock()
+        self._entries = []
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_writer(self):
+        # Threads do not survive fork(), so each worker process starts its own.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(settings.AUDIT_FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+
+buffer = AuditBuffer()
+os.register_at_fork(after_in_child=buffer._after_fork_in_child)
+
+
+def record(action, model, record_id, details=None, user=None, request=None):
+    """Queue one AuditLog entry once the current transaction commits."""
+    from .models import AuditLog
+
+    request = request if request is not None else current_request.get()
+    if user is None and request is not None:
+        request_user = getattr(request, 'user', None)
+        if request_user is not None and request_user.is_authenticated:
+            user = request_user
+    entry = AuditLog(
+        user_id=user.pk if user is not None else None,
+        action=action,
+        model=model,
+        record_id=record_id,
+        timestamp=timezone.now(),
+        details=details or {},
+        ip_address=client_ip(request) if request is not None else None,
+    )
+    transaction.on_commit(lambda: buffer.add(entry))
+
+
+# ─── MODEL SIGNALS ──────────────────────────────────────────────────────
+
+def _keep_loaded_row(model):
+    """
+    Wrap model.from_db so every instance read keeps (attnames, values) of
+    the row it came from: two references, where a post_init receiver
+    would run for every instance constructed and copy its values.
+    """
+    from_db = model.from_db.__func__
+    if getattr(from_db, 'keeps_audit_row', False):
+        return  # Inherited from an audited parent.
+
+    def audited_from_db(cls, db, field_names, values):
+        instance = from_db(cls, db, field_names, values)
+        instance._audit_loaded = (field_names, values)
+        return instance
+
+    audited_from_db.keeps_audit_row = True
+    model.from_db = classmethod(audited_from_db)
+
+
+def _snapshot(model, instance):
+    # The values just saved, in the same shape, for diffing the next save.
+    attnames = _attnames(model)
+    loaded = instance.__dict__
+    instance._audit_loaded = (attnames, tuple(loaded.get(attname, DEFERRED) for attname in attnames))
+
+
+def _record_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    fields = _audited_fields(sender)
+    previous = instance.__dict__.get('_audit_loaded')
+    _snapshot(sender, instance)
+    if created:
+        record('create', sender._meta.object_name, instance.pk, {'values': _values(instance, fields)})
+        return
+    if not previous:
+        return
+    previous = dict(zip(*previous))
+    changes = {}
+    for field in fields:
+        old = previous.get(field.attname, DEFERRED)
+        if old is DEFERRED:
+            continue
+        if update_fields is not None and field.name not in update_fields and field.attname not in update_fields:
+            continue
+        new = field.value_from_object(instance)
+        if old != new:
+            changes[field.attname] = [_json_value(old), _json_value(new)]
+    if changes:
+        record('update', sender._meta.object_name, instance.pk, {'changes': changes})
+
+
+def _record_delete(sender, instance, **kwargs):
+    record('delete', sender._meta.object_name, instance.pk,
+           {'values': _values(instance, _audited_fields(sender))})
+
+
+# ─── AUTH SIGNALS ───────────────────────────────────────────────────────
+
+def _record_auth(action, request, user):
+    if user is None:
+        return
+    # The knox LoginView calls django.contrib.auth.login() and then sends
+    # user_logged_in itself; log each login or logout once per request.
+    marker = getattr(request, '_request', request)
+    if marker is not None:
+        seen = marker.__dict__.setdefault('_audit_auth_recorded', set())
+        if action in seen:
+            return
+        seen.add(action)
+    record(action, user._meta.object_name, user.pk, {'username': user.get_username()},
+           user=user, request=marker)
+
+
+def _record_login(sender, request, user, **kwargs):
+    _record_auth('login', request, user)
+
+
+def _record_logout(sender, request, user, **kwargs):
+    _record_auth('logout', request, user)
+
+
+def _request_finished(sender, **kwargs):
+    if len(buffer) >= settings.AUDIT_BATCH_SIZE:
+        buffer.wake()
+
+
+def connect():
+    """Hook the audit receivers up; called from CoreConfig.ready()."""
+    if not settings.AUDIT_LOG_ENABLED:
+        return
+    for model in apps.get_models():
+        if model._meta.app_label not in AUDITED_APPS or model._meta.label in EXCLUDED_MODELS:
+            continue
+        uid = f'core.audit:{model._meta.label}'
+        _keep_loaded_row(model)
+        post_save.connect(_record_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(_record_delete, sender=model, dispatch_uid=uid)
+    user_logged_in.connect(_record_login, dispatch_uid='core.audit:login')
+    user_logged_out.connect(_record_logout, dispatch_uid='core.audit:logout')
+    request_finished.connect(_request_finished, dispatch_uid='core.audit:request_finished')
+    atexit.register(buffer.flush)
@@ -0,0 +1,107 @@
+"""
+Audit log archival.
+
+Live AuditLog rows older than AUDIT_LOG_ARCHIVE_AFTER_DAYS are moved in
+batches to AuditLogArchive, keeping the table the API and admin query
+small. On PostgreSQL the archive is range-partitioned by calendar month
+(UTC) of ``timestamp``: partitions are created ahead of each move and a
+retention prune drops whole expired months instead of deleting rows.
+Other databases use a plain archive table and batched deletes.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+from .models import AuditLog, AuditLogArchive
+
+ARCHIVE_TABLE = 'core_auditlogarchive'
+
+ARCHIVED_FIELDS = ('id', 'user_id', 'action', 'model', 'record_id', 'timestamp', 'details', 'ip_address')
+
+
+def partitioned():
+    return connection.vendor == 'postgresql'
+
+
+def _month_start(moment):
+    moment = moment.astimezone(dt_timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _next_month(month):
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+
+def partition_name(month):
+    return f'{ARCHIVE_TABLE}_y{month.year}m{month.month:02d}'
+
+
+def ensure_partitions(first, last):
+    """Create the monthly partitions covering [first, last] (PostgreSQL only)."""
+    if not partitioned():
+        return
+    month, last = _month_start(first), _month_start(last)
+    with connection.cursor() as cursor:
+        while month <= last:
+            # DDL takes no bind parameters; the bounds are generated here.
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {ARCHIVE_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            )
+            month = _next_month(month)
+
+
+def drop_expired_partitions(cutoff):
+    """
+    Drop monthly partitions that end on or before `cutoff`. Returns their
+    names. Rows in the month containing the cutoff are left for a delete.
+    """
+    if not partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s AND child.relname LIKE %s
+            """,
+            [ARCHIVE_TABLE, f'{ARCHIVE_TABLE}_y%'],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+        dropped = []
+        for name in sorted(names):
+            year, month = int(name[-7:-3]), int(name[-2:])
+            end = _next_month(datetime(year, month, 1, tzinfo=dt_timezone.utc))
+            if end <= cutoff:
+                cursor.execute(f'DROP TABLE {name}')
+                dropped.append(name)
+    return dropped
+
+
+def archive_before(cutoff, batch_size=5000):
+    """Move AuditLog rows older than `cutoff` into the archive. Returns rows moved."""
+    expired = AuditLog.objects.filter(timestamp__lt=cutoff).order_by('timestamp', 'id')
+    moved = 0
+    while True:
+        rows = list(expired.values(*ARCHIVED_FIELDS)[:batch_size])
+        if not rows:
+            return moved
+        ensure_partitions(rows[0]['timestamp'], rows[-1]['timestamp'])
+        with transaction.atomic():
+            AuditLogArchive.objects.bulk_create(
+                [AuditLogArchive(**row) for row in rows], batch_size=1000, ignore_conflicts=True,
+            )
+            AuditLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+
+
+def delete_in_batches(queryset, batch_size=5000):
+    """Delete the rows of `queryset` in primary-key batches. Returns rows deleted."""
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += queryset.model.objects.filter(id__in=ids).delete()[0]
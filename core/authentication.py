@@ -0,0 +1,106 @@
+"""
+Knox token authentication with a per-process token cache.
+
+knox.auth.TokenAuthentication costs a token lookup, a user fetch and a
+scan of the user's other tokens on every request, plus an expiry write
+whenever AUTO_REFRESH moves the expiry by more than a minute.
+CachedTokenAuthentication keeps validated tokens (with their user) in
+the 'auth_tokens' cache, keyed by token digest. A cache hit costs one
+primary-key query checking that the token row still exists and its user
+is active, and expiry is renewed at most once per
+AUTH_TOKEN_REFRESH_INTERVAL per token.
+
+That check is what makes logout, logoutall and deactivation take effect
+at once in every worker, even with the per-process LocMemCache and for
+queryset updates that send no signals. Entries are also dropped when the
+token is deleted or its user saved in this process (core/signals.py), so
+other changes to a user reach this process's cache immediately and other
+workers' caches within AUTH_TOKEN_CACHE_TTL seconds.
+"""
+import binascii
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from knox.auth import TokenAuthentication
+from knox.crypto import hash_token
+from knox.models import get_token_model
+from knox.settings import knox_settings
+from rest_framework import exceptions
+
+CACHE_ALIAS = 'auth_tokens'
+
+
+def _token_key(digest):
+    return f'knox:token:{digest}'
+
+
+def _user_key(user_id):
+    return f'knox:user:{user_id}'
+
+
+def token_cache():
+    return caches[CACHE_ALIAS]
+
+
+def remember(auth_token, refreshed_at):
+    """Cache a validated token until the earlier of its expiry and the cache TTL."""
+    timeout = settings.AUTH_TOKEN_CACHE_TTL
+    if auth_token.expiry is not None:
+        timeout = min(timeout, (auth_token.expiry - timezone.now()).total_seconds())
+        if timeout <= 0:
+            return
+    cache = token_cache()
+    cache.set(_token_key(auth_token.digest), (auth_token, refreshed_at), timeout)
+    # Index the user's cached digests so a user change can drop them all.
+    digests = cache.get(_user_key(auth_token.user_id)) or set()
+    digests.add(auth_token.digest)
+    cache.set(_user_key(auth_token.user_id), digests, settings.AUTH_TOKEN_CACHE_TTL)
+
+
+def forget(digest):
+    token_cache().delete(_token_key(digest))
+
+
+def forget_user(user_id):
+    cache = token_cache()
+    digests = cache.get(_user_key(user_id)) or ()
+    cache.delete_many([_token_key(digest) for digest in digests] + [_user_key(user_id)])
+
+
+def revoked(digest):
+    """True if the token was deleted or its user deactivated since it was cached."""
+    return not get_token_model().objects.filter(digest=digest, user__is_active=True).exists()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Drop-in replacement for knox.auth.TokenAuthentication."""
+
+    def authenticate_credentials(self, token):
+        try:
+            digest = hash_token(token.decode('utf-8'))
+        except (TypeError, binascii.Error, UnicodeDecodeError):
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        now = timezone.now()
+        cached = token_cache().get(_token_key(digest))
+        if cached is not None:
+            auth_token, refreshed_at = cached
+            if revoked(digest):
+                # Let knox report why (invalid token or inactive user).
+                forget(digest)
+            elif auth_token.expiry is None or auth_token.expiry > now:
+                refresh_every = timedelta(seconds=settings.AUTH_TOKEN_REFRESH_INTERVAL)
+                if knox_settings.AUTO_REFRESH and auth_token.expiry and now - refreshed_at >= refresh_every:
+                    self.renew_token(auth_token)
+                    remember(auth_token, now)
+                return self.validate_user(auth_token)
+            else:
+                # Expired: let knox delete it and report the failure.
+                forget(digest)
+
+        user, auth_token = super().authenticate_credentials(token)
+        remember(auth_token, now)
+        return user, auth_token
@@ -0,0 +1,329 @@
+"""
+Endpoint benchmark harness.
+
+Seeds a fixed synthetic dataset (see generate_farm_data), runs every
+case below through the full Django/DRF stack and records wall time,
+query count and peak Python memory. Results are compared against the
+committed baseline (core/benchmark_baseline.json):
+
+  * status and query count are hard budgets: the query count may never
+    exceed the baseline's (core/tests.py asserts the same)
+  * wall time and peak memory depend on the machine and its load, so
+    they are only reported when above baseline × (1 + tolerance)
+
+Throughput mode (``--concurrency``) instead fires read-only cases from
+several client threads at once, outside any transaction, once with
+report queries run sequentially and once through core.concurrency's
+thread pool, and reports requests per second and median latency.
+
+Used by ``manage.py benchmark_endpoints``.
+"""
+import json
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+BASELINE_PATH = Path(settings.BASE_DIR) / 'core' / 'benchmark_baseline.json'
+
+# The seeded dataset: one quarter of activity ending on DATASET_END.
+DATASET = {
+    'years': 0.25,
+    'end_date': '2026-03-31',
+    'scale': 0.2,
+    'flocks': 3,
+    'customers': 15,
+    'seed': 20260331,
+}
+RANGE = {'start_date': '2026-01-01', 'end_date': '2026-03-31'}
+DAY = {'date': '2026-03-15'}
+
+# Time differences below this many ms are treated as noise.
+TIME_SLACK_MS = 5.0
+MEMORY_SLACK_KIB = 256
+
+
+@dataclass
+class Case:
+    name: str
+    method: str
+    url: str
+    params: dict = field(default_factory=dict)
+    payload: dict = None
+
+
+def default_cases():
+    cases = [
+        Case('reports.dashboard_summary', 'get', '/api/reports/dashboard-summary/', DAY),
+        Case('reports.sales_trend', 'get', '/api/reports/sales-trend/',
+             {'start': RANGE['start_date'], 'end': RANGE['end_date'], 'include': 'crates,expenses'}),
+        Case('reports.sales_trend_monthly', 'get', '/api/reports/sales-trend/',
+             {'start': '2024-01-01', 'end': RANGE['end_date'], 'granularity': 'month'}),
+        Case('reports.sales_report', 'get', '/api/reports/sales-report/', RANGE),
+        Case('reports.profit_loss', 'get', '/api/reports/profit-loss/', RANGE),
+        Case('reports.inventory_status', 'get', '/api/reports/inventory-status/'),
+        Case('reports.expenses_report', 'get', '/api/reports/expenses-report/', RANGE),
+        Case('reports.customer_report', 'get', '/api/reports/customer-report/', RANGE),
+        Case('reports.customer_report_summary', 'get', '/api/reports/customer-report/',
+             {**RANGE, 'mode': 'summary'}),
+        Case('reports.customer_report_drilldown', 'get', '/api/reports/customer-report/',
+             {**RANGE, 'customer_id': '{customer_id}'}),
+        Case('reports.customer_report_stream', 'get', '/api/reports/customer-report/',
+             {**RANGE, 'stream': '1'}),
+        Case('reports.expenses_report_stream', 'get', '/api/reports/expenses-report/',
+             {**RANGE, 'stream': '1'}),
+        Case('reports.production_analytics', 'get', '/api/reports/production-analytics/',
+             {**RANGE, 'granularity': 'week'}),
+        Case('reports.expenses_report_excel', 'get', '/api/reports/expenses-report/excel/', RANGE),
+        Case('reports.sales_report_excel', 'get', '/api/reports/sales-report/excel/', RANGE),
+        Case('reports.profit_loss_excel', 'get', '/api/reports/profit-loss/excel/', RANGE),
+        Case('reports.customer_report_excel', 'get', '/api/reports/customer-report/excel/', RANGE),
+        Case('reports.receivables_aging', 'get', '/api/reports/receivables-aging/', {'as_of': RANGE['end_date']}),
+        Case('reports.receivables_aging_excel', 'get', '/api/reports/receivables-aging/excel/',
+             {'as_of': RANGE['end_date']}),
+        Case('sales.list', 'get', '/api/sales/sales/', {'customer': '{customer_id}'}),
+        Case('sales.create', 'post', '/api/sales/sales/', payload={
+            'sale_type': 'wholesale',
+            'customer_id': '{customer_id}',
+            'sale_datetime': '2026-03-31T10:00:00Z',
+            'amount_paid': '100.00',
+            'items': [
+                {'egg_type_id': '{egg_type_id}', 'quantity': 12},
+                {'egg_type_id': '{egg_type_id}', 'quantity': 3, 'price_per_crate': '40.00'},
+            ],
+        }),
+        Case('credit_payments.create', 'post', '/api/sales/credit-payments/', payload={
+            'customer': '{customer_id}',
+            'amount_paid': '250.00',
+            'payment_date': '2026-03-31T12:00:00Z',
+        }),
+        Case('expenses.budget_status', 'get', '/api/expenses/budgets/status/', {'month': '2026-03'}),
+        Case('flock.list', 'get', '/api/flock/flocks/'),
+        Case('flock.summary', 'get', '/api/flock/flocks/{flock_id}/summary/'),
+        Case('inventory.current_prices', 'get', '/api/inventory/price-tiers/current-prices/',
+             {'sale_type': 'wholesale'}),
+    ]
+    return cases
+
+
+def seed_dataset(stdout=None):
+    """Populate the (empty) current database with the benchmark dataset."""
+    kwargs = {key.replace('_', '-'): value for key, value in DATASET.items()}
+    call_command(
+        'generate_farm_data',
+        *[f'--{key}={value}' for key, value in kwargs.items()],
+        stdout=stdout,
+    )
+    # Analytics read precomputed rollups; build them as a deployment would.
+    call_command(
+        'refresh_report_rollups',
+        f"--start-date={RANGE['start_date']}", f"--end-date={RANGE['end_date']}",
+        stdout=stdout,
+    )
+
+
+def _lookups():
+    from customers.models import WholesaleCustomer
+    from flock.models import Flock
+    from inventory.models import EggType
+
+    return {
+        'customer_id': WholesaleCustomer.objects.order_by('name').values_list('id', flat=True).first(),
+        'flock_id': Flock.objects.order_by('name').values_list('id', flat=True).first(),
+        'egg_type_id': EggType.objects.filter(name='Medium').values_list('id', flat=True).first(),
+    }
+
+
+def _fill(value, lookups):
+    if isinstance(value, str):
+        return value.format(**lookups)
+    if isinstance(value, dict):
+        return {k: _fill(v, lookups) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, lookups) for v in value]
+    return value
+
+
+def _request(client, case, lookups):
+    url = _fill(case.url, lookups)
+    if case.method == 'get':
+        response = client.get(url, _fill(case.params, lookups))
+    else:
+        response = client.post(url, _fill(case.payload, lookups), format='json')
+    # Drain streaming bodies so their work is measured too.
+    if getattr(response, 'streaming', False):
+        for _ in response.streaming_content:
+            pass
+    else:
+        response.content
+    return response
+
+
+def _request_and_commit_work(client, case, lookups):
+    """
+    _request() plus the work it defers to commit: its on_commit callbacks
+    and the audit rows they queue, which the background writer would
+    otherwise insert later. All of it runs in the caller's transaction.
+    """
+    from django.test import TestCase
+
+    from . import audit
+
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        response = _request(client, case, lookups)
+    audit.buffer.flush()
+    return response
+
+
+def run_case(client, case, lookups, repeat=5):
+    """
+    Measure one case, including the work it defers to commit. Writes
+    happen inside a rolled-back transaction so every repetition (and
+    every run) sees the same dataset.
+    """
+    timings = []
+    for _ in range(repeat):
+        with transaction.atomic():
+            start = time.perf_counter()
+            response = _request_and_commit_work(client, case, lookups)
+            timings.append((time.perf_counter() - start) * 1000)
+            transaction.set_rollback(True)
+
+    with transaction.atomic():
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        with CaptureQueriesContext(connection) as ctx:
+            response = _request_and_commit_work(client, case, lookups)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        transaction.set_rollback(True)
+
+    return {
+        'status': response.status_code,
+        'wall_ms': round(min(timings), 2),
+        'queries': len(ctx.captured_queries),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(cases=None, repeat=5, only=None):
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIClient
+
+    user, _ = User.objects.get_or_create(username='benchmark', defaults={'is_staff': True})
+    client = APIClient()
+    client.force_authenticate(user)
+    lookups = _lookups()
+
+    results = {}
+    for case in cases or default_cases():
+        if only and not any(pattern in case.name for pattern in only):
+            continue
+        results[case.name] = run_case(client, case, lookups, repeat=repeat)
+    return results
+
+
+def _throughput(user, case, lookups, concurrency, requests):
+    from rest_framework.test import APIClient
+
+    latencies, lock = [], threading.Lock()
+    per_thread = max(1, requests // concurrency)
+
+    def client_thread():
+        client = APIClient()
+        client.force_authenticate(user)
+        try:
+            for _ in range(per_thread):
+                start = time.perf_counter()
+                _request(client, case, lookups)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(elapsed)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=client_thread) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2], 2) if latencies else None,
+    }
+
+
+def run_throughput(concurrency=4, requests=40, only=None, query_threads=4):
+    """
+    {case: {'sequential': {...}, 'pooled': {...}}} for the GET cases, with
+    REPORT_QUERY_THREADS forced to 0 and to `query_threads` respectively.
+    """
+    from django.contrib.auth.models import User
+    from django.test.utils import override_settings
+
+    user, _ = User.objects.get_or_create(username='benchmark', defaults={'is_staff': True})
+    lookups = _lookups()
+    results = {}
+    for case in default_cases():
+        if case.method != 'get' or (only and not any(pattern in case.name for pattern in only)):
+            continue
+        results[case.name] = {}
+        for label, threads in (('sequential', 0), ('pooled', query_threads)):
+            with override_settings(REPORT_QUERY_THREADS=threads):
+                results[case.name][label] = _throughput(user, case, lookups, concurrency, requests)
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not Path(path).exists():
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    data = {'dataset': DATASET, 'database': connection.vendor, 'cases': results}
+    with open(path, 'w') as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+
+
+def compare(results, baseline):
+    """Return a list of human-readable status and query budget regressions."""
+    regressions = []
+    base_cases = (baseline or {}).get('cases', {})
+    for name, result in results.items():
+        base = base_cases.get(name)
+        if base is None:
+            continue
+        if result['status'] != base['status']:
+            regressions.append(f"{name}: HTTP {result['status']} (baseline {base['status']})")
+        if result['queries'] > base['queries']:
+            regressions.append(f"{name}: {result['queries']} queries (budget {base['queries']})")
+    return regressions
+
+
+def drift(results, baseline, time_tolerance=1.0, memory_tolerance=0.5):
+    """Return messages for wall time and peak memory above the baseline's tolerance."""
+    notes = []
+    base_cases = (baseline or {}).get('cases', {})
+    for name, result in results.items():
+        base = base_cases.get(name)
+        if base is None:
+            continue
+        time_limit = max(base['wall_ms'] * (1 + time_tolerance), base['wall_ms'] + TIME_SLACK_MS)
+        if result['wall_ms'] > time_limit:
+            notes.append(f"{name}: {result['wall_ms']} ms (baseline {base['wall_ms']} ms)")
+        memory_limit = max(base['peak_kib'] * (1 + memory_tolerance), base['peak_kib'] + MEMORY_SLACK_KIB)
+        if result['peak_kib'] > memory_limit:
+            notes.append(f"{name}: peak {result['peak_kib']} KiB (baseline {base['peak_kib']} KiB)")
+    return notes
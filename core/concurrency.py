@@ -0,0 +1,77 @@
+"""
+Run independent ORM reads of one request concurrently.
+
+Django connections are per thread, so each pooled call runs on the worker
+thread's own connection. The call sees the caller's context variables
+(e.g. the audit request) and execute_wrappers (e.g. the per-request query
+recorder), and its connection is recycled afterwards the same way a
+request's would be (CONN_MAX_AGE, health checks).
+
+A transaction is invisible to other connections, so callers inside an
+atomic block (tests, the benchmark harness, ATOMIC_REQUESTS) run the
+calls sequentially on their own connection instead. So does
+REPORT_QUERY_THREADS=0, the default; see config/settings.py before
+raising it.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.REPORT_QUERY_THREADS, thread_name_prefix='report-query',
+                )
+    return _executor
+
+
+def _in_transaction():
+    return any(connections[alias].in_atomic_block for alias in connections)
+
+
+def _run_pooled(call, wrappers):
+    close_old_connections()
+    try:
+        with ExitStack() as stack:
+            for alias, alias_wrappers in wrappers.items():
+                for wrapper in alias_wrappers:
+                    stack.enter_context(connections[alias].execute_wrapper(wrapper))
+            return call()
+    finally:
+        close_old_connections()
+
+
+def run_concurrently(*calls):
+    """
+    Call each zero-argument callable and return their results in order.
+    An exception from any call is re-raised once all have finished.
+    """
+    if len(calls) < 2 or settings.REPORT_QUERY_THREADS < 2 or _in_transaction():
+        return [call() for call in calls]
+
+    wrappers = {
+        alias: list(connections[alias].execute_wrappers)
+        for alias in connections
+        if connections[alias].execute_wrappers
+    }
+    executor = _get_executor()
+    futures = [
+        executor.submit(contextvars.copy_context().run, _run_pooled, call, wrappers)
+        for call in calls
+    ]
+    errors = [future.exception() for future in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [future.result() for future in futures]
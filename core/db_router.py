@@ -0,0 +1,149 @@
+"""
+Read-replica routing.
+
+With DATABASE_REPLICA_URL set, settings add a 'replica' database and
+install ReplicaRouter. Reads go to the replica only where they were
+opted in:
+
+  * views with ReplicaReadMixin: safe-method requests for the actions in
+    `replica_actions` (every ReportViewSet action, list() elsewhere),
+    including a streamed response body;
+  * code inside ``with replica_reads():`` (export jobs).
+
+Everything else reads from 'default', and every write goes there.
+
+Stick to primary: once a write is routed during a request (or inside a
+replica_reads() block), the rest of it reads from 'default' too, so it
+sees its own writes whatever the replica lag; stick_to_primary() does the
+same ahead of a write. Writes made before reads were opted in, such as
+knox refreshing the token's expiry during authentication, don't count.
+
+Locally, copy the SQLite database file and point DATABASE_REPLICA_URL at
+the copy: rows written after the copy show up in primary-only reads.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.permissions import SAFE_METHODS
+
+DEFAULT = 'default'
+REPLICA = 'replica'
+
+
+class RoutingState:
+    """Replica routing for one request or replica_reads() block."""
+
+    def __init__(self, replica=False):
+        self.replica = replica
+        self.wrote = False
+
+
+# Shared by reference with run_concurrently()'s copied contexts, so a
+# write in a pooled call still pins the request to the primary.
+_state = ContextVar('db_routing_state', default=None)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def replica_reads():
+    """Route reads in the block to the replica until the block writes."""
+    token = _state.set(RoutingState(replica=True))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def stick_to_primary():
+    """
+    Read from the primary for the rest of the current request (or
+    replica_reads() block), as after a write. For code whose reads decide
+    what it writes, e.g. refreshing derived tables.
+    """
+    state = _state.get()
+    if state is not None:
+        state.wrote = True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is not None and state.replica and not state.wrote:
+            return REPLICA
+        # Explicit, so instances loaded from the replica don't pull their
+        # relations from it outside an opted-in block.
+        return DEFAULT
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication.
+        return db != REPLICA
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Gives each request its own RoutingState (replica reads off until a
+    ReplicaReadMixin view turns them on) and keeps it in force while a
+    streaming response body is produced.
+    """
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if response.streaming and state.replica:
+            response.streaming_content = _with_state(response.streaming_content, state)
+        return response
+
+
+def _with_state(content, state):
+    # Set per chunk: the body is produced after __call__ has reset the state.
+    iterator = iter(content)
+    while True:
+        token = _state.set(state)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _state.reset(token)
+        yield chunk
+
+
+class ReplicaReadMixin:
+    """
+    ViewSet mixin: serve safe-method requests for `replica_actions`
+    ('__all__' for every action) from the read replica.
+    """
+    replica_actions = ('list',)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        state = _state.get()
+        if state is None or request.method not in SAFE_METHODS:
+            return
+        if self.replica_actions == '__all__' or self.action in self.replica_actions:
+            state.replica = True
+            state.wrote = False
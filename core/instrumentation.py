@@ -0,0 +1,100 @@
+"""
+Per-request query instrumentation.
+
+QueryRecorder is installed with ``connection.execute_wrapper`` for the
+duration of a request and records query count, DB time and the slowest
+statements. RouteMetrics keeps a bounded sample window per route so the
+metrics endpoint can report latency percentiles without a database.
+"""
+import heapq
+import threading
+import time
+from collections import defaultdict, deque
+
+
+class QueryRecorder:
+    """execute_wrapper callable that times every statement it sees."""
+
+    def __init__(self, keep_slowest=5):
+        self.keep_slowest = keep_slowest
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self._slowest = []  # min-heap of (duration_ms, seq, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            # Also called from core.concurrency worker threads.
+            with self._lock:
+                self.count += 1
+                self.total_ms += duration_ms
+                entry = (duration_ms, self.count, sql)
+                if len(self._slowest) < self.keep_slowest:
+                    heapq.heappush(self._slowest, entry)
+                else:
+                    heapq.heappushpop(self._slowest, entry)
+
+    @property
+    def slowest(self):
+        """Slowest statements first, as (duration_ms, sql) pairs."""
+        return [(round(d, 2), sql) for d, _, sql in sorted(self._slowest, reverse=True)]
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class RouteMetrics:
+    """Thread-safe, bounded in-memory samples per route."""
+
+    def __init__(self, max_samples=1000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._requests = defaultdict(int)
+
+    def record(self, route, total_ms, db_ms, queries):
+        with self._lock:
+            self._samples[route].append((total_ms, db_ms, queries))
+            self._requests[route] += 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._requests.clear()
+
+    def snapshot(self):
+        """Percentile summary per route, slowest p95 first."""
+        with self._lock:
+            data = {route: list(samples) for route, samples in self._samples.items()}
+            requests = dict(self._requests)
+
+        routes = []
+        for route, samples in data.items():
+            totals = sorted(s[0] for s in samples)
+            db_times = sorted(s[1] for s in samples)
+            queries = sorted(s[2] for s in samples)
+            routes.append({
+                'route': route,
+                'requests': requests.get(route, 0),
+                'samples': len(samples),
+                'total_ms': {p: round(_percentile(totals, n), 2) for p, n in (('p50', 50), ('p95', 95), ('p99', 99))},
+                'db_ms': {p: round(_percentile(db_times, n), 2) for p, n in (('p50', 50), ('p95', 95), ('p99', 99))},
+                'queries': {
+                    'p50': _percentile(queries, 50),
+                    'p95': _percentile(queries, 95),
+                    'max': queries[-1] if queries else 0,
+                },
+            })
+        routes.sort(key=lambda r: r['total_ms']['p95'], reverse=True)
+        return routes
+
+
+route_metrics = RouteMetrics()
@@ -0,0 +1,34 @@
+"""
+Move old audit log entries from the live table into the archive.
+
+Keeps AuditLog small for the API and admin; archived entries stay
+queryable with ?archived=true until prune_audit_logs expires them.
+Schedule daily, before prune_audit_logs:
+
+    python manage.py archive_audit_logs                # AUDIT_LOG_ARCHIVE_AFTER_DAYS
+    python manage.py archive_audit_logs --days 30
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.audit_archive import archive_before
+
+
+class Command(BaseCommand):
+    help = 'Move audit log entries older than N days into the archive table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Keep this many days live (default: AUDIT_LOG_ARCHIVE_AFTER_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.AUDIT_LOG_ARCHIVE_AFTER_DAYS
+        if days < 1:
+            raise CommandError('--days must be at least 1')
+        cutoff = timezone.now() - timedelta(days=days)
+        moved = archive_before(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(f'Archived {moved} audit log entries older than {cutoff:%Y-%m-%d}.')
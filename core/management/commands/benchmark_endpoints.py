@@ -0,0 +1,131 @@
+"""
+Benchmark API endpoints against a seeded dataset and the committed baseline.
+
+    python manage.py benchmark_endpoints                 # fails on a status or query-budget regression
+    python manage.py benchmark_endpoints --only reports. --repeat 5
+    python manage.py benchmark_endpoints --update-baseline
+    python manage.py benchmark_endpoints --only reports.dashboard --concurrency 8
+
+The dataset is loaded into a throw-away test database (SQLite in-memory
+or test_<NAME> on Postgres), never into the configured one.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import audit, benchmark
+
+
+class Command(BaseCommand):
+    help = 'Measure wall time, query count and peak memory per endpoint and compare with the baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions per case (fastest is kept).')
+        parser.add_argument('--only', action='append', help='Run cases whose name contains this text. Repeatable.')
+        parser.add_argument('--update-baseline', action='store_true', help='Write results as the new baseline.')
+        parser.add_argument('--time-tolerance', type=float, default=1.0,
+                            help='Relative wall-time increase reported as a warning (default: 1.0 = 2x).')
+        parser.add_argument('--memory-tolerance', type=float, default=0.5,
+                            help='Relative peak-memory increase reported as a warning (default: 0.5).')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse/keep the benchmark test database.')
+        parser.add_argument('--concurrency', type=int,
+                            help='Measure throughput of GET cases with this many concurrent clients instead.')
+        parser.add_argument('--requests', type=int, default=40,
+                            help='Requests per case in throughput mode (default: 40).')
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        verbosity = options['verbosity']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=verbosity, autoclobber=True,
+                                           keepdb=options['keepdb'], serialize=False)
+        # Aliases mirroring the default one (the read replica) read the
+        # benchmark database too, on every thread.
+        mirrors = {
+            alias: connections.settings[alias] for alias in connections
+            if connections.settings[alias]['TEST'].get('MIRROR') == connection.alias
+        }
+        for alias in mirrors:
+            connections.settings[alias] = connection.settings_dict
+            connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+        try:
+            from sales.models import Sale
+            if not Sale.objects.exists():
+                self.stdout.write('Seeding benchmark dataset…')
+                benchmark.seed_dataset(stdout=self.stdout if verbosity > 1 else None)
+            if options['concurrency']:
+                throughput = benchmark.run_throughput(
+                    concurrency=options['concurrency'], requests=options['requests'], only=options['only'],
+                )
+            else:
+                results = benchmark.run_benchmarks(repeat=options['repeat'], only=options['only'])
+        finally:
+            # Entries queued while seeding belong to the test database.
+            audit.buffer.flush()
+            connection.creation.destroy_test_db(old_name, verbosity=verbosity, keepdb=options['keepdb'])
+            for alias, settings_dict in mirrors.items():
+                connections.settings[alias] = settings_dict
+                connections[alias].close()
+                connections[alias].settings_dict = settings_dict
+            teardown_test_environment()
+
+        if options['concurrency']:
+            self._report_throughput(throughput, options['concurrency'])
+            return
+
+        baseline = benchmark.load_baseline()
+        base_cases = (baseline or {}).get('cases', {})
+        self.stdout.write(f"\n{'case':36} {'status':>6} {'ms':>9} {'queries':>8} {'peak KiB':>10}   baseline")
+        for name, r in results.items():
+            b = base_cases.get(name)
+            ref = f"{b['wall_ms']} ms / {b['queries']} q / {b['peak_kib']} KiB" if b else '—'
+            self.stdout.write(f"{name:36} {r['status']:>6} {r['wall_ms']:>9} {r['queries']:>8} {r['peak_kib']:>10}   {ref}")
+
+        failed = [name for name, r in results.items() if r['status'] >= 400]
+        if failed:
+            self.stdout.write(self.style.WARNING(f"\nCases returning errors: {', '.join(failed)}"))
+
+        if options['update_baseline']:
+            if options['only']:
+                merged = dict(base_cases)
+                merged.update(results)
+                results = merged
+            benchmark.save_baseline(results)
+            self.stdout.write(self.style.SUCCESS(f'\nBaseline written to {benchmark.BASELINE_PATH}'))
+            return
+
+        if baseline is None:
+            self.stdout.write(self.style.WARNING('\nNo baseline found; run with --update-baseline to create one.'))
+            return
+
+        if baseline.get('database') != connection.vendor:
+            self.stdout.write(self.style.WARNING(
+                f"\nBaseline was recorded on {baseline.get('database')}; timings are not comparable "
+                f"on {connection.vendor}."
+            ))
+
+        notes = benchmark.drift(
+            results, baseline,
+            time_tolerance=options['time_tolerance'],
+            memory_tolerance=options['memory_tolerance'],
+        )
+        if notes:
+            self.stdout.write(self.style.WARNING(
+                '\nAbove the baseline time/memory (reported only; compare on the same machine):\n  '
+                + '\n  '.join(notes)
+            ))
+
+        regressions = benchmark.compare(results, baseline)
+        if regressions:
+            raise CommandError('Benchmark regressions:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('\nNo regressions against baseline.'))
+
+    def _report_throughput(self, throughput, concurrency):
+        self.stdout.write(f"\n{concurrency} concurrent clients; report queries sequential vs pooled")
+        self.stdout.write(f"{'case':36} {'seq req/s':>10} {'p50 ms':>9} {'pool req/s':>11} {'p50 ms':>9} {'gain':>7}")
+        for name, r in throughput.items():
+            seq, pooled = r['sequential'], r['pooled']
+            gain = f"{pooled['rps'] / seq['rps']:.2f}x" if seq['rps'] else '—'
+            self.stdout.write(
+                f"{name:36} {seq['rps']:>10} {seq['p50_ms']:>9} {pooled['rps']:>11} {pooled['p50_ms']:>9} {gain:>7}"
+            )
@@ -0,0 +1,200 @@
+"""
+Stress the database connection setup against a host that kills idle
+connections.
+
+Worker threads make request-shaped calls (connection checks as at
+request start, one report-style query, cleanup as at request end) in
+bursts separated by quiet spells longer than --idle-timeout, while a
+reaper thread terminates this command's backends once they have been
+idle that long, as the host does. Each mode runs on its own connection
+alias, tagged application_name=db_stress so no other backend is touched:
+
+  persistent     CONN_MAX_AGE=600 without health checks (the old setup)
+  health-checks  CONN_MAX_AGE=600 with CONN_HEALTH_CHECKS
+  pool           the psycopg 3 pool from settings (DB_POOL), with
+                 CONN_HEALTH_CHECKS; its max_idle is scaled down to the
+                 emulated timeout (see DB_POOL_MAX_IDLE in settings)
+
+    python manage.py db_stress                        # all modes
+    python manage.py db_stress --mode pool --threads 8 --cycles 5
+
+Reports errors (requests that would have been 500s), backends killed,
+throughput and latency percentiles per mode; "first req" is the slowest
+first request after a quiet spell, where reconnect spikes show up.
+PostgreSQL only.
+"""
+import statistics
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from sales.models import Sale
+
+MODES = ('persistent', 'health-checks', 'pool')
+
+APPLICATION_NAME = 'db_stress'
+
+
+def _percentile(values, pct):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def _mode_settings(base, mode, idle_timeout):
+    settings_dict = dict(base)
+    options = {key: value for key, value in base.get('OPTIONS', {}).items() if key != 'pool'}
+    options['application_name'] = APPLICATION_NAME
+    if mode == 'pool':
+        pool = dict(base.get('OPTIONS', {}).get('pool') or {})
+        # Shrink back to min_size before the emulated host kills anything.
+        pool['max_idle'] = idle_timeout / (pool.get('max_size', 4) + 1)
+        options['pool'] = pool
+        settings_dict.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=True)
+    else:
+        settings_dict.update(CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=mode == 'health-checks')
+    settings_dict['OPTIONS'] = options
+    return settings_dict
+
+
+class Command(BaseCommand):
+    help = 'Measure request latency and errors per connection mode while idle connections are killed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', action='append', choices=MODES, dest='modes',
+                            help='Connection mode to test (repeatable; default: all).')
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent request threads (default: 4).')
+        parser.add_argument('--cycles', type=int, default=3, help='Burst + quiet cycles per mode (default: 3).')
+        parser.add_argument('--burst', type=float, default=4, help='Seconds of load per cycle (default: 4).')
+        parser.add_argument('--idle-timeout', type=float, default=3,
+                            help='Emulated host idle timeout in seconds (default: 3).')
+        parser.add_argument('--think-ms', type=float, default=10,
+                            help="Pause between a thread's requests, in ms (default: 10).")
+
+    def handle(self, *args, **options):
+        base = connections['default'].settings_dict
+        if connections['default'].vendor != 'postgresql':
+            raise CommandError('db_stress needs PostgreSQL (DATABASE_URL=postgres://...)')
+        if min(options['threads'], options['cycles'], options['burst'], options['idle_timeout']) <= 0:
+            raise CommandError('--threads, --cycles, --burst and --idle-timeout must be positive')
+
+        self.stdout.write(
+            f"{options['threads']} threads, {options['cycles']} x ({options['burst']:g} s load + "
+            f"{options['idle_timeout'] + 1:g} s quiet) per mode, idle timeout {options['idle_timeout']:g} s\n"
+        )
+        self.stdout.write(f"{'mode':14} {'requests':>9} {'errors':>7} {'killed':>7} {'req/s':>8} "
+                          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'first req':>10}")
+        for mode in options['modes'] or MODES:
+            alias = f'db_stress_{mode}'.replace('-', '_')
+            connections.settings[alias] = _mode_settings(base, mode, options['idle_timeout'])
+            try:
+                result = self._run(alias, options)
+            finally:
+                if mode == 'pool':
+                    connections[alias].close_pool()
+                del connections.settings[alias]
+            self.stdout.write(
+                f"{mode:14} {result['requests']:>9} {result['errors']:>7} {result['killed']:>7} "
+                f"{result['rate']:>8.1f} {result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f} "
+                f"{result['max']:>8.2f} {result['first']:>10.2f}"
+            )
+
+    def _run(self, alias, options):
+        since = timezone.localdate() - timedelta(days=30)
+        think = options['think_ms'] / 1000
+        quiet = options['idle_timeout'] + 1
+        # Main thread and workers meet at the start and end of every burst.
+        turn = threading.Barrier(options['threads'] + 1)
+        burst_over = threading.Event()
+        stop = threading.Event()
+        latencies, first, errors, killed = [], [], [0], [0]
+        lock = threading.Lock()
+
+        def request():
+            t0 = time.perf_counter()
+            failed = False
+            try:
+                close_old_connections()
+                (Sale.objects.using(alias).in_local_dates(since, timezone.localdate())
+                 .aggregate(total=Sum('total_amount'), count=Count('id')))
+            except Exception:
+                failed = True
+            finally:
+                close_old_connections()
+            ms = (time.perf_counter() - t0) * 1000
+            with lock:
+                latencies.append(ms)
+                errors[0] += failed
+            return ms
+
+        def worker():
+            try:
+                for _ in range(options['cycles']):
+                    turn.wait()
+                    ms = request()
+                    with lock:
+                        first.append(ms)
+                    while not burst_over.is_set():
+                        time.sleep(think)
+                        request()
+                    turn.wait()
+            except threading.BrokenBarrierError:
+                pass
+            finally:
+                connections[alias].close()
+
+        def reaper():
+            try:
+                while not stop.wait(0.25):
+                    with connections['default'].cursor() as cursor:
+                        cursor.execute(
+                            """
+                            SELECT count(pg_terminate_backend(pid)) FROM pg_stat_activity
+                            WHERE datname = current_database() AND application_name = %s
+                              AND state = 'idle' AND state_change < now() - make_interval(secs => %s)
+                            """,
+                            [APPLICATION_NAME, options['idle_timeout']],
+                        )
+                        killed[0] += cursor.fetchone()[0]
+            finally:
+                connections['default'].close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        reaper_thread = threading.Thread(target=reaper)
+        for thread in threads + [reaper_thread]:
+            thread.start()
+        loaded = 0.0
+        try:
+            for _ in range(options['cycles']):
+                burst_over.clear()
+                turn.wait()
+                t0 = time.perf_counter()
+                time.sleep(options['burst'])
+                burst_over.set()
+                turn.wait()
+                loaded += time.perf_counter() - t0
+                time.sleep(quiet)
+        finally:
+            turn.abort()
+            for thread in threads:
+                thread.join()
+            stop.set()
+            reaper_thread.join()
+
+        latencies.sort()
+        return {
+            'requests': len(latencies),
+            'errors': errors[0],
+            'killed': killed[0],
+            'rate': len(latencies) / loaded if loaded else 0.0,
+            'p50': _percentile(latencies, 50),
+            'p95': _percentile(latencies, 95),
+            'p99': _percentile(latencies, 99),
+            'max': latencies[-1] if latencies else 0.0,
+            'first': max(first, default=0.0),
+        }
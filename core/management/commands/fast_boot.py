@@ -0,0 +1,122 @@
+"""
+Boot-time migrate and collectstatic, each skipped when it has nothing to
+do (start.sh runs this under FAST_BOOT instead of both commands):
+
+  migrate        runs when a migration file on disk isn't recorded in
+                 django_migrations (one query), e.g. after a deploy
+  collectstatic  runs (with --clear) when the SHA-256 of the static
+                 sources, stored in STATIC_ROOT/.fast_boot by the last
+                 collect, differs, or STATIC_ROOT is gone
+
+Migrations are checked against the database rather than a stored hash:
+the database outlives the container, and a new or reset one needs
+migrating however unchanged the files are.
+
+    python manage.py fast_boot
+    python manage.py fast_boot --check      # report only
+"""
+import hashlib
+import os
+import time
+from importlib.util import find_spec
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+from django.utils._os import to_path
+
+STAMP_NAME = '.fast_boot'
+
+
+def migration_files():
+    """(app_label, name) of every migration file on disk, without importing them."""
+    found = set()
+    for app_config in apps.get_app_configs():
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        if module_name is None:
+            continue
+        try:
+            spec = find_spec(module_name)
+        except ModuleNotFoundError:
+            continue
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        for location in spec.submodule_search_locations:
+            for entry in os.listdir(location):
+                name, ext = os.path.splitext(entry)
+                if ext == '.py' and name[0] not in '_~':
+                    found.add((app_config.label, name))
+    return found
+
+
+def unapplied_migrations(using=DEFAULT_DB_ALIAS):
+    recorder = MigrationRecorder(connections[using])
+    if not recorder.has_table():
+        return migration_files()
+    return migration_files() - set(recorder.applied_migrations())
+
+
+def static_digest():
+    """SHA-256 over every file collectstatic would copy, with its path."""
+    digest = hashlib.sha256(settings.STORAGES['staticfiles']['BACKEND'].encode())
+    ignore_patterns = apps.get_app_config('staticfiles').ignore_patterns
+    files = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list(ignore_patterns):
+            # The first finder to list a path wins, as in collectstatic.
+            files.setdefault(path, storage)
+    for path in sorted(files):
+        digest.update(path.encode() + b'\0')
+        with files[path].open(path) as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def static_stamp_path():
+    return Path(to_path(settings.STATIC_ROOT)) / STAMP_NAME
+
+
+class Command(BaseCommand):
+    help = 'Run migrate and collectstatic only when migrations or static files changed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report what would run.')
+
+    def handle(self, *args, **options):
+        check = options['check']
+
+        start = time.perf_counter()
+        pending = unapplied_migrations()
+        if not pending:
+            self.stdout.write(f'migrate: up to date, skipped ({self._ms(start)})')
+        elif check:
+            self.stdout.write(f'migrate: {len(pending)} unapplied migration(s), would run')
+        else:
+            call_command('migrate', interactive=False, verbosity=options['verbosity'])
+            self.stdout.write(f'migrate: applied {len(pending)} migration(s) ({self._ms(start)})')
+
+        start = time.perf_counter()
+        digest = static_digest()
+        stamp = static_stamp_path()
+        try:
+            collected = stamp.read_text().strip()
+        except OSError:
+            collected = None
+        if collected == digest:
+            self.stdout.write(f'collectstatic: unchanged, skipped ({self._ms(start)})')
+        elif check:
+            self.stdout.write('collectstatic: static files changed, would run')
+        else:
+            call_command('collectstatic', interactive=False, clear=True, verbosity=0)
+            stamp.write_text(digest + '\n')
+            self.stdout.write(f'collectstatic: collected ({self._ms(start)})')
+
+    @staticmethod
+    def _ms(start):
+        return f'{(time.perf_counter() - start) * 1000:.0f} ms'
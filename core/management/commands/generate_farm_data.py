@@ -0,0 +1,383 @@
+"""
+Deterministic synthetic farm data for load and benchmark testing.
+
+    python manage.py generate_farm_data --years 3 --seed 7
+    python manage.py generate_farm_data --years 5 --scale 10 --clear   # ~1M sales
+
+The same arguments (including --end-date) always produce the same rows.
+Everything is written with bulk_create in chunks of --chunk-days days,
+so model save() overrides and signals are bypassed; derived values
+(line totals, sale totals, payment status, flock counts, intake logs)
+are computed here instead.
+"""
+import random
+import time
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from customers.models import WholesaleCustomer
+from expenses.models import CategoryMonthSpend, Expense, ExpenseCategory
+from expenses.recurrence import materialize, next_occurrence_for
+from expenses.services import rebuild_month_spend
+from reports.rollups import mark_stale
+from flock.models import EggProductionLog, Flock, FlockEvent
+from flock.population import rebuild_population
+from inventory.models import EggType, IntakeLog, PriceTier
+from sales.models import CreditPayment, Sale, SaleItem
+
+EGG_TYPES = ['Broken', 'Small', 'Medium', 'Big']
+# Share of daily crates per egg type.
+EGG_MIX = {'Broken': Decimal('0.04'), 'Small': Decimal('0.21'), 'Medium': Decimal('0.45'), 'Big': Decimal('0.30')}
+BASE_RETAIL_PRICE = {'Broken': 25, 'Small': 45, 'Medium': 55, 'Big': 65}
+WHOLESALE_DISCOUNT = Decimal('0.90')
+
+EXPENSE_CATEGORIES = ['Feed', 'Labour', 'Medication', 'Utilities', 'Transport', 'Maintenance']
+CENT = Decimal('0.01')
+
+
+def _money(value):
+    return Decimal(value).quantize(CENT)
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic dataset (flocks, production, prices, sales, payments, expenses).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=float, default=2, help='Years of history to generate (default: 2).')
+        parser.add_argument('--end-date', help='Last generated day (YYYY-MM-DD). Default: today.')
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Multiplier for daily sales volume (1 ≈ 55 sales/day).')
+        parser.add_argument('--flocks', type=int, default=4, help='Number of flocks (default: 4).')
+        parser.add_argument('--customers', type=int, default=40, help='Wholesale customers (default: 40).')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42).')
+        parser.add_argument('--chunk-days', type=int, default=30, help='Days per bulk_create chunk (default: 30).')
+        parser.add_argument('--batch-size', type=int, default=2000, help='bulk_create batch size (default: 2000).')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete existing transactional data (sales, payments, expenses, flocks, logs) first.')
+
+    def handle(self, *args, **options):
+        if options['years'] <= 0:
+            raise CommandError('--years must be positive')
+        end_date = date.fromisoformat(options['end_date']) if options['end_date'] else timezone.localdate()
+        start_date = end_date - timedelta(days=int(options['years'] * 365) - 1)
+
+        self.rng = random.Random(options['seed'])
+        self.scale = options['scale']
+        self.batch_size = options['batch_size']
+        self.tz = timezone.get_current_timezone()
+        started = time.monotonic()
+
+        if options['clear']:
+            self._clear()
+
+        with transaction.atomic():
+            self.egg_types = self._egg_types()
+            self.categories = self._expense_categories()
+            self.customers = self._customers(options['customers'])
+            self.prices = self._price_tiers(start_date, end_date)
+
+        self.flocks = self._flocks(options['flocks'], start_date)
+        counts = defaultdict(int)
+        self.open_sales = defaultdict(deque)  # customer_id -> FIFO of [sale, outstanding]
+        self.birds = {f.id: f.initial_count for f in self.flocks}
+        self.wages_scheduled = False
+
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            chunk_end = min(end_date, chunk_start + timedelta(days=options['chunk_days'] - 1))
+            with transaction.atomic():
+                for key, n in self._generate_chunk(chunk_start, chunk_end).items():
+                    counts[key] += n
+            self.stdout.write(f"  {chunk_start} → {chunk_end}: {counts['sales']} sales so far")
+            chunk_start = chunk_end + timedelta(days=1)
+
+        for flock in self.flocks:
+            flock.current_count = self.birds[flock.id]
+        Flock.objects.bulk_update(self.flocks, ['current_count'])
+
+        _, counts['recurring expense occurrences'] = materialize(until=end_date)
+        # Rows were bulk-inserted past the signals that keep these current.
+        rebuild_month_spend(start_date, end_date)
+        rebuild_population([flock.id for flock in self.flocks])
+        mark_stale(start_date, end_date)
+
+        elapsed = time.monotonic() - started
+        summary = ', '.join(f'{n} {key}' for key, n in sorted(counts.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {start_date} → {end_date} in {elapsed:.1f}s: {summary}'
+        ))
+
+    # ─── REFERENCE DATA ─────────────────────────────────────────────────
+
+    def _clear(self):
+        self.stdout.write('Clearing existing transactional data…')
+        with transaction.atomic():
+            for model in (CreditPayment, SaleItem, Sale, Expense, CategoryMonthSpend, EggProductionLog,
+                          FlockEvent, Flock, IntakeLog, PriceTier):
+                model.objects.all().delete()
+
+    def _egg_types(self):
+        types = {}
+        for order, name in enumerate(EGG_TYPES):
+            types[name], _ = EggType.objects.get_or_create(name=name, defaults={'order': order})
+        return types
+
+    def _expense_categories(self):
+        cats = {}
+        for order, name in enumerate(EXPENSE_CATEGORIES):
+            cats[name], _ = ExpenseCategory.objects.get_or_create(name=name, defaults={'order': order})
+        return cats
+
+    def _customers(self, count):
+        existing = WholesaleCustomer.objects.filter(name__startswith='Synthetic Customer').count()
+        WholesaleCustomer.objects.bulk_create([
+            WholesaleCustomer(
+                name=f'Synthetic Customer {i:04d}',
+                contact_person=f'Contact {i:04d}',
+                phone=f'024{i:07d}',
+            )
+            for i in range(existing + 1, count + 1)
+        ], batch_size=self.batch_size)
+        return list(WholesaleCustomer.objects.filter(name__startswith='Synthetic Customer').order_by('name')[:count])
+
+    def _price_tiers(self, start_date, end_date):
+        """Price changes roughly every quarter with a small random drift."""
+        rng = self.rng
+        tiers, schedule = [], defaultdict(list)
+        current = {name: Decimal(price) for name, price in BASE_RETAIL_PRICE.items()}
+        effective = start_date
+        while effective <= end_date:
+            for name, egg_type in self.egg_types.items():
+                retail = _money(current[name])
+                wholesale = _money(retail * WHOLESALE_DISCOUNT)
+                tiers.append(PriceTier(tier='retail', egg_type=egg_type, price_per_crate=retail,
+                                       effective_date=effective))
+                tiers.append(PriceTier(tier='wholesale_base', egg_type=egg_type, price_per_crate=wholesale,
+                                       effective_date=effective))
+                schedule[name].append((effective, retail, wholesale))
+                current[name] *= Decimal(str(round(rng.uniform(0.97, 1.08), 3)))
+            effective += timedelta(days=rng.randint(75, 110))
+        PriceTier.objects.bulk_create(tiers, batch_size=self.batch_size, ignore_conflicts=True)
+        return schedule
+
+    def _price_on(self, egg_name, day, sale_type):
+        price = None
+        for effective, retail, wholesale in self.prices[egg_name]:
+            if effective > day:
+                break
+            price = retail if sale_type == 'retail' else wholesale
+        return price
+
+    def _flocks(self, count, start_date):
+        rng = self.rng
+        flocks = []
+        for i in range(count):
+            initial = rng.randint(500, 3000)
+            flocks.append(Flock(
+                name=f'Synthetic Flock {i + 1:02d}',
+                breed=rng.choice(['Isa Brown', 'Lohmann Brown', 'Hy-Line']),
+                date_acquired=start_date + timedelta(days=rng.randint(0, 60) if i else 0),
+                initial_count=initial,
+                current_count=initial,
+            ))
+        return Flock.objects.bulk_create(flocks, batch_size=self.batch_size)
+
+    # ─── DAILY ACTIVITY ─────────────────────────────────────────────────
+
+    def _generate_chunk(self, start, end):
+        rng = self.rng
+        events, logs, intakes, expenses = [], [], [], []
+        sales, items_by_sale, payments, dirty = [], [], [], {}
+
+        day = start
+        while day <= end:
+            day_crates = defaultdict(Decimal)
+            for flock in self.flocks:
+                if flock.date_acquired > day:
+                    continue
+                events.extend(self._flock_events(flock, day))
+                log = self._production(flock, day)
+                logs.append(log)
+                for name in EGG_TYPES:
+                    day_crates[name] += getattr(log, f'{name.lower()}_crates')
+            if day_crates:
+                intakes.append(IntakeLog(
+                    recorded_date=day,
+                    broken_crates=int(day_crates['Broken']),
+                    small_crates=int(day_crates['Small']),
+                    medium_crates=int(day_crates['Medium']),
+                    big_crates=int(day_crates['Big']),
+                ))
+
+            for sale, items in self._sales(day):
+                sales.append(sale)
+                items_by_sale.append(items)
+            expenses.extend(self._expenses(day))
+            day += timedelta(days=1)
+
+        FlockEvent.objects.bulk_create(events, batch_size=self.batch_size)
+        EggProductionLog.objects.bulk_create(logs, batch_size=self.batch_size, ignore_conflicts=True)
+        IntakeLog.objects.bulk_create(intakes, batch_size=self.batch_size, ignore_conflicts=True)
+        Expense.objects.bulk_create(expenses, batch_size=self.batch_size)
+
+        Sale.objects.bulk_create(sales, batch_size=self.batch_size)
+        items = []
+        for sale, sale_items in zip(sales, items_by_sale):
+            for item in sale_items:
+                item.sale = sale
+                items.append(item)
+            if sale.customer_id and sale.payment_status != 'paid':
+                self.open_sales[sale.customer_id].append([sale, sale.total_amount - sale.amount_paid])
+        SaleItem.objects.bulk_create(items, batch_size=self.batch_size)
+
+        # Weekly-ish general credit payments, applied oldest debt first.
+        day = start
+        while day <= end:
+            for customer in self.customers:
+                if rng.random() < 0.15 and self.open_sales[customer.id]:
+                    payments.append(self._credit_payment(customer, day, dirty))
+            day += timedelta(days=1)
+        CreditPayment.objects.bulk_create(payments, batch_size=self.batch_size)
+        Sale.objects.bulk_update(list(dirty.values()), ['payment_status'], batch_size=self.batch_size)
+
+        return {
+            'sales': len(sales), 'sale items': len(items), 'credit payments': len(payments),
+            'expenses': len(expenses), 'production logs': len(logs), 'flock events': len(events),
+        }
+
+    def _flock_events(self, flock, day):
+        rng = self.rng
+        birds = self.birds[flock.id]
+        events = []
+        deaths = sum(1 for _ in range(3) if rng.random() < birds / 4000)
+        if deaths:
+            events.append(FlockEvent(flock=flock, event_type='death', quantity=deaths, event_date=day))
+        if rng.random() < 0.01:
+            events.append(FlockEvent(flock=flock, event_type='cull', quantity=rng.randint(5, 40), event_date=day))
+        if rng.random() < 0.002:
+            events.append(FlockEvent(flock=flock, event_type='purchase', quantity=rng.randint(100, 500),
+                                     event_date=day))
+        for event in events:
+            if event.event_type == 'purchase':
+                birds += event.quantity
+            else:
+                event.quantity = min(event.quantity, birds)
+                birds -= event.quantity
+        self.birds[flock.id] = birds
+        return [e for e in events if e.quantity]
+
+    def _production(self, flock, day):
+        age_weeks = (day - flock.date_acquired).days / 7
+        # Peak lay around week 10 in the flock's life here, slow decline afterwards.
+        lay_rate = max(0.45, 0.9 - abs(age_weeks - 10) * 0.004) * self.rng.uniform(0.93, 1.03)
+        crates = Decimal(self.birds[flock.id] * lay_rate / 30)
+        return EggProductionLog(
+            flock=flock, recorded_date=day,
+            **{f'{name.lower()}_crates': (crates * share).quantize(CENT) for name, share in EGG_MIX.items()},
+        )
+
+    def _sale_datetime(self, day):
+        moment = datetime.combine(day, datetime.min.time()) + timedelta(
+            hours=self.rng.randint(6, 18), minutes=self.rng.randint(0, 59), seconds=self.rng.randint(0, 59)
+        )
+        return timezone.make_aware(moment, self.tz)
+
+    def _sales(self, day):
+        rng = self.rng
+        weekday_boost = 1.3 if day.weekday() >= 5 else 1.0
+        retail_n = max(0, round(rng.gauss(45, 8) * self.scale * weekday_boost))
+        wholesale_n = max(0, round(rng.gauss(10, 3) * self.scale))
+
+        for sale_type, n in (('retail', retail_n), ('wholesale', wholesale_n)):
+            for _ in range(n):
+                sold_at = self._sale_datetime(day)
+                if sale_type == 'retail':
+                    names = rng.sample(EGG_TYPES[1:], rng.choice((1, 1, 2)))
+                    qty_range = (1, 3)
+                    customer = None
+                else:
+                    names = rng.sample(EGG_TYPES, rng.randint(1, 3))
+                    qty_range = (5, 40)
+                    customer = rng.choice(self.customers)
+
+                items, total = [], Decimal('0.00')
+                for name in names:
+                    price = self._price_on(name, day, sale_type) or Decimal('0.00')
+                    quantity = rng.randint(*qty_range)
+                    line_total = quantity * price
+                    total += line_total
+                    items.append(SaleItem(egg_type=self.egg_types[name], quantity=quantity,
+                                          price_per_crate=price, line_total=line_total))
+
+                if sale_type == 'retail':
+                    paid, status = total, 'paid'
+                else:
+                    roll = rng.random()
+                    if roll < 0.5:
+                        paid, status = total, 'paid'
+                    elif roll < 0.8:
+                        paid, status = _money(total * Decimal(str(round(rng.uniform(0.2, 0.8), 2)))), 'partial'
+                    else:
+                        paid, status = Decimal('0.00'), 'unpaid'
+
+                yield Sale(
+                    sale_type=sale_type, customer=customer, sale_datetime=sold_at,
+                    total_amount=total, amount_paid=paid, payment_status=status,
+                ), items
+
+    def _credit_payment(self, customer, day, dirty):
+        queue = self.open_sales[customer.id]
+        owed = sum(balance for _, balance in queue)
+        amount = min(owed, _money(owed * Decimal(str(round(self.rng.uniform(0.3, 1.0), 2)))))
+        amount = max(amount, CENT)
+
+        remaining = amount
+        while queue and remaining > 0:
+            entry = queue[0]
+            applied = min(entry[1], remaining)
+            entry[1] -= applied
+            remaining -= applied
+            entry[0].payment_status = 'paid' if entry[1] <= 0 else 'partial'
+            dirty[entry[0].pk] = entry[0]
+            if entry[1] <= 0:
+                queue.popleft()
+
+        return CreditPayment(
+            customer=customer, amount_paid=amount,
+            payment_date=self._sale_datetime(day), notes='Synthetic payment',
+        )
+
+    def _expenses(self, day):
+        rng = self.rng
+        c = self.categories
+        items = []
+        if day.weekday() == 0:
+            bags = sum(self.birds.values()) * 7 * 0.12 / 50  # ~120 g/bird/day, 50 kg bags
+            items.append(Expense(date=day, category=c['Feed'], description='Layer mash',
+                                 amount=_money(round(bags) * rng.uniform(280, 320)), payment_method='bank_transfer'))
+        if day.day == 1:
+            if not self.wages_scheduled:
+                # One recurring template; later months are materialised from it.
+                wages = Expense(date=day, category=c['Labour'], description='Farm hands wages',
+                                amount=_money(4500), payment_method='bank_transfer',
+                                is_recurring=True, recurrence_pattern='monthly')
+                wages.next_occurrence = next_occurrence_for(wages)
+                items.append(wages)
+                self.wages_scheduled = True
+            items.append(Expense(date=day, category=c['Utilities'], description='Electricity & water',
+                                 amount=_money(rng.uniform(600, 900)), payment_method='mobile_money'))
+        if rng.random() < 0.05:
+            items.append(Expense(date=day, category=c['Medication'], description='Vaccines / vitamins',
+                                 amount=_money(rng.uniform(150, 900))))
+        if rng.random() < 0.3:
+            items.append(Expense(date=day, category=c['Transport'], description='Delivery fuel',
+                                 amount=_money(rng.uniform(40, 200)), payment_method='cash'))
+        if rng.random() < 0.02:
+            items.append(Expense(date=day, category=c['Maintenance'], description='Repairs',
+                                 amount=_money(rng.uniform(100, 1500))))
+        return items
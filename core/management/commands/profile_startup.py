@@ -0,0 +1,207 @@
+"""
+Profile a cold start of the app.
+
+Boots Django in fresh interpreters (python -X importtime) the way a
+gunicorn worker does, up to answering /api/ping/, and reports:
+
+  phases   interpreter start, settings, app registry (django.setup),
+           WSGI handler (middleware), the core.startup warm-up phases
+           (unless --no-warm), and the first /api/ping/ response
+  imports  self and cumulative import time per top-level package, and
+           the slowest modules
+
+With --first-response it instead runs start.sh twice, as before
+(FAST_BOOT=False: migrate, collectstatic --clear, gunicorn) and after
+(FAST_BOOT=True: fast_boot, gunicorn --preload with warm-up), and times
+each from launch to the first successful /api/ping/.
+
+    python manage.py profile_startup
+    python manage.py profile_startup --runs 5 --top 30
+    python manage.py profile_startup --first-response --runs 3
+"""
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+# Run by the child interpreter. Prints one JSON line: its start time
+# (time.time()) and [phase, seconds] pairs.
+BOOT_SCRIPT = r'''
+import json, os, sys, time
+
+started = time.time()
+phases = []
+
+def timed(name, func):
+    t0 = time.perf_counter()
+    result = func()
+    phases.append([name, time.perf_counter() - t0])
+    return result
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django = timed('import django', lambda: __import__('django'))
+from django.conf import settings
+timed('settings', lambda: settings.INSTALLED_APPS)
+timed('apps', django.setup)
+from django.core.handlers.wsgi import WSGIHandler
+application = timed('wsgi handler', WSGIHandler)
+if WARM:
+    from core.startup import WARM_PHASES, close_connections
+    for name, phase in WARM_PHASES:
+        timed('warm ' + name, phase)
+    close_connections()
+
+def ping():
+    from wsgiref.util import setup_testing_defaults
+    environ = {'PATH_INFO': '/api/ping/'}
+    setup_testing_defaults(environ)
+    statuses = []
+    body = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b''.join(body)
+    body.close()
+    if not statuses[0].startswith('200'):
+        raise SystemExit('/api/ping/ answered ' + statuses[0])
+
+timed('first /api/ping/', ping)
+print(json.dumps({'started': started, 'phases': phases}))
+'''
+
+
+def _parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        rows.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = 'Report per-phase boot time and per-module import time, or time-to-first-response of start.sh.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Cold starts to measure; medians are reported.')
+        parser.add_argument('--top', type=int, default=20, help='Slowest modules and packages to list.')
+        parser.add_argument('--no-warm', action='store_true', help='Skip the core.startup warm-up phases.')
+        parser.add_argument('--first-response', action='store_true',
+                            help='Time start.sh to its first /api/ping/ response, without and with FAST_BOOT.')
+        parser.add_argument('--timeout', type=float, default=120,
+                            help='Seconds to wait for a first response (default: 120).')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1')
+        if options['first_response']:
+            self._first_response(options)
+        else:
+            self._profile_boot(options)
+
+    # ─── PHASES AND IMPORTS ─────────────────────────────────────────────
+
+    def _profile_boot(self, options):
+        script = f'WARM = {not options["no_warm"]}\n{BOOT_SCRIPT}'
+        runs = []
+        for _ in range(options['runs']):
+            launched = time.time()
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', script],
+                cwd=settings.BASE_DIR, capture_output=True, text=True,
+            )
+            total = time.time() - launched
+            if result.returncode:
+                raise CommandError(f'Boot failed:\n{result.stderr[-2000:]}')
+            report = json.loads(result.stdout.strip().splitlines()[-1])
+            phases = [('interpreter', report['started'] - launched)] + [tuple(p) for p in report['phases']]
+            runs.append((phases, total, _parse_importtime(result.stderr)))
+
+        self.stdout.write(f'Cold boot to first /api/ping/, median of {len(runs)} run(s)\n')
+        self.stdout.write(f"{'phase':24} {'ms':>9}")
+        for index, (name, _) in enumerate(runs[0][0]):
+            ms = statistics.median(phases[index][1] for phases, _, _ in runs) * 1000
+            self.stdout.write(f'{name:24} {ms:>9.1f}')
+        self.stdout.write(f"{'process wall':24} {statistics.median(total for _, total, _ in runs) * 1000:>9.1f}\n")
+
+        # Import times from the fastest run, the least disturbed by noise.
+        imports = min(runs, key=lambda run: run[1])[2]
+        packages = defaultdict(lambda: [0, 0])
+        for module, self_us, _ in imports:
+            package = packages[module.split('.')[0]]
+            package[0] += self_us
+            package[1] += 1
+        total_us = sum(self_us for _, self_us, _ in imports)
+        self.stdout.write(f'Import time by top-level package ({len(imports)} modules, {total_us / 1000:.1f} ms)')
+        self.stdout.write(f"{'package':32} {'self ms':>9} {'modules':>8}")
+        for package, (self_us, count) in sorted(packages.items(), key=lambda item: -item[1][0])[:options['top']]:
+            self.stdout.write(f'{package:32} {self_us / 1000:>9.1f} {count:>8}')
+
+        self.stdout.write('\nSlowest modules (cumulative includes the imports they trigger)')
+        self.stdout.write(f"{'module':48} {'self ms':>9} {'cumul ms':>9}")
+        for module, self_us, cumulative_us in sorted(imports, key=lambda row: -row[2])[:options['top']]:
+            self.stdout.write(f'{module:48} {self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}')
+
+    # ─── TIME TO FIRST RESPONSE ─────────────────────────────────────────
+
+    def _first_response(self, options):
+        modes = (('before', 'False'), ('after', 'True'))
+        results = {}
+        for name, fast_boot in modes:
+            if fast_boot == 'True':
+                # collectstatic --clear above removed the stamp; time boots
+                # where nothing changed since the last one, as on a cold start.
+                call_command('fast_boot', stdout=StringIO())
+            results[name] = [self._time_start_sh(fast_boot, options['timeout']) for _ in range(options['runs'])]
+
+        self.stdout.write(f'start.sh launch to first /api/ping/ response, {options["runs"]} run(s) each')
+        self.stdout.write(f"{'mode':26} {'median s':>9} {'min s':>7} {'max s':>7}")
+        for name, fast_boot in modes:
+            seconds = results[name]
+            self.stdout.write(
+                f'{name + " (FAST_BOOT=" + fast_boot + ")":26} {statistics.median(seconds):>9.2f} '
+                f'{min(seconds):>7.2f} {max(seconds):>7.2f}'
+            )
+
+    def _time_start_sh(self, fast_boot, timeout):
+        port = _free_port()
+        env = dict(os.environ, PORT=str(port), FAST_BOOT=fast_boot, CREATE_SUPERUSER='')
+        url = f'http://127.0.0.1:{port}/api/ping/'
+        launched = time.perf_counter()
+        process = subprocess.Popen(
+            ['bash', 'start.sh'], cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+        )
+        try:
+            while time.perf_counter() - launched < timeout:
+                if process.poll() is not None:
+                    raise CommandError(f'start.sh exited with status {process.returncode}')
+                try:
+                    with urllib.request.urlopen(url, timeout=1) as response:
+                        if response.status == 200:
+                            return time.perf_counter() - launched
+                except OSError:
+                    pass
+                time.sleep(0.01)
+            raise CommandError(f'No response from {url} within {timeout:g} s')
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait()
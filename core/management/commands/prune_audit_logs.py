@@ -0,0 +1,52 @@
+"""
+Delete audit log entries older than the retention period, live and
+archived.
+
+Expired archive months are dropped as whole partitions on PostgreSQL;
+everything else is deleted in primary-key batches so a large backlog
+never holds one long lock on the table. Schedule daily:
+
+    python manage.py prune_audit_logs                 # AUDIT_LOG_RETENTION_DAYS
+    python manage.py prune_audit_logs --days 90 --dry-run
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.audit_archive import delete_in_batches, drop_expired_partitions
+from core.models import AuditLog, AuditLogArchive
+
+
+class Command(BaseCommand):
+    help = 'Delete live and archived audit log entries older than the retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Keep this many days (default: AUDIT_LOG_RETENTION_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many entries would go.')
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.AUDIT_LOG_RETENTION_DAYS
+        if days < 1:
+            raise CommandError('Retention must be at least one day')
+        cutoff = timezone.now() - timedelta(days=days)
+        expired = AuditLog.objects.filter(timestamp__lt=cutoff)
+        archived = AuditLogArchive.objects.filter(timestamp__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(
+                f'{expired.count()} live and {archived.count()} archived audit log entries '
+                f'older than {cutoff:%Y-%m-%d} would be deleted.'
+            )
+            return
+
+        dropped = drop_expired_partitions(cutoff)
+        deleted = delete_in_batches(expired, options['batch_size'])
+        deleted_archived = delete_in_batches(archived, options['batch_size'])
+        self.stdout.write(
+            f'Deleted {deleted} live and {deleted_archived} archived audit log entries '
+            f'older than {cutoff:%Y-%m-%d}; dropped {len(dropped)} archive partition(s).'
+        )
@@ -0,0 +1,144 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .instrumentation import QueryRecorder, route_metrics
+
+logger = logging.getLogger('core.instrumentation')
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Opt-in (API_INSTRUMENTATION=True) per-request DB instrumentation.
+
+    Adds a Server-Timing header (db / view / total), writes one JSON log
+    line per request and feeds per-route percentiles served by
+    /api/core/metrics/ (staff only).
+
+    A streaming response's queries mostly run while its body is produced,
+    after the headers are gone: the recorder stays installed until the
+    body is exhausted (or closed), then the log line and route metrics
+    are written. Such responses carry no Server-Timing header.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'API_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.keep_slowest = getattr(settings, 'API_INSTRUMENTATION_SLOWEST', 3)
+
+    def __call__(self, request):
+        recorder = QueryRecorder(keep_slowest=self.keep_slowest)
+        start = time.perf_counter()
+        with _recording(recorder):
+            response = self.get_response(request)
+
+        if response.streaming:
+            response.streaming_content = self._recorded_stream(
+                response.streaming_content, request, response, recorder, start,
+            )
+            return response
+
+        total_ms, db_ms, view_ms = self._report(request, response, recorder, start)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries"',
+            f'view;dur={view_ms:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ])
+        return response
+
+    def _recorded_stream(self, content, request, response, recorder, start):
+        iterator = iter(content)
+        try:
+            while True:
+                # Entered per chunk rather than around the loop: nothing
+                # may stay installed on the connections between chunks,
+                # while the server sends them or serves other requests.
+                with _recording(recorder):
+                    try:
+                        chunk = next(iterator)
+                    except StopIteration:
+                        return
+                yield chunk
+        finally:
+            self._report(request, response, recorder, start)
+
+    def _report(self, request, response, recorder, start):
+        """Record route metrics and log the request; returns (total, db, view) ms."""
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = recorder.total_ms
+        view_ms = max(0.0, total_ms - db_ms)
+
+        match = getattr(request, 'resolver_match', None)
+        route = f"{request.method} {match.view_name if match else 'unresolved'}"
+        route_metrics.record(route, total_ms, db_ms, recorder.count)
+
+        logger.info(json.dumps({
+            'route': route,
+            'path': request.path,
+            'status': response.status_code,
+            'streaming': response.streaming,
+            'queries': recorder.count,
+            'db_ms': round(db_ms, 2),
+            'view_ms': round(view_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'slowest': [{'ms': ms, 'sql': sql[:200]} for ms, sql in recorder.slowest],
+        }))
+        return total_ms, db_ms, view_ms
+
+
+def _recording(recorder):
+    """Context manager installing `recorder` on this thread's connections."""
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(recorder))
+    return stack
+
+
+class AsyncStreamingMiddleware:
+    """
+    Under ASGI, replaces a synchronous streaming body with
+    core.streaming.async_chunks(), which Django sends chunk by chunk
+    instead of buffering it all. Listed first, so it wraps the body after
+    every other middleware has, and their per-chunk wrappers still run on
+    the request's sync thread. A no-op under WSGI.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from django.core.handlers.asgi import ASGIRequest
+
+        from .streaming import async_chunks
+
+        response = self.get_response(request)
+        if response.streaming and not response.is_async and isinstance(request, ASGIRequest):
+            response.streaming_content = async_chunks(response.streaming_content)
+        return response
+
+
+class AuditContextMiddleware:
+    """
+    Makes the current request available to the audit receivers in
+    core/audit.py, which read the acting user and client IP from it.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'AUDIT_LOG_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from .audit import current_request
+
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:02
+
+from django.db import migrations, models
+
+
+POSTGRES_FORWARD = [
+    # Archive: one table per calendar month (UTC) of timestamp, plus a
+    # default partition so a missing month never fails an insert.
+    """
+    CREATE TABLE core_auditlogarchive (
+        id bigint NOT NULL,
+        user_id integer NULL,
+        action varchar(20) NOT NULL,
+        model varchar(100) NOT NULL,
+        record_id integer NOT NULL,
+        "timestamp" timestamp with time zone NOT NULL,
+        details jsonb NOT NULL,
+        ip_address inet NULL,
+        PRIMARY KEY (id, "timestamp")
+    ) PARTITION BY RANGE ("timestamp")
+    """,
+    'CREATE TABLE core_auditlogarchive_default PARTITION OF core_auditlogarchive DEFAULT',
+    'CREATE INDEX core_archive_timestamp_idx ON core_auditlogarchive ("timestamp", id)',
+    'CREATE INDEX core_archive_user_idx ON core_auditlogarchive (user_id, "timestamp")',
+    'CREATE INDEX core_archive_record_idx ON core_auditlogarchive (model, record_id)',
+    # Substring search over details (?search=) via trigram GIN indexes.
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX core_audit_details_trgm ON core_auditlog USING gin ((details::text) gin_trgm_ops)',
+    'CREATE INDEX core_archive_details_trgm ON core_auditlogarchive USING gin ((details::text) gin_trgm_ops)',
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS core_audit_details_trgm',
+    'DROP TABLE IF EXISTS core_auditlogarchive CASCADE',
+]
+
+DEFAULT_FORWARD = [
+    """
+    CREATE TABLE core_auditlogarchive (
+        id bigint NOT NULL PRIMARY KEY,
+        user_id integer NULL,
+        action varchar(20) NOT NULL,
+        model varchar(100) NOT NULL,
+        record_id integer NOT NULL,
+        "timestamp" datetime NOT NULL,
+        details text NOT NULL,
+        ip_address char(39) NULL
+    )
+    """,
+    'CREATE INDEX core_archive_timestamp_idx ON core_auditlogarchive ("timestamp", id)',
+    'CREATE INDEX core_archive_user_idx ON core_auditlogarchive (user_id, "timestamp")',
+    'CREATE INDEX core_archive_record_idx ON core_auditlogarchive (model, record_id)',
+]
+
+DEFAULT_REVERSE = [
+    'DROP TABLE IF EXISTS core_auditlogarchive',
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        postgres = schema_editor.connection.vendor == 'postgresql'
+        for sql in statements['postgresql' if postgres else 'default']:
+            schema_editor.execute(sql)
+    return run
+
+
+create_archive = _run({'postgresql': POSTGRES_FORWARD, 'default': DEFAULT_FORWARD})
+drop_archive = _run({'postgresql': POSTGRES_REVERSE, 'default': DEFAULT_REVERSE})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_audit_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLogArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('create', 'Created'), ('update', 'Updated'), ('delete', 'Deleted'), ('login', 'Logged In'), ('logout', 'Logged Out')], max_length=20)),
+                ('model', models.CharField(max_length=100)),
+                ('record_id', models.IntegerField()),
+                ('timestamp', models.DateTimeField()),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Audit Log',
+                'verbose_name_plural': 'Archived Audit Logs',
+                'ordering': ['-timestamp'],
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_archive, drop_archive),
+    ]
@@ -30,7 +30,43 @@ class AuditLog(models.Model):
         indexes = [
             models.Index(fields=['user', '-timestamp']),
             models.Index(fields=['model', 'record_id']),
+            # Retention pruning and newest-first paging.
+            models.Index(fields=['timestamp', 'id'], name='core_audit_timestamp_idx'),
         ]
     
     def __str__(self):
-        return f"{self.user or 'System'} {self.action} {self.model} #{self.record_id}"
\ No newline at end of file
+        return f"{self.user or 'System'} {self.action} {self.model} #{self.record_id}"
+
+
+class AuditLogArchive(models.Model):
+    """
+    AuditLog rows moved out of the live table by archive_audit_logs.
+
+    On PostgreSQL this is a table partitioned by month of ``timestamp``
+    (see core/audit_archive.py), so expired months are dropped whole;
+    elsewhere it is a plain table. Its schema comes from migration
+    core/0003_audit_archive rather than from Django, hence managed = False.
+    """
+    id = models.BigIntegerField(primary_key=True)  # the original AuditLog id
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, null=True, blank=True,
+                             db_constraint=False, related_name='+')
+    action = models.CharField(max_length=20, choices=AuditLog.ACTION_CHOICES)
+    model = models.CharField(max_length=100)
+    record_id = models.IntegerField()
+    timestamp = models.DateTimeField()
+    details = models.JSONField(default=dict, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+        ordering = ['-timestamp']
+        verbose_name = 'Archived Audit Log'
+        verbose_name_plural = 'Archived Audit Logs'
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='core_archive_timestamp_idx'),
+            models.Index(fields=['user', 'timestamp'], name='core_archive_user_idx'),
+            models.Index(fields=['model', 'record_id'], name='core_archive_record_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id or 'System'} {self.action} {self.model} #{self.record_id} (archived)"
@@ -0,0 +1,82 @@
+"""
+Keyset ("seek") pagination.
+
+Pages are addressed by the (timestamp, id) of the last row served rather
+than by an offset, so page N costs the same index range scan as page 1
+however deep the client pages, and rows inserted meanwhile never shift
+or duplicate results.
+"""
+import base64
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first pages over (keyset_field, id); needs an index on both."""
+
+    keyset_field = 'timestamp'
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    def _encode(self, row):
+        raw = f"{getattr(row, self.keyset_field).isoformat()}|{row.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def _decode(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            value, pk = raw.rsplit('|', 1)
+            value = parse_datetime(value)
+            if value is None:
+                raise ValueError
+            return value, int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({'error': 'Invalid cursor'})
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            value, pk = self._decode(cursor)
+            field = self.keyset_field
+            queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+
+        rows = list(queryset.order_by(f'-{self.keyset_field}', '-pk')[:size + 1])
+        self.next_cursor = self._encode(rows[size - 1]) if len(rows) > size else None
+        return rows[:size]
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import AuditLog
+from .models import AuditLog, AuditLogArchive
 
 
 class AuditLogSerializer(serializers.ModelSerializer):
@@ -8,4 +8,10 @@ class AuditLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = AuditLog
         fields = ['id', 'user', 'action', 'model', 'record_id', 'timestamp', 'details', 'ip_address']
-        read_only_fields = ['id', 'timestamp']
\ No newline at end of file
+        read_only_fields = ['id', 'timestamp']
+
+
+class AuditLogArchiveSerializer(AuditLogSerializer):
+
+    class Meta(AuditLogSerializer.Meta):
+        model = AuditLogArchive
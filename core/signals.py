@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from knox.models import get_token_model
+
+from .authentication import forget, forget_user
+
+
+@receiver(post_delete, sender=get_token_model())
+def forget_deleted_token(sender, instance, **kwargs):
+    """Logout, logoutall and expiry cleanup all delete the token row."""
+    forget(instance.digest)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_user_tokens(sender, instance, created, **kwargs):
+    # Deactivation or any other change must not be masked by a cached user.
+    if not created:
+        forget_user(instance.pk)
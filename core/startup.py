@@ -0,0 +1,49 @@
+"""
+Boot-time warm-up.
+
+A fresh worker otherwise pays on its first requests for importing the
+URLconf (every view, serializer and filterset, and with them DRF, knox
+and django_filters) and for filling the lookup caches. warm() does both
+up front; under gunicorn --preload it runs once in the master
+(config/gunicorn.conf.py), and the forked workers inherit the imported
+modules and filled LocMem caches.
+
+Audit entries queued meanwhile are written, and database connections
+opened meanwhile closed again, psycopg pools included: a forked worker
+must not share its parent's sockets.
+"""
+import time
+
+from django.db import connections
+from django.urls import get_resolver
+
+from inventory import lookups
+
+from . import audit
+
+# (phase, callable), in order.
+WARM_PHASES = (
+    ('urls', lambda: get_resolver().url_patterns),
+    ('lookups', lookups.warm),
+)
+
+
+def warm():
+    """Run WARM_PHASES; returns {phase: seconds}."""
+    timings = {}
+    try:
+        for name, phase in WARM_PHASES:
+            start = time.perf_counter()
+            phase()
+            timings[name] = time.perf_counter() - start
+    finally:
+        audit.buffer.flush()
+        close_connections()
+    return timings
+
+
+def close_connections():
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+        if hasattr(conn, 'close_pool'):
+            conn.close_pool()
@@ -0,0 +1,111 @@
+"""
+Incremental JSON encoding for large responses.
+
+StreamingJSONResponse accepts the same nested dict/list structures a DRF
+Response would, except that any value may also be a generator/iterator
+(e.g. over ``queryset.iterator()``). Those are encoded as JSON arrays
+element by element, so the full structure never exists in memory and
+the first bytes leave before the last row is read. Scalars are encoded
+with DRF's JSONEncoder, so output matches the regular JSON renderer.
+
+Under ASGI, Django collects a synchronous streaming body into a list
+before sending any of it; core.middleware.AsyncStreamingMiddleware hands
+it async_chunks() instead.
+"""
+import json
+from collections.abc import Iterator
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+# Flush to the client in chunks of roughly this many characters.
+STREAM_CHUNK_SIZE = 16 * 1024
+
+_encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def wants_streaming(request):
+    """True when the client asked for ?stream=1 (or true/yes)."""
+    return request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def iter_json(value):
+    """Yield JSON text fragments for value, descending into containers."""
+    if isinstance(value, dict):
+        yield '{'
+        first = True
+        for key, item in value.items():
+            yield ('' if first else ',') + json.dumps(str(key), ensure_ascii=False) + ':'
+            yield from iter_json(item)
+            first = False
+        yield '}'
+    elif isinstance(value, (list, tuple, Iterator)):
+        yield '['
+        first = True
+        for item in value:
+            if not first:
+                yield ','
+            yield from iter_json(item)
+            first = False
+        yield ']'
+    else:
+        yield _encoder.encode(value)
+
+
+def _buffered(fragments, chunk_size=STREAM_CHUNK_SIZE):
+    buffer, size = [], 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        size += len(fragment)
+        if size >= chunk_size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+async def async_chunks(content):
+    """
+    Async iterator over a synchronous streaming body, one chunk per call
+    on the request's sync thread (the one its view ran on, with its DB
+    connections), so under ASGI each chunk is sent as it is produced.
+    """
+    iterator = iter(content)
+    done = object()
+    step = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await step(iterator, done)) is not done:
+            yield chunk
+    finally:
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close, thread_sensitive=True)()
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """Chunked application/json response built from iter_json()."""
+
+    def __init__(self, data, status=200, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(_buffered(iter_json(data)), status=status, **kwargs)
+
+
+class StreamingListMixin:
+    """
+    ViewSet mixin: ``?stream=1`` on list() streams the filtered queryset
+    through .iterator() one serialized object at a time, instead of
+    materialising and rendering the whole unpaginated list.
+    """
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if not wants_streaming(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        rows = (
+            serializer_class(obj, context=context).data
+            for obj in queryset.iterator(chunk_size=self.stream_chunk_size)
+        )
+        return StreamingJSONResponse(rows)
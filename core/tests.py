@@ -1,3 +1,158 @@
+import json
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init
 from django.test import TestCase
+from knox.models import AuthToken
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from expenses.models import Expense, ExpenseCategory
+
+from . import audit, benchmark
+from .authentication import CachedTokenAuthentication, token_cache
+from .models import AuditLog
+
+
+class EndpointQueryBudgetTests(TestCase):
+    """The benchmark cases against core/benchmark_baseline.json's statuses and query budgets."""
+
+    @classmethod
+    def setUpTestData(cls):
+        benchmark.seed_dataset(stdout=StringIO())
+
+    def test_query_budgets(self):
+        baseline = benchmark.load_baseline()
+        results = benchmark.run_benchmarks(repeat=1)
+        self.assertEqual(sorted(results), sorted(baseline['cases']))
+        self.assertEqual(benchmark.compare(results, baseline), [])
+
+
+class AsyncStreamingTests(TestCase):
+    """Under ASGI a streamed list must reach the server as an async body, not be buffered."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('clerk')
+        category = ExpenseCategory.objects.create(name='Feed')
+        Expense.objects.bulk_create([
+            Expense(category=category, description=f'Bag {n}', amount=10, date=date(2026, 3, 1))
+            for n in range(3)
+        ])
+
+    async def test_streamed_list_is_async_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get('/api/expenses/expenses/?stream=1')
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(json.loads(body)), 3)
+
+    def test_streamed_list_stays_sync_under_wsgi(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/api/expenses/expenses/?stream=1')
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(json.loads(response.getvalue())), 3)
+
+
+class AuditDiffTests(TestCase):
+    """Update diffs come from the row each instance was loaded from."""
+
+    def setUp(self):
+        self.category = ExpenseCategory.objects.create(name='Feed', description='Layers mash')
+
+    def save_and_log(self, instance, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.save(**kwargs)
+        audit.buffer.flush()
+        return AuditLog.objects.filter(action='update', model='ExpenseCategory').latest('pk')
+
+    def test_reads_run_no_post_init_receiver(self):
+        self.assertFalse(post_init.has_listeners(ExpenseCategory))
+
+    def test_update_diffs_against_loaded_row(self):
+        category = ExpenseCategory.objects.get(pk=self.category.pk)
+        category.name = 'Feed & supplements'
+        log = self.save_and_log(category)
+        self.assertEqual(log.details, {'changes': {'name': ['Feed', 'Feed & supplements']}})
+        category.order = 3
+        log = self.save_and_log(category)
+        self.assertEqual(log.details, {'changes': {'order': [0, 3]}})
+
+    def test_deferred_fields_are_not_diffed(self):
+        category = ExpenseCategory.objects.only('name').get(pk=self.category.pk)
+        category.name = 'Feed & supplements'
+        category.description = 'Grower mash'
+        log = self.save_and_log(category, update_fields=['name', 'description'])
+        self.assertEqual(log.details, {'changes': {'name': ['Feed', 'Feed & supplements']}})
+
+
+class MetricsEndpointTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_staff_only(self):
+        self.client.force_authenticate(User.objects.create_user('clerk'))
+        self.assertEqual(self.client.get('/api/core/metrics/').status_code, 403)
+        with mock.patch('core.views.route_metrics') as route_metrics:
+            self.assertEqual(self.client.delete('/api/core/metrics/').status_code, 403)
+        route_metrics.reset.assert_not_called()
+
+    def test_staff_can_read_and_reset(self):
+        self.client.force_authenticate(User.objects.create_user('admin', is_staff=True))
+        self.assertEqual(self.client.get('/api/core/metrics/').status_code, 200)
+        with mock.patch('core.views.route_metrics') as route_metrics:
+            self.assertEqual(self.client.delete('/api/core/metrics/').status_code, 204)
+        route_metrics.reset.assert_called_once_with()
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """
+    Other workers' LocMem caches get none of this process's signals;
+    patching the core/signals.py receivers out reproduces that here.
+    """
+
+    def setUp(self):
+        token_cache().clear()
+        self.user = User.objects.create_user('clerk', password='x')
+        self.auth_token, self.token = AuthToken.objects.create(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+
+    def authenticate(self):
+        return CachedTokenAuthentication().authenticate_credentials(self.token.encode())
+
+    def test_cache_hit_costs_one_query(self):
+        self.authenticate()
+        with self.assertNumQueries(1):
+            user, auth_token = self.authenticate()
+        self.assertEqual(user, self.user)
+        self.assertEqual(auth_token.digest, self.auth_token.digest)
+
+    def test_logout_in_another_worker_rejects_cached_token(self):
+        self.assertEqual(self.client.get('/api/inventory/egg-types/').status_code, 200)
+        with mock.patch('core.signals.forget'):
+            AuthToken.objects.filter(user=self.user).delete()
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid token.'):
+            self.authenticate()
+        self.assertEqual(self.client.get('/api/inventory/egg-types/').status_code, 401)
+
+    def test_queryset_deactivation_rejects_cached_token(self):
+        self.assertEqual(self.client.get('/api/inventory/egg-types/').status_code, 200)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaisesMessage(AuthenticationFailed, 'User inactive or deleted.'):
+            self.authenticate()
+        self.assertEqual(self.client.get('/api/inventory/egg-types/').status_code, 401)
 
-# Create your tests here.
+    def test_reactivated_user_is_cached_again(self):
+        self.authenticate()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.authenticate()
+        with self.assertNumQueries(1):
+            self.authenticate()
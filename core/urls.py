@@ -10,4 +10,5 @@ app_name = 'core'
 urlpatterns = [
     path('', include(router.urls)),
     path('health-check/', views.health_check, name='health_check'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -1,20 +1,55 @@
 from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
-from .models import AuditLog
-from .serializers import AuditLogSerializer
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from django.conf import settings
+from .db_router import ReplicaReadMixin
+from .filters import DetailsSearchFilter, TimestampRangeFilter
+from .models import AuditLog, AuditLogArchive
+from .pagination import KeysetPagination
+from .serializers import AuditLogSerializer, AuditLogArchiveSerializer
+from .instrumentation import route_metrics
 
 from django.http import JsonResponse
 
 def health_check(request):
     return JsonResponse({"status": "ok", "message": "Backend is running!"})
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    """
+    Per-route latency / query percentiles collected by
+    QueryInstrumentationMiddleware. DELETE clears the samples.
+    Staff only: the routes and timings describe the whole deployment.
+    """
+    if request.method == 'DELETE':
+        route_metrics.reset()
+        return Response(status=204)
+    return Response({
+        'enabled': getattr(settings, 'API_INSTRUMENTATION', False),
+        'routes': route_metrics.snapshot(),
+    })
+
+class AuditLogViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
-    Read-only viewset for audit logs.
+    Read-only viewset for audit logs, newest first in keyset pages.
+    Query params: user, action, model, record_id, since, until, search,
+    cursor, page_size; archived=true reads the archive instead.
     """
-    queryset = AuditLog.objects.all()
-    serializer_class = AuditLogSerializer
     permission_classes = [IsAuthenticated]
-    filterset_fields = ['user', 'action', 'model']
-    search_fields = ['details']
-    ordering_fields = ['timestamp', 'id']
-    ordering = ['-timestamp']
+    filter_backends = [DjangoFilterBackend, TimestampRangeFilter, DetailsSearchFilter]
+    filterset_fields = ['user', 'action', 'model', 'record_id']
+    pagination_class = KeysetPagination
+
+    def _archived(self):
+        return self.request.query_params.get('archived', '').lower() in ('1', 'true', 'yes')
+
+    def get_queryset(self):
+        model = AuditLogArchive if self._archived() else AuditLog
+        return model.objects.select_related('user')
+
+    def get_serializer_class(self):
+        return AuditLogArchiveSerializer if self._archived() else AuditLogSerializer
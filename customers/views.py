@@ -1,10 +1,11 @@
 from rest_framework import viewsets, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
+from core.db_router import ReplicaReadMixin
 from .models import WholesaleCustomer
 from .serializers import WholesaleCustomerSerializer
 
 
-class WholesaleCustomerViewSet(viewsets.ModelViewSet):
+class WholesaleCustomerViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing wholesale customers.
     """
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ExpenseCategory, Expense
+from .models import ExpenseCategory, Expense, ExpenseBudget, CategoryMonthSpend
 
 
 @admin.register(ExpenseCategory)
@@ -16,7 +16,7 @@ class ExpenseAdmin(admin.ModelAdmin):
     list_display = ['date', 'category', 'description', 'amount', 'payment_method', 'created_by']
     list_filter = ['date', 'category', 'payment_method', 'is_recurring']
     search_fields = ['description', 'notes', 'category__name']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['template', 'next_occurrence', 'created_at', 'updated_at']
     date_hierarchy = 'date'
     ordering = ['-date', '-created_at']
     
@@ -28,10 +28,24 @@ class ExpenseAdmin(admin.ModelAdmin):
             'fields': ('payment_method', 'receipt_file')
         }),
         ('Recurring Settings', {
-            'fields': ('is_recurring', 'recurrence_pattern', 'recurrence_end_date'),
+            'fields': ('is_recurring', 'recurrence_pattern', 'recurrence_end_date', 'next_occurrence', 'template'),
             'classes': ('collapse',)
         }),
         ('Notes & Metadata', {
             'fields': ('notes', 'created_by', 'created_at', 'updated_at')
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(ExpenseBudget)
+class ExpenseBudgetAdmin(admin.ModelAdmin):
+    list_display = ['month', 'category', 'amount', 'alert_threshold']
+    list_filter = ['month', 'category']
+    ordering = ['-month', 'category__order']
+
+
+@admin.register(CategoryMonthSpend)
+class CategoryMonthSpendAdmin(admin.ModelAdmin):
+    list_display = ['month', 'category', 'total', 'count', 'updated_at']
+    list_filter = ['month', 'category']
+    readonly_fields = ['category', 'month', 'total', 'count', 'updated_at']
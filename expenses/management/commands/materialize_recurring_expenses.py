@@ -0,0 +1,32 @@
+"""
+Create the due occurrences of recurring expenses.
+
+Cheap enough to run every few minutes from cron or a scheduler: when no
+template is due it costs a single indexed query.
+
+    python manage.py materialize_recurring_expenses
+    python manage.py materialize_recurring_expenses --horizon 30   # book a month ahead
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from expenses.recurrence import materialize
+
+
+class Command(BaseCommand):
+    help = 'Materialise recurring expense occurrences up to today (plus an optional horizon).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, default=0,
+                            help='Also create occurrences up to N days ahead (default: 0).')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['horizon'] < 0:
+            raise CommandError('--horizon cannot be negative')
+        until = timezone.localdate() + timedelta(days=options['horizon'])
+        processed, created = materialize(until=until, batch_size=options['batch_size'])
+        if processed or options['verbosity'] > 1:
+            self.stdout.write(f'{processed} template(s) due; {created} occurrence(s) up to {until}.')
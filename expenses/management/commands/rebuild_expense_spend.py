@@ -0,0 +1,35 @@
+"""
+Recompute the per-category monthly spend accumulator from Expense.
+
+Needed after bulk imports or QuerySet.update()/bulk_create writes, which
+bypass the signals that normally keep it current.
+
+    python manage.py rebuild_expense_spend
+    python manage.py rebuild_expense_spend --start-month 2026-01 --end-month 2026-03
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.services import rebuild_month_spend
+
+
+def _month(value):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(f'{value}-01')
+    except ValueError:
+        raise CommandError(f"Invalid month '{value}'. Use YYYY-MM")
+
+
+class Command(BaseCommand):
+    help = 'Rebuild CategoryMonthSpend (budget spend totals) from the Expense table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-month', help='First month to rebuild (YYYY-MM). Default: all.')
+        parser.add_argument('--end-month', help='Last month to rebuild (YYYY-MM). Default: all.')
+
+    def handle(self, *args, **options):
+        rows = rebuild_month_spend(_month(options['start_month']), _month(options['end_month']))
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} category-month total(s).'))
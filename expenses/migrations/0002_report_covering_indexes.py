@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='expense',
+            name='expenses_ex_date_17a2b2_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='expense',
+            name='expenses_ex_categor_20264a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['date', 'category'], include=('amount',), name='expenses_date_cat_cov_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['category', 'date'], include=('amount',), name='expenses_cat_date_cov_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:41
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_next_occurrence(apps, schema_editor):
+    """
+    Schedule existing recurring expenses from today onwards only: past
+    repeats were entered by hand, so back-filling history would double
+    count them. Where the same cost was re-entered as several recurring
+    rows, only the latest row becomes the live template.
+    """
+    from expenses.recurrence import PATTERNS, occurrence_after
+
+    Expense = apps.get_model('expenses', 'Expense')
+    today = timezone.localdate()
+    latest = {}
+    recurring = (
+        Expense.objects
+        .filter(is_recurring=True, recurrence_pattern__in=PATTERNS)
+        .order_by('date', 'pk')
+    )
+    for expense in recurring.iterator():
+        key = (expense.category_id, expense.description, expense.amount, expense.recurrence_pattern)
+        latest[key] = expense
+
+    for expense in latest.values():
+        last = max(expense.date, today - timedelta(days=1))
+        expense.next_occurrence = occurrence_after(
+            expense.date, expense.recurrence_pattern, last, expense.recurrence_end_date,
+        )
+    Expense.objects.bulk_update(list(latest.values()), ['next_occurrence'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0002_report_covering_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='next_occurrence',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='template',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='expenses.expense'),
+        ),
+        migrations.AddConstraint(
+            model_name='expense',
+            constraint=models.UniqueConstraint(fields=('template', 'date'), name='expenses_unique_occurrence'),
+        ),
+        migrations.RunPython(backfill_next_occurrence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_month_spend(apps, schema_editor):
+    Expense = apps.get_model('expenses', 'Expense')
+    CategoryMonthSpend = apps.get_model('expenses', 'CategoryMonthSpend')
+    rows = (
+        Expense.objects
+        .annotate(month=TruncMonth('date'))
+        .values('category_id', 'month')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    CategoryMonthSpend.objects.bulk_create([
+        CategoryMonthSpend(category_id=row['category_id'], month=row['month'],
+                           total=row['total'], count=row['count'])
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0003_recurring_expense_occurrences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryMonthSpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='month_spend', to='expenses.expensecategory')),
+            ],
+            options={
+                'ordering': ['-month', 'category'],
+                'constraints': [models.UniqueConstraint(fields=('category', 'month'), name='expenses_unique_month_spend')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExpenseBudget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the budgeted month')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('alert_threshold', models.DecimalField(decimal_places=2, default=80, help_text='Alert when spend reaches this percentage of the budget', max_digits=5)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budgets', to='expenses.expensecategory')),
+            ],
+            options={
+                'verbose_name': 'Expense Budget',
+                'verbose_name_plural': 'Expense Budgets',
+                'ordering': ['-month', 'category__order', 'category__name'],
+                'constraints': [models.UniqueConstraint(fields=('category', 'month'), name='expenses_unique_budget_month')],
+            },
+        ),
+        migrations.RunPython(backfill_month_spend, migrations.RunPython.noop),
+    ]
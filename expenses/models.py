@@ -52,6 +52,13 @@ class Expense(models.Model):
     is_recurring = models.BooleanField(default=False)
     recurrence_pattern = models.CharField(max_length=20, choices=RECURRENCE_CHOICES, blank=True, null=True)
     recurrence_end_date = models.DateField(blank=True, null=True)
+    # Set on occurrences generated from a recurring expense (see recurrence.py).
+    template = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, editable=False,
+        related_name='occurrences'
+    )
+    # On templates: first occurrence not yet materialised; NULL when none is pending.
+    next_occurrence = models.DateField(null=True, blank=True, editable=False, db_index=True)
     notes = models.TextField(blank=True)
     created_by = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -62,8 +69,24 @@ class Expense(models.Model):
         verbose_name = 'Expense'
         verbose_name_plural = 'Expenses'
         indexes = [
-            models.Index(fields=['date']),
-            models.Index(fields=['category']),
+            # Date-range totals and category breakdowns.
+            models.Index(
+                fields=['date', 'category'],
+                include=['amount'],
+                name='expenses_date_cat_cov_idx',
+            ),
+            # Per-category history (also serves the category FK lookups).
+            models.Index(
+                fields=['category', 'date'],
+                include=['amount'],
+                name='expenses_cat_date_cov_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['template', 'date'],
+                name='expenses_unique_occurrence',
+            ),
         ]
     
     def __str__(self):
@@ -78,3 +101,95 @@ class Expense(models.Model):
         
         if self.recurrence_end_date and self.recurrence_end_date < self.date:
             raise ValidationError("Recurrence end date cannot be before expense date")
+
+    # Fields that define a template's schedule (see recurrence.py).
+    SCHEDULE_FIELDS = ('date', 'is_recurring', 'recurrence_pattern', 'recurrence_end_date')
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(self.SCHEDULE_FIELDS) & set(update_fields):
+            self._schedule()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'next_occurrence'}
+        super().save(*args, **kwargs)
+
+    def _schedule(self):
+        """
+        Recompute next_occurrence when the schedule changed, never to a
+        date before the stored one: migration 0003 scheduled legacy
+        templates from that day onward only, and left retired duplicates
+        and ended series at NULL, which restart from today.
+        """
+        from .recurrence import next_occurrence_for
+
+        if not self.is_recurring and self.next_occurrence is None:
+            return  # Neither a template now nor (as loaded) before.
+        stored = None
+        if self.pk:
+            stored = (
+                Expense.objects.filter(pk=self.pk)
+                .values(*self.SCHEDULE_FIELDS, 'next_occurrence').first()
+            )
+        if stored is None:
+            self.next_occurrence = next_occurrence_for(self)
+        elif any(stored[field] != getattr(self, field) for field in self.SCHEDULE_FIELDS):
+            not_before = stored['next_occurrence'] or timezone.localdate()
+            self.next_occurrence = next_occurrence_for(self, not_before=not_before)
+
+
+class ExpenseBudget(models.Model):
+    """
+    Spending budget for one category in one calendar month.
+    """
+    category = models.ForeignKey(ExpenseCategory, on_delete=models.CASCADE, related_name='budgets')
+    month = models.DateField(help_text='First day of the budgeted month')
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    alert_threshold = models.DecimalField(
+        max_digits=5, decimal_places=2, default=80,
+        help_text='Alert when spend reaches this percentage of the budget'
+    )
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-month', 'category__order', 'category__name']
+        verbose_name = 'Expense Budget'
+        verbose_name_plural = 'Expense Budgets'
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'month'], name='expenses_unique_budget_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.category.name} budget for {self.month:%Y-%m}: ₵{self.amount}"
+
+    def clean(self):
+        if self.amount is not None and self.amount <= 0:
+            raise ValidationError("Budget amount must be greater than zero")
+
+    def save(self, *args, **kwargs):
+        self.month = self.month.replace(day=1)
+        super().save(*args, **kwargs)
+
+
+class CategoryMonthSpend(models.Model):
+    """
+    Running total of expenses per category and month, kept in step with
+    Expense by expenses/signals.py so budget status never scans Expense.
+    Bulk writes bypass the signals; `manage.py rebuild_expense_spend`
+    recomputes it from scratch.
+    """
+    category = models.ForeignKey(ExpenseCategory, on_delete=models.CASCADE, related_name='month_spend')
+    month = models.DateField()
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-month', 'category']
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'month'], name='expenses_unique_month_spend'),
+        ]
+
+    def __str__(self):
+        return f"{self.category.name} {self.month:%Y-%m}: ₵{self.total}"
@@ -0,0 +1,152 @@
+"""
+Recurring expense engine.
+
+A recurring expense (is_recurring=True, no template) is a *template*: its
+own row is the first occurrence, and later occurrences are separate
+Expense rows pointing back at it via ``template``. Occurrence n is
+computed from the template's date (the anchor), never from the previous
+occurrence, so a monthly expense on the 31st lands on Feb 28/29 and is
+back on the 31st in March.
+
+``next_occurrence`` on the template stores the first date not yet
+materialised (NULL once the series has ended), and is indexed so
+materialize() only touches templates that are actually due.
+"""
+import calendar
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+PATTERNS = ('daily', 'weekly', 'monthly', 'yearly')
+
+# Fields copied from the template onto each occurrence.
+COPIED_FIELDS = ('category_id', 'description', 'amount', 'payment_method', 'notes', 'created_by_id')
+
+
+def _add_months(anchor, months):
+    month_index = anchor.month - 1 + months
+    year, month = anchor.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(anchor.day, calendar.monthrange(year, month)[1]))
+
+
+def nth_occurrence(anchor, pattern, n):
+    """Date of occurrence n (0 is the anchor itself)."""
+    if pattern == 'daily':
+        return anchor + timedelta(days=n)
+    if pattern == 'weekly':
+        return anchor + timedelta(weeks=n)
+    if pattern == 'monthly':
+        return _add_months(anchor, n)
+    if pattern == 'yearly':
+        return _add_months(anchor, 12 * n)
+    raise ValueError(f'Unknown recurrence pattern: {pattern!r}')
+
+
+def _first_index_on_or_after(anchor, pattern, day):
+    if day <= anchor:
+        return 0
+    # Cheap lower bound, then step forward to the exact index.
+    days = (day - anchor).days
+    months = (day.year - anchor.year) * 12 + day.month - anchor.month
+    n = {
+        'daily': days,
+        'weekly': days // 7,
+        'monthly': max(months - 1, 0),
+        'yearly': max(months // 12 - 1, 0),
+    }[pattern]
+    while nth_occurrence(anchor, pattern, n) < day:
+        n += 1
+    return n
+
+
+def occurrence_after(anchor, pattern, day, end_date=None):
+    """First occurrence strictly after `day`, or None past end_date."""
+    n = _first_index_on_or_after(anchor, pattern, day + timedelta(days=1))
+    nxt = nth_occurrence(anchor, pattern, max(n, 1))
+    if end_date and nxt > end_date:
+        return None
+    return nxt
+
+
+def occurrences_between(anchor, pattern, start, until):
+    """Occurrence dates (excluding the anchor) in [start, until]."""
+    n = max(_first_index_on_or_after(anchor, pattern, start), 1)
+    while True:
+        day = nth_occurrence(anchor, pattern, n)
+        if day > until:
+            return
+        yield day
+        n += 1
+
+
+def next_occurrence_for(expense, not_before=None):
+    """
+    The first unmaterialised occurrence of a template on or after
+    `not_before`, or None when the expense is not a template or its
+    series has ended. Accounts for occurrences already created, so edits
+    never re-issue past dates.
+    """
+    if not expense.is_recurring or expense.template_id or expense.recurrence_pattern not in PATTERNS:
+        return None
+    last = expense.date
+    if expense.pk:
+        from django.db.models import Max
+        last = max(last, expense.occurrences.aggregate(last=Max('date'))['last'] or last)
+    if not_before:
+        last = max(last, not_before - timedelta(days=1))
+    return occurrence_after(expense.date, expense.recurrence_pattern, last, expense.recurrence_end_date)
+
+
+def materialize(until=None, batch_size=500):
+    """
+    Insert every occurrence due on or before `until` (default: today) for
+    templates whose next_occurrence is due, and advance next_occurrence.
+
+    Idempotent: occurrences are unique per (template, date) and inserted
+    with ignore_conflicts, so overlapping or repeated runs are harmless.
+    Returns (templates processed, occurrences created).
+    """
+    from .models import Expense
+    from .services import record_spend_rows
+
+    until = until or timezone.localdate()
+    due = (
+        Expense.objects
+        .filter(next_occurrence__isnull=False, next_occurrence__lte=until)
+        .order_by('next_occurrence', 'pk')
+    )
+
+    processed = created = 0
+    with transaction.atomic():
+        templates = list(due.select_for_update())
+        for offset in range(0, len(templates), batch_size):
+            batch = templates[offset:offset + batch_size]
+            occurrences = []
+            for template in batch:
+                last = until
+                if template.recurrence_end_date:
+                    last = min(last, template.recurrence_end_date)
+                for day in occurrences_between(template.date, template.recurrence_pattern,
+                                               template.next_occurrence, last):
+                    occurrences.append(Expense(
+                        template_id=template.pk, date=day,
+                        **{field: getattr(template, field) for field in COPIED_FIELDS},
+                    ))
+                template.next_occurrence = occurrence_after(
+                    template.date, template.recurrence_pattern, until, template.recurrence_end_date,
+                )
+            # bulk_create skips the spend signals, so work out which rows are
+            # genuinely new and add those to the month spend accumulator.
+            existing = set(
+                Expense.objects
+                .filter(template_id__in=[t.pk for t in batch], date__in={o.date for o in occurrences})
+                .values_list('template_id', 'date')
+            ) if occurrences else set()
+            occurrences = [o for o in occurrences if (o.template_id, o.date) not in existing]
+            Expense.objects.bulk_create(occurrences, batch_size=batch_size, ignore_conflicts=True)
+            Expense.objects.bulk_update(batch, ['next_occurrence'], batch_size=batch_size)
+            record_spend_rows(occurrences)
+            processed += len(batch)
+            created += len(occurrences)
+    return processed, created
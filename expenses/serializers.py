@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ExpenseCategory, Expense
+from .models import ExpenseCategory, Expense, ExpenseBudget
 
 
 class ExpenseCategorySerializer(serializers.ModelSerializer):
@@ -18,9 +18,10 @@ class ExpenseSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'date', 'category', 'category_name', 'description', 'amount',
             'payment_method', 'receipt_file', 'is_recurring', 'recurrence_pattern',
-            'recurrence_end_date', 'notes', 'created_by', 'created_by_name', 'created_at', 'updated_at'
+            'recurrence_end_date', 'template', 'next_occurrence',
+            'notes', 'created_by', 'created_by_name', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'template', 'next_occurrence', 'created_at', 'updated_at']
     
     def validate_amount(self, value):
         if value <= 0:
@@ -36,4 +37,29 @@ class ExpenseSerializer(serializers.ModelSerializer):
         if data.get('recurrence_end_date') and data.get('date') and data['recurrence_end_date'] < data['date']:
             raise serializers.ValidationError("Recurrence end date cannot be before expense date")
         
-        return data
\ No newline at end of file
+        return data
+
+class ExpenseBudgetSerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True)
+
+    class Meta:
+        model = ExpenseBudget
+        fields = [
+            'id', 'category', 'category_name', 'month', 'amount', 'alert_threshold',
+            'notes', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def validate_month(self, value):
+        # Budgets are stored against the first day of the month.
+        return value.replace(day=1)
+
+    def validate_amount(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Budget amount must be greater than zero")
+        return value
+
+    def validate_alert_threshold(self, value):
+        if not 0 < value <= 100:
+            raise serializers.ValidationError("Alert threshold must be a percentage between 0 and 100")
+        return value
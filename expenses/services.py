@@ -0,0 +1,264 @@
+"""
+Expense aggregation shared by the expense summary and the expense reports.
+
+Also maintains CategoryMonthSpend, the per-category month-to-date spend
+accumulator, and computes budget status from it.
+
+Aggregates are derived from a fixed set of grouped queries over the date
+range, however many categories or days it covers:
+
+  category_totals  one GROUP BY category (also yields the overall total/count)
+  daily_totals     one GROUP BY date, zero-filled in Python
+  top_items        one ORDER BY amount LIMIT n
+  items            one select_related('category') fetch, grouped in Python
+"""
+import calendar
+from decimal import Decimal
+from datetime import timedelta
+from functools import cached_property
+from itertools import groupby
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .models import CategoryMonthSpend, Expense, ExpenseBudget, ExpenseCategory
+
+# Item order within the report: category order, then newest first.
+ITEM_ORDERING = ('category__order', 'category__name', 'category_id', '-date', '-created_at')
+
+
+class ExpenseAggregation:
+    """Lazily computed expense aggregates for [start_date, end_date]."""
+
+    def __init__(self, start_date, end_date):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.expenses = Expense.objects.filter(date__range=[start_date, end_date])
+
+    @cached_property
+    def category_totals(self):
+        """Per-category total and count, in category display order."""
+        return list(
+            self.expenses
+            .values('category_id', 'category__name', 'category__is_active')
+            .annotate(total=Sum('amount'), count=Count('id'))
+            .order_by('category__order', 'category__name')
+        )
+
+    @property
+    def total_amount(self):
+        return sum((row['total'] for row in self.category_totals), Decimal('0.00'))
+
+    @property
+    def count(self):
+        return sum(row['count'] for row in self.category_totals)
+
+    @property
+    def number_of_days(self):
+        return (self.end_date - self.start_date).days + 1
+
+    def daily_totals(self):
+        """{date: total} for every day in the range, zero on days without expenses."""
+        totals = dict(
+            self.expenses
+            .values_list('date')
+            .annotate(total=Sum('amount'))
+            .order_by()
+        )
+        series = {}
+        day = self.start_date
+        while day <= self.end_date:
+            series[day] = totals.get(day, Decimal('0.00'))
+            day += timedelta(days=1)
+        return series
+
+    def top_items(self, limit=5):
+        """The largest individual expenses in the range."""
+        return list(self.expenses.select_related('category').order_by('-amount', '-date', '-id')[:limit])
+
+    def _items_queryset(self):
+        return self.expenses.select_related('category').order_by(*ITEM_ORDERING)
+
+    @cached_property
+    def items_by_category(self):
+        """{category_id: [Expense, ...]} from a single query."""
+        grouped = {}
+        for expense in self._items_queryset():
+            grouped.setdefault(expense.category_id, []).append(expense)
+        return grouped
+
+    def iter_items_by_category(self, chunk_size=2000):
+        """(category_id, item iterator) pairs from one streamed query.
+
+        Each group must be consumed before advancing to the next.
+        """
+        rows = self._items_queryset().iterator(chunk_size=chunk_size)
+        return groupby(rows, key=lambda expense: expense.category_id)
+
+
+# ─── MONTH SPEND ACCUMULATOR ────────────────────────────────────────────
+
+def record_spend(category_id, day, amount, count=1):
+    """Add amount/count (negative to remove) to the category's month of `day`."""
+    month = day.replace(day=1)
+    updated = (
+        CategoryMonthSpend.objects
+        .filter(category_id=category_id, month=month)
+        .update(total=F('total') + amount, count=F('count') + count)
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            CategoryMonthSpend.objects.create(category_id=category_id, month=month, total=amount, count=count)
+    except IntegrityError:
+        # Created concurrently since the update above; apply on top of it.
+        record_spend(category_id, day, amount, count)
+
+
+def record_spend_rows(expenses):
+    """record_spend() for a batch of Expense rows, one write per category-month."""
+    deltas = {}
+    for expense in expenses:
+        key = (expense.category_id, expense.date.replace(day=1))
+        total, count = deltas.get(key, (Decimal('0.00'), 0))
+        deltas[key] = (total + expense.amount, count + 1)
+    for (category_id, month), (total, count) in deltas.items():
+        record_spend(category_id, month, total, count)
+
+
+def rebuild_month_spend(start_month=None, end_month=None):
+    """
+    Recompute CategoryMonthSpend from Expense, for all months or the
+    months between start_month and end_month inclusive. Returns rows written.
+    """
+    expenses = Expense.objects.all()
+    spend = CategoryMonthSpend.objects.all()
+    if start_month:
+        start_month = start_month.replace(day=1)
+        expenses = expenses.filter(date__gte=start_month)
+        spend = spend.filter(month__gte=start_month)
+    if end_month:
+        end_month = end_month.replace(day=1)
+        expenses = expenses.filter(date__lt=(end_month + timedelta(days=32)).replace(day=1))
+        spend = spend.filter(month__lte=end_month)
+
+    rows = (
+        expenses
+        .annotate(month=TruncMonth('date'))
+        .values('category_id', 'month')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic():
+        spend.delete()
+        created = CategoryMonthSpend.objects.bulk_create([
+            CategoryMonthSpend(category_id=row['category_id'], month=row['month'],
+                               total=row['total'], count=row['count'])
+            for row in rows
+        ], batch_size=1000)
+    return len(created)
+
+
+# ─── BUDGET STATUS ──────────────────────────────────────────────────────
+
+def _money(value):
+    return str(Decimal(value).quantize(Decimal('0.01')))
+
+
+def _percent(part, whole):
+    return (part / whole * 100).quantize(Decimal('0.1')) if whole else None
+
+
+def budget_status(month, today):
+    """
+    Spent vs budget per category for `month`, with a straight-line
+    month-end projection. One query: budgets and accumulated spend are
+    correlated subqueries on ExpenseCategory, Expense is never scanned.
+
+    Categories appear when they have a budget or any spend in the month.
+    """
+    month = month.replace(day=1)
+    days_in_month = calendar.monthrange(month.year, month.month)[1]
+    if (month.year, month.month) == (today.year, today.month):
+        days_elapsed = today.day
+    elif month < today:
+        days_elapsed = days_in_month
+    else:
+        days_elapsed = 0
+
+    budgets = ExpenseBudget.objects.filter(category=OuterRef('pk'), month=month)
+    spend = CategoryMonthSpend.objects.filter(category=OuterRef('pk'), month=month)
+    money = DecimalField(max_digits=14, decimal_places=2)
+    rows = (
+        ExpenseCategory.objects
+        .annotate(
+            budget=Subquery(budgets.values('amount')[:1], output_field=money),
+            alert_threshold=Subquery(budgets.values('alert_threshold')[:1]),
+            spent=Coalesce(Subquery(spend.values('total')[:1], output_field=money), Value(Decimal('0.00')),
+                           output_field=money),
+            expense_count=Coalesce(Subquery(spend.values('count')[:1]), Value(0), output_field=IntegerField()),
+        )
+        .values('id', 'name', 'budget', 'alert_threshold', 'spent', 'expense_count')
+    )
+
+    categories, alerts = [], []
+    total_budget = total_spent = total_projected = Decimal('0.00')
+    for row in rows:
+        budget, spent = row['budget'], row['spent']
+        if budget is None and not spent:
+            continue
+        if days_elapsed and days_elapsed < days_in_month:
+            projected = (spent / days_elapsed * days_in_month).quantize(Decimal('0.01'))
+        else:
+            projected = spent
+        utilisation = _percent(spent, budget)
+
+        if budget is None:
+            status = 'unbudgeted'
+        elif spent > budget:
+            status = 'over_budget'
+        elif utilisation >= row['alert_threshold']:
+            status = 'alert'
+        elif projected > budget:
+            status = 'at_risk'
+        else:
+            status = 'on_track'
+
+        entry = {
+            'category_id': row['id'],
+            'category': row['name'],
+            'budget': _money(budget) if budget is not None else None,
+            'spent': _money(spent),
+            'remaining': _money(budget - spent) if budget is not None else None,
+            'utilisation_percent': str(utilisation) if utilisation is not None else None,
+            'alert_threshold': _money(row['alert_threshold']) if budget is not None else None,
+            'projected_month_end': _money(projected),
+            'projected_percent': str(_percent(projected, budget)) if budget is not None else None,
+            'expense_count': row['expense_count'],
+            'status': status,
+        }
+        categories.append(entry)
+        if status in ('over_budget', 'alert', 'at_risk'):
+            alerts.append({'category': entry['category'], 'status': status,
+                           'utilisation_percent': entry['utilisation_percent'],
+                           'projected_percent': entry['projected_percent']})
+        if budget is not None:
+            total_budget += budget
+        total_spent += spent
+        total_projected += projected
+
+    return {
+        'month': month.strftime('%Y-%m'),
+        'days_elapsed': days_elapsed,
+        'days_in_month': days_in_month,
+        'totals': {
+            'budget': _money(total_budget),
+            'spent': _money(total_spent),
+            'projected_month_end': _money(total_projected),
+            'utilisation_percent': str(_percent(total_spent, total_budget)) if total_budget else None,
+        },
+        'categories': categories,
+        'alerts': alerts,
+    }
@@ -0,0 +1,39 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Expense
+from .services import record_spend
+
+
+@receiver(pre_save, sender=Expense)
+def remember_previous_spend(sender, instance, raw=False, **kwargs):
+    """Stash the stored category/date/amount so post_save can apply a delta."""
+    instance._previous_spend = None
+    if instance.pk and not raw:
+        instance._previous_spend = (
+            Expense.objects
+            .filter(pk=instance.pk)
+            .values_list('category_id', 'date', 'amount')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Expense)
+def update_month_spend_on_save(sender, instance, created, raw=False, **kwargs):
+    """Keep CategoryMonthSpend in step with the saved expense."""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_spend', None)
+    if previous:
+        category_id, day, amount = previous
+        if category_id == instance.category_id and day.replace(day=1) == instance.date.replace(day=1):
+            if amount != instance.amount:
+                record_spend(category_id, day, instance.amount - amount, count=0)
+            return
+        record_spend(category_id, day, -amount, count=-1)
+    record_spend(instance.category_id, instance.date, instance.amount)
+
+
+@receiver(post_delete, sender=Expense)
+def update_month_spend_on_delete(sender, instance, **kwargs):
+    """Remove a deleted expense from its category's month."""
+    record_spend(instance.category_id, instance.date, -instance.amount, count=-1)
@@ -1,3 +1,157 @@
+from datetime import date
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
 from django.test import TestCase
 
-# Create your tests here.
+from .models import CategoryMonthSpend, Expense, ExpenseCategory
+from .recurrence import materialize
+from .services import rebuild_month_spend
+
+backfill = import_module('expenses.migrations.0003_recurring_expense_occurrences').backfill_next_occurrence
+
+TODAY = date(2026, 11, 10)
+
+
+class RecurrenceTests(TestCase):
+
+    def setUp(self):
+        self.category = ExpenseCategory.objects.create(name='Utilities')
+
+    def template(self, day=date(2025, 1, 15), pattern='monthly', **fields):
+        return Expense.objects.create(category=self.category, description='Power', amount=Decimal('50.00'),
+                                      date=day, is_recurring=True, recurrence_pattern=pattern, **fields)
+
+    def occurrence_dates(self, template):
+        return list(template.occurrences.order_by('date').values_list('date', flat=True))
+
+    def test_new_template_schedules_its_second_occurrence(self):
+        self.assertEqual(self.template().next_occurrence, date(2025, 2, 15))
+        self.assertIsNone(Expense.objects.create(category=self.category, description='Fuel',
+                                                 amount=Decimal('20.00'), date=TODAY).next_occurrence)
+
+    def test_materialize_creates_due_occurrences_once(self):
+        template = self.template(day=date(2026, 1, 31))
+        self.assertEqual(materialize(until=date(2026, 4, 30)), (1, 3))
+        self.assertEqual(self.occurrence_dates(template),
+                         [date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)])
+        template.refresh_from_db()
+        self.assertEqual(template.next_occurrence, date(2026, 5, 31))
+        self.assertEqual(materialize(until=date(2026, 4, 30)), (0, 0))
+
+    def test_materialize_stops_at_the_end_date(self):
+        template = self.template(day=date(2026, 1, 5), pattern='weekly', recurrence_end_date=date(2026, 1, 20))
+        materialize(until=date(2026, 3, 1))
+        self.assertEqual(self.occurrence_dates(template), [date(2026, 1, 12), date(2026, 1, 19)])
+        template.refresh_from_db()
+        self.assertIsNone(template.next_occurrence)
+
+    def test_backfill_schedules_latest_duplicate_from_today(self):
+        older = self.template()
+        latest = self.template(day=date(2025, 3, 15))
+        Expense.objects.update(next_occurrence=None)
+        with mock.patch('django.utils.timezone.localdate', return_value=TODAY):
+            backfill(apps, None)
+        older.refresh_from_db()
+        latest.refresh_from_db()
+        self.assertIsNone(older.next_occurrence)
+        self.assertEqual(latest.next_occurrence, date(2026, 11, 15))
+
+    def test_edit_keeps_backfilled_schedule(self):
+        template = self.template()
+        Expense.objects.filter(pk=template.pk).update(next_occurrence=date(2026, 11, 15))
+        template.refresh_from_db()
+        template.notes = 'Meter 2'
+        template.save()
+        template.refresh_from_db()
+        self.assertEqual(template.next_occurrence, date(2026, 11, 15))
+        self.assertEqual(materialize(until=date(2026, 11, 20)), (1, 1))
+        self.assertEqual(self.occurrence_dates(template), [date(2026, 11, 15)])
+
+    def test_schedule_change_never_moves_earlier(self):
+        template = self.template()
+        Expense.objects.filter(pk=template.pk).update(next_occurrence=date(2026, 11, 15))
+        template.refresh_from_db()
+        template.recurrence_pattern = 'weekly'
+        template.save()
+        # Weekly from Wed 2025-01-15: first on or after the stored date.
+        self.assertEqual(template.next_occurrence, date(2026, 11, 18))
+
+    def test_edit_keeps_retired_duplicate_retired(self):
+        duplicate = self.template()
+        Expense.objects.filter(pk=duplicate.pk).update(next_occurrence=None)
+        duplicate.refresh_from_db()
+        duplicate.notes = 'Superseded'
+        duplicate.save()
+        duplicate.refresh_from_db()
+        self.assertIsNone(duplicate.next_occurrence)
+        self.assertEqual(materialize(until=TODAY), (0, 0))
+
+    def test_rescheduled_retired_duplicate_restarts_from_today(self):
+        duplicate = self.template()
+        Expense.objects.filter(pk=duplicate.pk).update(next_occurrence=None)
+        duplicate.refresh_from_db()
+        duplicate.recurrence_end_date = date(2027, 6, 30)
+        with mock.patch('django.utils.timezone.localdate', return_value=TODAY):
+            duplicate.save()
+        self.assertEqual(duplicate.next_occurrence, date(2026, 11, 15))
+
+
+class MonthSpendTests(TestCase):
+    """CategoryMonthSpend follows every write to Expense."""
+
+    def setUp(self):
+        self.feed = ExpenseCategory.objects.create(name='Feed')
+        self.power = ExpenseCategory.objects.create(name='Power')
+        self.expense = Expense.objects.create(category=self.feed, description='Mash',
+                                              amount=Decimal('100.00'), date=date(2026, 3, 10))
+
+    def spend(self):
+        return {
+            (row.category.name, row.month): (row.total, row.count)
+            for row in CategoryMonthSpend.objects.select_related('category') if row.count
+        }
+
+    def assertMatchesRebuild(self):
+        accumulated = self.spend()
+        rebuild_month_spend()
+        self.assertEqual(accumulated, self.spend())
+
+    def test_create_adds_to_month(self):
+        Expense.objects.create(category=self.feed, description='Grit', amount=Decimal('20.00'), date=date(2026, 3, 31))
+        self.assertEqual(self.spend(), {('Feed', date(2026, 3, 1)): (Decimal('120.00'), 2)})
+        self.assertMatchesRebuild()
+
+    def test_amount_change_applies_delta(self):
+        self.expense.amount = Decimal('80.00')
+        self.expense.save()
+        self.assertEqual(self.spend(), {('Feed', date(2026, 3, 1)): (Decimal('80.00'), 1)})
+        self.assertMatchesRebuild()
+
+    def test_move_to_another_month(self):
+        self.expense.date = date(2026, 4, 1)
+        self.expense.save()
+        self.assertEqual(self.spend(), {('Feed', date(2026, 4, 1)): (Decimal('100.00'), 1)})
+        self.assertMatchesRebuild()
+
+    def test_recategorise(self):
+        self.expense.category = self.power
+        self.expense.amount = Decimal('90.00')
+        self.expense.save()
+        self.assertEqual(self.spend(), {('Power', date(2026, 3, 1)): (Decimal('90.00'), 1)})
+        self.assertMatchesRebuild()
+
+    def test_delete_removes_from_month(self):
+        Expense.objects.create(category=self.feed, description='Grit', amount=Decimal('20.00'), date=date(2026, 3, 1))
+        self.expense.delete()
+        self.assertEqual(self.spend(), {('Feed', date(2026, 3, 1)): (Decimal('20.00'), 1)})
+        self.assertMatchesRebuild()
+
+    def test_materialized_occurrences_are_counted(self):
+        Expense.objects.create(category=self.power, description='Power', amount=Decimal('50.00'),
+                               date=date(2026, 1, 15), is_recurring=True, recurrence_pattern='monthly')
+        materialize(until=date(2026, 3, 20))
+        self.assertEqual(self.spend()[('Power', date(2026, 3, 1))], (Decimal('50.00'), 1))
+        self.assertMatchesRebuild()
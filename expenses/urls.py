@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ExpenseCategoryViewSet, ExpenseViewSet
+from .views import ExpenseCategoryViewSet, ExpenseViewSet, ExpenseBudgetViewSet
 
 router = DefaultRouter()
 router.register(r'expense-categories', ExpenseCategoryViewSet, basename='expense-category')
 router.register(r'expenses', ExpenseViewSet, basename='expense')
+router.register(r'budgets', ExpenseBudgetViewSet, basename='expense-budget')
 
 app_name = 'expenses'
 
@@ -2,13 +2,15 @@ from rest_framework import viewsets, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Count
 from datetime import date, timedelta
-from .models import ExpenseCategory, Expense
-from .serializers import ExpenseCategorySerializer, ExpenseSerializer
+from .models import ExpenseCategory, Expense, ExpenseBudget
+from .serializers import ExpenseCategorySerializer, ExpenseSerializer, ExpenseBudgetSerializer
+from .services import ExpenseAggregation, budget_status
+from core.db_router import ReplicaReadMixin
+from core.streaming import StreamingListMixin
 
 
-class ExpenseCategoryViewSet(viewsets.ModelViewSet):
+class ExpenseCategoryViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing expense categories.
     """
@@ -21,7 +23,7 @@ class ExpenseCategoryViewSet(viewsets.ModelViewSet):
     ordering = ['order', 'name']
 
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(ReplicaReadMixin, StreamingListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing expenses.
     """
@@ -42,6 +44,7 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         """
         Get expense summary for a date range.
         Query params: start_date, end_date (optional, defaults to current month)
+        Includes the five largest expenses as top_items.
         """
         from django.utils import timezone
         
@@ -62,27 +65,60 @@ class ExpenseViewSet(viewsets.ModelViewSet):
             start_date = date.fromisoformat(start_date)
             end_date = date.fromisoformat(end_date)
         
-        # Filter expenses in date range
-        expenses = Expense.objects.filter(date__range=[start_date, end_date])
+        aggregation = ExpenseAggregation(start_date, end_date)
         
-        # Calculate totals
-        total_expenses = expenses.count()
-        total_amount = expenses.aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        # Group by category
-        category_breakdown = expenses.values('category__name').annotate(
-            total=Sum('amount'),
-            count=Count('id')
-        ).order_by('-total')
+        # Group by category, largest first
+        category_breakdown = sorted(
+            ({'category__name': row['category__name'], 'total': row['total'], 'count': row['count']}
+             for row in aggregation.category_totals),
+            key=lambda row: row['total'],
+            reverse=True,
+        )
         
         summary = {
             'period': {
                 'start_date': start_date,
                 'end_date': end_date,
             },
-            'total_expenses': total_expenses,
-            'total_amount': total_amount,
-            'category_breakdown': list(category_breakdown),
+            'total_expenses': aggregation.count,
+            'total_amount': aggregation.total_amount if category_breakdown else 0,
+            'category_breakdown': category_breakdown,
+            'top_items': [{
+                'id': e.id, 'date': e.date, 'category': e.category.name,
+                'description': e.description, 'amount': e.amount,
+            } for e in aggregation.top_items()],
         }
         
-        return Response(summary)
\ No newline at end of file
+        return Response(summary)
+
+
+class ExpenseBudgetViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for monthly per-category budgets.
+    """
+    queryset = ExpenseBudget.objects.select_related('category').all()
+    serializer_class = ExpenseBudgetSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['category', 'month']
+    ordering_fields = ['month', 'amount']
+
+    @action(detail=False, methods=['get'])
+    def status(self, request):
+        """
+        Spent vs budget, projected month-end spend and alerts per category.
+        Query params: month (YYYY-MM, optional, defaults to current month)
+        """
+        from django.utils import timezone
+
+        today = timezone.localdate()
+        month_param = request.query_params.get('month')
+        if month_param:
+            try:
+                month = date.fromisoformat(f'{month_param}-01')
+            except ValueError:
+                return Response({'error': "Invalid 'month' format. Use YYYY-MM"}, status=400)
+        else:
+            month = today.replace(day=1)
+
+        return Response(budget_status(month, today))
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Flock, FlockEvent, EggProductionLog
+from .models import Flock, FlockEvent, EggProductionLog, FlockDailyPopulation, FlockLayRateState, LayRateAlert
 
 
 class FlockEventInline(admin.TabularInline):
@@ -41,4 +41,26 @@ class EggProductionLogAdmin(admin.ModelAdmin):
     list_filter = ['recorded_date', 'flock']
     search_fields = ['flock__name', 'notes']
     readonly_fields = ['created_at', 'updated_at']
-    date_hierarchy = 'recorded_date'
\ No newline at end of file
+    date_hierarchy = 'recorded_date'
+
+
+@admin.register(FlockDailyPopulation)
+class FlockDailyPopulationAdmin(admin.ModelAdmin):
+    list_display = ['flock', 'date', 'opening_count', 'purchases', 'deaths', 'culls', 'removals', 'closing_count']
+    list_filter = ['flock']
+    date_hierarchy = 'date'
+
+
+@admin.register(LayRateAlert)
+class LayRateAlertAdmin(admin.ModelAdmin):
+    list_display = ['flock', 'date', 'severity', 'lay_rate', 'mean_28', 'z_score', 'drop_percent', 'acknowledged']
+    list_filter = ['severity', 'acknowledged', 'flock']
+    search_fields = ['flock__name']
+    readonly_fields = ['created_at']
+    date_hierarchy = 'date'
+
+
+@admin.register(FlockLayRateState)
+class FlockLayRateStateAdmin(admin.ModelAdmin):
+    list_display = ['flock', 'last_processed_date', 'replay_from', 'updated_at']
+    readonly_fields = ['updated_at']
@@ -0,0 +1,37 @@
+"""
+Score new egg-production logs for lay-rate anomalies.
+
+Incremental, so it can run every few minutes from cron or a scheduler:
+only logs after each flock's last processed date are read. Alerts are
+served at /api/flock/alerts/.
+
+    python manage.py monitor_lay_rate
+    python manage.py monitor_lay_rate --flock 3 --rebuild   # rescore one flock from scratch
+"""
+from django.core.management.base import BaseCommand
+
+from flock.models import FlockLayRateState, LayRateAlert
+from flock.monitoring import run
+
+
+class Command(BaseCommand):
+    help = 'Detect lay-rate anomalies in egg-production logs processed since the last run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flock', type=int, action='append', dest='flocks',
+                            help='Only these flock ids (repeatable).')
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Discard monitor state and open alerts, and rescore the full history.')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            states = FlockLayRateState.objects.all()
+            alerts = LayRateAlert.objects.filter(acknowledged=False)
+            if options['flocks']:
+                states = states.filter(flock_id__in=options['flocks'])
+                alerts = alerts.filter(flock_id__in=options['flocks'])
+            states.delete()
+            alerts.delete()
+        flocks, days, alerts = run(flock_ids=options['flocks'])
+        if flocks or options['verbosity'] > 1:
+            self.stdout.write(f'{flocks} flock(s) updated; {days} day(s) scored; {alerts} alert(s) raised.')
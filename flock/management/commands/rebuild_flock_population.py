@@ -0,0 +1,31 @@
+"""
+Build or rebuild the daily flock population table from FlockEvent.
+
+The flock signals keep it current for API edits and reads extend it to
+today; run this after bulk imports or direct database edits.
+
+    python manage.py rebuild_flock_population
+    python manage.py rebuild_flock_population --flock 3 --from-date 2025-06-01
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from flock.population import rebuild_population
+
+
+class Command(BaseCommand):
+    help = 'Recompute FlockDailyPopulation from flock events.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flock', type=int, action='append', dest='flocks',
+                            help='Only these flock ids (repeatable).')
+        parser.add_argument('--from-date', help='Rebuild from this day (YYYY-MM-DD). Default: each flock\'s start.')
+
+    def handle(self, *args, **options):
+        try:
+            from_date = date.fromisoformat(options['from_date']) if options['from_date'] else None
+        except ValueError:
+            raise CommandError('--from-date must be YYYY-MM-DD')
+        rows = rebuild_population(options['flocks'], from_date=from_date)
+        self.stdout.write(f'{rows} population row(s) written.')
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flock', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlockLayRateState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_processed_date', models.DateField(blank=True, null=True)),
+                ('window', models.JSONField(blank=True, default=list)),
+                ('replay_from', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('flock', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='lay_rate_state', to='flock.flock')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LayRateAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('birds', models.PositiveIntegerField()),
+                ('crates', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('lay_rate', models.FloatField(help_text='Crates per bird that day')),
+                ('mean_7', models.FloatField(help_text='Mean lay rate over the previous 7 days')),
+                ('mean_28', models.FloatField(help_text='Mean lay rate over the previous 28 days')),
+                ('std_28', models.FloatField(help_text='Standard deviation over the previous 28 days')),
+                ('z_score', models.FloatField()),
+                ('drop_percent', models.FloatField(help_text='Shortfall against the 28-day mean')),
+                ('severity', models.CharField(choices=[('warning', 'Warning'), ('critical', 'Critical')], max_length=10)),
+                ('acknowledged', models.BooleanField(default=False)),
+                ('acknowledged_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('flock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lay_rate_alerts', to='flock.flock')),
+            ],
+            options={
+                'ordering': ['-date', 'flock'],
+                'indexes': [models.Index(fields=['acknowledged', '-date'], name='flock_alert_open_idx')],
+                'constraints': [models.UniqueConstraint(fields=('flock', 'date'), name='flock_unique_lay_rate_alert')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flock', '0002_lay_rate_monitoring'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlockDailyPopulation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('opening_count', models.PositiveIntegerField()),
+                ('purchases', models.PositiveIntegerField(default=0)),
+                ('deaths', models.PositiveIntegerField(default=0)),
+                ('culls', models.PositiveIntegerField(default=0)),
+                ('removals', models.PositiveIntegerField(default=0)),
+                ('closing_count', models.PositiveIntegerField()),
+                ('flock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_population', to='flock.flock')),
+            ],
+            options={
+                'ordering': ['flock', 'date'],
+                'indexes': [models.Index(fields=['date', 'flock'], name='flock_population_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('flock', 'date'), name='flock_unique_daily_population')],
+            },
+        ),
+    ]
@@ -85,4 +85,86 @@ class EggProductionLog(models.Model):
     def clean(self):
         for field in ('broken_crates', 'small_crates', 'medium_crates', 'big_crates'):
             if getattr(self, field) < 0:
-                raise ValidationError("Crate quantities cannot be negative.")
\ No newline at end of file
+                raise ValidationError("Crate quantities cannot be negative.")
+
+
+class FlockDailyPopulation(models.Model):
+    """
+    Head count of one flock on one date, rebuilt from FlockEvent by
+    flock/population.py. Rows run without gaps from the flock's
+    date_acquired, so per-day rates are a join on (flock, date).
+    """
+    flock = models.ForeignKey(Flock, on_delete=models.CASCADE, related_name='daily_population')
+    date = models.DateField()
+    opening_count = models.PositiveIntegerField()
+    purchases = models.PositiveIntegerField(default=0)
+    deaths = models.PositiveIntegerField(default=0)
+    culls = models.PositiveIntegerField(default=0)
+    # Birds that left alive: transfers and sales.
+    removals = models.PositiveIntegerField(default=0)
+    closing_count = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['flock', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['flock', 'date'], name='flock_unique_daily_population'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'flock'], name='flock_population_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.flock.name} on {self.date}: {self.closing_count} birds"
+
+
+class FlockLayRateState(models.Model):
+    """
+    Incremental state of the lay-rate monitor (flock/monitoring.py) for one
+    flock: the last date processed and the trailing window of daily lay
+    rates needed to score the next one.
+    """
+    flock = models.OneToOneField(Flock, on_delete=models.CASCADE, related_name='lay_rate_state')
+    last_processed_date = models.DateField(null=True, blank=True)
+    # [[iso date, crates per bird], ...] for the trailing baseline window.
+    window = models.JSONField(default=list, blank=True)
+    # Earliest date whose logs changed after being processed; the monitor
+    # replays from here on its next run.
+    replay_from = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.flock.name} lay-rate state ({self.last_processed_date})"
+
+
+class LayRateAlert(models.Model):
+    SEVERITY_CHOICES = [
+        ('warning', 'Warning'),
+        ('critical', 'Critical'),
+    ]
+
+    flock = models.ForeignKey(Flock, on_delete=models.CASCADE, related_name='lay_rate_alerts')
+    date = models.DateField()
+    birds = models.PositiveIntegerField()
+    crates = models.DecimalField(max_digits=8, decimal_places=2)
+    lay_rate = models.FloatField(help_text='Crates per bird that day')
+    mean_7 = models.FloatField(help_text='Mean lay rate over the previous 7 days')
+    mean_28 = models.FloatField(help_text='Mean lay rate over the previous 28 days')
+    std_28 = models.FloatField(help_text='Standard deviation over the previous 28 days')
+    z_score = models.FloatField()
+    drop_percent = models.FloatField(help_text='Shortfall against the 28-day mean')
+    severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES)
+    acknowledged = models.BooleanField(default=False)
+    acknowledged_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-date', 'flock']
+        constraints = [
+            models.UniqueConstraint(fields=['flock', 'date'], name='flock_unique_lay_rate_alert'),
+        ]
+        indexes = [
+            models.Index(fields=['acknowledged', '-date'], name='flock_alert_open_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.flock.name} lay-rate {self.severity} on {self.date}"
@@ -0,0 +1,189 @@
+"""
+Lay-rate anomaly detection.
+
+The lay rate is crates laid per bird on hand for one flock-day, from
+EggProductionLog joined to the flock's FlockDailyPopulation closing
+count for that date. Each day is scored against the
+flock's trailing 28-day baseline; a day whose rate sits far below the
+baseline, by z-score and by relative shortfall, becomes a LayRateAlert.
+
+run() is incremental: FlockLayRateState keeps the last date processed and
+the trailing window per flock, so a run only reads logs newer than that.
+Logs or flock events edited on or before a processed date set
+``replay_from`` (see flock/signals.py) and that flock is replayed from
+there on the next run. Cost is one state query and one log query
+however many flocks are due.
+"""
+import math
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import EggProductionLog, Flock, FlockDailyPopulation, FlockLayRateState, LayRateAlert
+from .population import extend_population
+
+BASELINE_DAYS = 28
+SHORT_DAYS = 7
+# Logged days needed in the baseline before a day is scored.
+MIN_BASELINE_POINTS = 14
+# A day alerts when it is at least Z_WARNING deviations and MIN_DROP_PERCENT
+# below the 28-day mean; critical past either critical bound.
+Z_WARNING = 2.5
+Z_CRITICAL = 4.0
+MIN_DROP_PERCENT = 10.0
+CRITICAL_DROP_PERCENT = 25.0
+# Floor on the deviation, as a fraction of the mean, so a flat baseline
+# does not turn a tiny dip into a huge z-score.
+MIN_STD_FRACTION = 0.02
+
+
+def score(rate, window, day):
+    """
+    Baseline statistics for `rate` on `day` against window
+    [(date, rate), ...], or None when the baseline is too thin.
+    """
+    baseline = [r for d, r in window if day - timedelta(days=BASELINE_DAYS) <= d < day]
+    if len(baseline) < MIN_BASELINE_POINTS:
+        return None
+    short = [r for d, r in window if day - timedelta(days=SHORT_DAYS) <= d < day]
+    mean_28 = math.fsum(baseline) / len(baseline)
+    std_28 = math.sqrt(math.fsum((r - mean_28) ** 2 for r in baseline) / (len(baseline) - 1))
+    deviation = max(std_28, mean_28 * MIN_STD_FRACTION)
+    return {
+        'mean_7': math.fsum(short) / len(short) if short else mean_28,
+        'mean_28': mean_28,
+        'std_28': std_28,
+        'z_score': (rate - mean_28) / deviation if deviation else 0.0,
+        'drop_percent': (mean_28 - rate) / mean_28 * 100 if mean_28 else 0.0,
+    }
+
+
+def severity(stats):
+    """'critical', 'warning' or None for the stats of one day."""
+    if stats['z_score'] > -Z_WARNING or stats['drop_percent'] < MIN_DROP_PERCENT:
+        return None
+    if stats['z_score'] <= -Z_CRITICAL or stats['drop_percent'] >= CRITICAL_DROP_PERCENT:
+        return 'critical'
+    return 'warning'
+
+
+def run(until=None, flock_ids=None):
+    """
+    Score every unprocessed flock-day up to `until` (default: today).
+    Returns (flocks updated, days processed, alerts raised).
+    """
+    until = until or timezone.localdate()
+    extend_population(until)
+    flocks = Flock.objects.filter(date_acquired__lte=until)
+    if flock_ids is not None:
+        flocks = flocks.filter(pk__in=flock_ids)
+    flocks = list(flocks.values_list('pk', flat=True))
+
+    with transaction.atomic():
+        states = {
+            state.flock_id: state
+            for state in FlockLayRateState.objects.select_for_update().filter(flock_id__in=flocks)
+        }
+
+        # Per flock: the first date to score, and the first date to read
+        # (earlier when a replay must rebuild its window from the logs).
+        plans, log_filter = {}, Q()
+        for flock_id in flocks:
+            state = states.get(flock_id)
+            if state is None:
+                state = states[flock_id] = FlockLayRateState(flock_id=flock_id)
+            if state.replay_from:
+                score_from = state.replay_from
+                read_from = score_from - timedelta(days=BASELINE_DAYS)
+            elif state.last_processed_date:
+                score_from = read_from = state.last_processed_date + timedelta(days=1)
+            else:
+                score_from = read_from = date.min
+            plans[flock_id] = score_from
+            log_filter |= Q(flock_id=flock_id, recorded_date__gte=read_from)
+
+        population = FlockDailyPopulation.objects.filter(flock=OuterRef('flock'), date=OuterRef('recorded_date'))
+        logs = (
+            EggProductionLog.objects
+            .filter(log_filter, recorded_date__lte=until)
+            .annotate(
+                crates=ExpressionWrapper(
+                    F('broken_crates') + F('small_crates') + F('medium_crates') + F('big_crates'),
+                    output_field=DecimalField(max_digits=10, decimal_places=2),
+                ),
+                birds=Subquery(population.values('closing_count')[:1]),
+            )
+            .values_list('flock_id', 'recorded_date', 'crates', 'birds')
+            .order_by('flock_id', 'recorded_date')
+        )
+        by_flock = defaultdict(list)
+        for flock_id, day, crates, birds in logs.iterator(chunk_size=2000):
+            by_flock[flock_id].append((day, crates, birds))
+
+        alerts, replayed, changed, processed = [], [], [], 0
+        for flock_id, score_from in plans.items():
+            state = states[flock_id]
+            if not state.replay_from and flock_id not in by_flock:
+                continue
+            if state.replay_from:
+                replayed.append((flock_id, state.replay_from))
+                window = []
+            else:
+                window = [(date.fromisoformat(d), r) for d, r in state.window]
+
+            last = state.last_processed_date
+            for day, crates, birds in by_flock.get(flock_id, ()):
+                if not birds:
+                    continue
+                rate = float(crates) / birds
+                if day >= score_from:
+                    stats = score(rate, window, day)
+                    processed += 1
+                    level = severity(stats) if stats else None
+                    if level:
+                        alerts.append(LayRateAlert(
+                            flock_id=flock_id, date=day, birds=birds, crates=crates,
+                            lay_rate=rate, severity=level, **stats,
+                        ))
+                    last = max(last, day) if last else day
+                window.append((day, rate))
+                cutoff = day - timedelta(days=BASELINE_DAYS)
+                window = [(d, r) for d, r in window if d >= cutoff]
+
+            state.window = [[d.isoformat(), r] for d, r in window]
+            state.last_processed_date = last
+            state.replay_from = None
+            changed.append(state)
+
+        if replayed:
+            stale = Q()
+            for flock_id, replay_from in replayed:
+                stale |= Q(flock_id=flock_id, date__gte=replay_from)
+            # Acknowledged alerts are kept; ignore_conflicts below leaves them as they are.
+            LayRateAlert.objects.filter(stale, acknowledged=False).delete()
+        LayRateAlert.objects.bulk_create(alerts, batch_size=1000, ignore_conflicts=True)
+
+        now = timezone.now()
+        for state in changed:
+            state.updated_at = now
+        FlockLayRateState.objects.bulk_update(
+            [state for state in changed if state.pk],
+            ['last_processed_date', 'window', 'replay_from', 'updated_at'], batch_size=500,
+        )
+        FlockLayRateState.objects.bulk_create(
+            [state for state in changed if not state.pk], batch_size=500, ignore_conflicts=True,
+        )
+    return len(changed), processed, len(alerts)
+
+
+def request_replay(flock_id, day):
+    """Replay a flock from `day` on the next run if `day` was already processed."""
+    (
+        FlockLayRateState.objects
+        .filter(flock_id=flock_id, last_processed_date__gte=day)
+        .filter(Q(replay_from__isnull=True) | Q(replay_from__gt=day))
+        .update(replay_from=day)
+    )
@@ -0,0 +1,166 @@
+"""
+Daily flock head counts.
+
+FlockDailyPopulation holds one row per flock per day from date_acquired.
+Each day's closing count is the flock's opening count plus a running
+
+    SUM(±quantity) OVER (PARTITION BY flock ORDER BY event_date)
+
+over its FlockEvents, so a rebuild is one windowed query per batch of
+flocks. A rebuild from a date resumes from the stored closing count of
+the day before and only reads the events from that date on.
+
+flock/signals.py rebuilds a flock from the date of every event change
+(deletes: once per flock and delete() call, after it commits) and when
+its initial_count or date_acquired changes;
+extend_population() carries each series forward over days without
+events and builds flocks that have no rows yet (e.g. bulk-loaded data).
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Sum, When, Window
+from django.utils import timezone
+
+from core.db_router import stick_to_primary
+
+from .models import Flock, FlockDailyPopulation, FlockEvent
+
+DECREASING_EVENTS = ('death', 'cull', 'transfer', 'sale')
+
+# FlockDailyPopulation column counting each event type.
+EVENT_COLUMNS = {
+    'purchase': 'purchases',
+    'death': 'deaths',
+    'cull': 'culls',
+    'transfer': 'removals',
+    'sale': 'removals',
+}
+
+
+def signed_quantity():
+    """+quantity for purchases, -quantity for birds leaving the flock."""
+    return Case(
+        When(event_type='purchase', then=F('quantity')),
+        When(event_type__in=DECREASING_EVENTS, then=-F('quantity')),
+        default=0,
+        output_field=IntegerField(),
+    )
+
+
+def _rebuild(plans, until):
+    """
+    Rewrite population rows for {flock_id: from_date or None} up to
+    `until`; None rebuilds the flock from date_acquired.
+    """
+    with transaction.atomic():
+        flocks = {
+            flock['id']: flock
+            for flock in (
+                Flock.objects.select_for_update()
+                .filter(pk__in=list(plans), date_acquired__lte=until)
+                .values('id', 'initial_count', 'date_acquired')
+            )
+        }
+        if not flocks:
+            return 0
+
+        resume = Q()
+        for flock_id, from_date in plans.items():
+            if flock_id in flocks and from_date and from_date > flocks[flock_id]['date_acquired']:
+                resume |= Q(flock_id=flock_id, date=from_date - timedelta(days=1))
+        bases = dict(
+            FlockDailyPopulation.objects.filter(resume).values_list('flock_id', 'closing_count')
+        ) if resume else {}
+
+        starts, event_filter = {}, Q()
+        for flock_id, flock in flocks.items():
+            if flock_id in bases:
+                starts[flock_id] = plans[flock_id]
+                event_filter |= Q(flock_id=flock_id, event_date__gte=starts[flock_id])
+            else:
+                # Full rebuild; events dated before acquisition fold into day one.
+                starts[flock_id] = flock['date_acquired']
+                bases[flock_id] = flock['initial_count']
+                event_filter |= Q(flock_id=flock_id)
+
+        events = defaultdict(list)
+        rows = (
+            FlockEvent.objects
+            .filter(event_filter, event_date__lte=until)
+            .annotate(running=Window(
+                Sum(signed_quantity()),
+                partition_by=[F('flock_id')],
+                order_by=F('event_date').asc(),
+            ))
+            .values_list('flock_id', 'event_date', 'event_type', 'quantity', 'running')
+            .order_by('flock_id', 'event_date')
+        )
+        for flock_id, *event in rows:
+            events[flock_id].append(event)
+
+        population = []
+        for flock_id, start in starts.items():
+            base, flock_events, index, running = bases[flock_id], events[flock_id], 0, 0
+            # The window frame includes same-day peers, so `running` is the
+            # total through the end of the event's date.
+            while index < len(flock_events) and flock_events[index][0] < start:
+                running = flock_events[index][3]
+                index += 1
+            opening = max(base + running, 0)
+            day = start
+            while day <= until:
+                counts = defaultdict(int)
+                while index < len(flock_events) and flock_events[index][0] == day:
+                    _, event_type, quantity, running = flock_events[index]
+                    if event_type in EVENT_COLUMNS:
+                        counts[EVENT_COLUMNS[event_type]] += quantity
+                    index += 1
+                closing = max(base + running, 0)
+                population.append(FlockDailyPopulation(
+                    flock_id=flock_id, date=day, opening_count=opening, closing_count=closing, **counts,
+                ))
+                opening = closing
+                day += timedelta(days=1)
+
+        stale = Q()
+        for flock_id, start in starts.items():
+            stale |= Q(flock_id=flock_id, date__gte=start)
+        FlockDailyPopulation.objects.filter(stale).delete()
+        FlockDailyPopulation.objects.bulk_create(population, batch_size=2000)
+    return len(population)
+
+
+def rebuild_population(flock_ids=None, from_date=None, until=None):
+    """
+    Rebuild population rows for the given flocks (default: all) from
+    from_date (default: each flock's date_acquired) to `until`
+    (default: today). Returns rows written.
+    """
+    until = until or timezone.localdate()
+    if flock_ids is None:
+        flock_ids = Flock.objects.values_list('pk', flat=True)
+    return _rebuild({flock_id: from_date for flock_id in flock_ids}, until)
+
+
+def extend_population(until=None):
+    """
+    Bring every flock's rows up to `until` (default: today). Costs one
+    query when all series are already current.
+    """
+    until = until or timezone.localdate()
+    # What is missing is decided from these reads; never a lagging replica.
+    stick_to_primary()
+    latest = (
+        Flock.objects
+        .filter(date_acquired__lte=until)
+        .annotate(last_date=Max('daily_population__date'))
+        .filter(Q(last_date__isnull=True) | Q(last_date__lt=until))
+        .values_list('pk', 'last_date')
+    )
+    plans = {
+        flock_id: last_date + timedelta(days=1) if last_date else None
+        for flock_id, last_date in latest
+    }
+    return _rebuild(plans, until) if plans else 0
@@ -1,5 +1,6 @@
+from decimal import Decimal
 from rest_framework import serializers
-from .models import Flock, FlockEvent, EggProductionLog
+from .models import Flock, FlockEvent, EggProductionLog, FlockDailyPopulation, LayRateAlert
 
 
 class FlockEventSerializer(serializers.ModelSerializer):
@@ -52,4 +53,43 @@ class FlockSerializer(serializers.ModelSerializer):
             'initial_count', 'current_count', 'status', 'status_display',
             'notes', 'events', 'egg_logs', 'created_at', 'updated_at',
         ]
-        read_only_fields = ['current_count', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['current_count', 'created_at', 'updated_at']
+
+
+class FlockDailyPopulationSerializer(serializers.ModelSerializer):
+    flock_name = serializers.CharField(source='flock.name', read_only=True)
+    crates = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    crates_per_bird = serializers.SerializerMethodField()
+    mortality_percent = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FlockDailyPopulation
+        fields = [
+            'id', 'flock', 'flock_name', 'date', 'opening_count',
+            'purchases', 'deaths', 'culls', 'removals', 'closing_count',
+            'crates', 'crates_per_bird', 'mortality_percent',
+        ]
+        read_only_fields = fields
+
+    def get_crates_per_bird(self, obj):
+        if obj.crates is None or not obj.closing_count:
+            return None
+        return str((obj.crates / obj.closing_count).quantize(Decimal('0.0001')))
+
+    def get_mortality_percent(self, obj):
+        if not obj.opening_count:
+            return None
+        return str((Decimal(obj.deaths + obj.culls) / obj.opening_count * 100).quantize(Decimal('0.01')))
+
+
+class LayRateAlertSerializer(serializers.ModelSerializer):
+    flock_name = serializers.CharField(source='flock.name', read_only=True)
+
+    class Meta:
+        model = LayRateAlert
+        fields = [
+            'id', 'flock', 'flock_name', 'date', 'birds', 'crates', 'lay_rate',
+            'mean_7', 'mean_28', 'std_28', 'z_score', 'drop_percent', 'severity',
+            'acknowledged', 'acknowledged_at', 'created_at',
+        ]
+        read_only_fields = fields
@@ -1,7 +1,8 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.db.models import Sum
-from .models import FlockEvent, EggProductionLog
+from django.db.models import QuerySet, Sum
+from .models import Flock, FlockDailyPopulation, FlockEvent, EggProductionLog
 
 
 @receiver(post_save, sender=FlockEvent)
@@ -66,4 +67,90 @@ def sync_intake_on_save(sender, instance, **kwargs):
 
 @receiver(post_delete, sender=EggProductionLog)
 def sync_intake_on_delete(sender, instance, **kwargs):
-    _sync_intake_log(instance.recorded_date)
\ No newline at end of file
+    _sync_intake_log(instance.recorded_date)
+
+
+@receiver([post_save, post_delete], sender=EggProductionLog)
+@receiver([post_save, post_delete], sender=FlockEvent)
+def replay_lay_rate(sender, instance, **kwargs):
+    """Rescore lay rates from this date if the monitor has already passed it."""
+    from .monitoring import request_replay
+
+    day = instance.recorded_date if sender is EggProductionLog else instance.event_date
+    request_replay(instance.flock_id, day)
+
+
+@receiver(pre_save, sender=FlockEvent)
+def remember_event_date(sender, instance, **kwargs):
+    """Stash the stored event_date so a moved event rebuilds from the earlier date."""
+    instance._previous_event_date = None
+    if instance.pk:
+        instance._previous_event_date = (
+            FlockEvent.objects.filter(pk=instance.pk).values_list('event_date', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=FlockEvent)
+def rebuild_population_on_event(sender, instance, **kwargs):
+    """Head counts carry forward, so rebuild the flock from the event's date."""
+    from .population import rebuild_population
+
+    day = instance.event_date
+    previous = getattr(instance, '_previous_event_date', None)
+    if previous and previous < day:
+        day = previous
+    rebuild_population([instance.flock_id], from_date=day)
+
+
+@receiver(post_delete, sender=FlockEvent)
+def rebuild_population_on_event_delete(sender, instance, origin=None, **kwargs):
+    """
+    Rebuild once per flock per delete() call, from its earliest deleted
+    event, after the delete commits. Nothing is rebuilt when the flock
+    itself is being deleted: rows written mid-cascade would be missed by
+    the collector and break the flock's own delete.
+    """
+    if isinstance(origin, Flock) or (isinstance(origin, QuerySet) and origin.model is Flock):
+        return
+    from .population import rebuild_population
+
+    holder = origin if origin is not None else instance
+    plans = holder.__dict__.get('_population_plans')
+    if plans is None:
+        plans = holder._population_plans = {}
+
+        def rebuild():
+            # A flock deleted meanwhile is skipped by rebuild_population.
+            for flock_id, day in plans.items():
+                rebuild_population([flock_id], from_date=day)
+        transaction.on_commit(rebuild)
+    day = plans.get(instance.flock_id)
+    if day is None or instance.event_date < day:
+        plans[instance.flock_id] = instance.event_date
+
+
+# Flock fields the population history is built from.
+POPULATION_FIELDS = ('initial_count', 'date_acquired')
+
+
+@receiver(pre_save, sender=Flock)
+def remember_population_fields(sender, instance, update_fields=None, **kwargs):
+    """Stash the stored POPULATION_FIELDS so a save that keeps them rebuilds nothing."""
+    instance._previous_population_fields = None
+    if instance.pk and (update_fields is None or set(update_fields) & set(POPULATION_FIELDS)):
+        instance._previous_population_fields = (
+            Flock.objects.filter(pk=instance.pk).values_list(*POPULATION_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=Flock)
+def rebuild_population_on_flock(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_population_fields', None)
+    if not created and (previous is None or previous == (instance.initial_count, instance.date_acquired)):
+        return
+    from .population import rebuild_population
+
+    if previous is not None and previous[1] < instance.date_acquired:
+        # Acquired later than recorded: days before it are no longer history.
+        FlockDailyPopulation.objects.filter(flock=instance, date__lt=instance.date_acquired).delete()
+    rebuild_population([instance.pk])
@@ -1,3 +1,210 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+
+from core import audit
+
+from . import monitoring, population
+from .models import EggProductionLog, Flock, FlockDailyPopulation, FlockEvent, FlockLayRateState, LayRateAlert
+
+
+def closing_counts(flock):
+    return list(flock.daily_population.order_by('date').values_list('closing_count', flat=True))
+
+
+class PopulationSignalTests(TestCase):
+
+    def setUp(self):
+        # Entries queued by executed on_commit callbacks go into this test's transaction.
+        self.addCleanup(audit.buffer.flush)
+        self.today = timezone.localdate()
+        self.flock = Flock.objects.create(
+            name='House 1', date_acquired=self.today - timedelta(days=9), initial_count=100, current_count=100,
+        )
+        for days_ago in (8, 6, 4, 2):
+            FlockEvent.objects.create(flock=self.flock, event_type='death', quantity=1,
+                                      event_date=self.today - timedelta(days=days_ago))
+
+    def test_deleting_a_flock_with_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flock.delete()
+        connection.check_constraints()
+        self.assertFalse(FlockDailyPopulation.objects.exists())
+        self.assertFalse(FlockEvent.objects.exists())
+
+    def test_deleting_a_flock_rebuilds_nothing(self):
+        with mock.patch('flock.population.rebuild_population') as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.flock.delete()
+        rebuild.assert_not_called()
+
+    def test_bulk_event_delete_rebuilds_each_flock_once(self):
+        with mock.patch('flock.population.rebuild_population') as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                FlockEvent.objects.filter(flock=self.flock, event_date__lte=self.today - timedelta(days=4)).delete()
+        rebuild.assert_called_once_with([self.flock.pk], from_date=self.today - timedelta(days=8))
+
+    def test_bulk_event_delete_restores_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            FlockEvent.objects.filter(flock=self.flock).delete()
+        self.assertEqual(closing_counts(self.flock), [100] * 10)
+
+    def test_save_without_population_changes_rebuilds_nothing(self):
+        self.flock.refresh_from_db()
+        self.flock.notes = 'Moved feeders'
+        with mock.patch('flock.population.rebuild_population') as rebuild:
+            self.flock.save()
+        rebuild.assert_not_called()
+
+    def test_initial_count_change_rebuilds(self):
+        self.flock.refresh_from_db()
+        self.flock.initial_count = 120
+        self.flock.save()
+        self.assertEqual(closing_counts(self.flock), [120, 119, 119, 118, 118, 117, 117, 116, 116, 116])
+
+    def test_later_date_acquired_drops_earlier_days(self):
+        self.flock.refresh_from_db()
+        self.flock.date_acquired = self.today - timedelta(days=5)
+        self.flock.save()
+        first = self.flock.daily_population.order_by('date').first()
+        self.assertEqual(first.date, self.flock.date_acquired)
+        # Events dated before acquisition fold into day one.
+        self.assertEqual(first.closing_count, 98)
+        self.assertEqual(self.flock.daily_population.count(), 6)
+
+
+class PopulationRebuildTests(TestCase):
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.flock = Flock.objects.create(
+            name='House 1', date_acquired=self.today - timedelta(days=9), initial_count=100, current_count=100,
+        )
+        for days_ago, event_type, quantity in [(9, 'death', 2), (7, 'purchase', 10), (5, 'sale', 20),
+                                               (5, 'cull', 3), (2, 'transfer', 100)]:
+            FlockEvent.objects.create(flock=self.flock, event_type=event_type, quantity=quantity,
+                                      event_date=self.today - timedelta(days=days_ago))
+
+    def rows(self):
+        return list(self.flock.daily_population.order_by('date').values_list(
+            'date', 'opening_count', 'purchases', 'deaths', 'culls', 'removals', 'closing_count',
+        ))
+
+    def test_counts_each_event_type(self):
+        rows = self.rows()
+        self.assertEqual([row[-1] for row in rows], [98, 98, 108, 108, 85, 85, 85, 0, 0, 0])
+        self.assertEqual(rows[4][1:], (108, 0, 0, 3, 20, 85))
+        self.assertEqual(rows[0][1], 100)  # day one opens on initial_count
+
+    def test_resume_matches_full_rebuild(self):
+        full = self.rows()
+        FlockDailyPopulation.objects.filter(date__gte=self.today - timedelta(days=5)).update(closing_count=1)
+        population.rebuild_population([self.flock.pk], from_date=self.today - timedelta(days=5))
+        self.assertEqual(self.rows(), full)
+
+    def test_resume_without_base_row_rebuilds_fully(self):
+        full = self.rows()
+        FlockDailyPopulation.objects.all().delete()
+        population.rebuild_population([self.flock.pk], from_date=self.today - timedelta(days=5))
+        self.assertEqual(self.rows(), full)
+
+    def test_extend_resumes_from_last_row(self):
+        full = self.rows()
+        FlockDailyPopulation.objects.filter(date__gt=self.today - timedelta(days=4)).delete()
+        self.assertEqual(population.extend_population(), 4)
+        self.assertEqual(self.rows(), full)
+        with self.assertNumQueries(1):
+            self.assertEqual(population.extend_population(), 0)
+
+    def test_extend_builds_bulk_loaded_flocks(self):
+        flock = Flock.objects.bulk_create([Flock(
+            name='House 2', date_acquired=self.today - timedelta(days=2), initial_count=50, current_count=50,
+        )])[0]
+        self.assertEqual(population.extend_population(), 3)
+        self.assertEqual(list(flock.daily_population.values_list('closing_count', flat=True)), [50] * 3)
+
+
+class LayRateScoreTests(TestCase):
+    DAY = date(2026, 3, 1)
+
+    def window(self, rates):
+        return [(self.DAY - timedelta(days=offset + 1), rate) for offset, rate in enumerate(rates)]
+
+    def test_thin_baseline_is_not_scored(self):
+        window = self.window([0.3] * (monitoring.MIN_BASELINE_POINTS - 1))
+        self.assertIsNone(monitoring.score(0.1, window, self.DAY))
+
+    def test_days_outside_the_baseline_are_ignored(self):
+        window = self.window([0.3] * 28 + [0.9] * 10)
+        stats = monitoring.score(0.3, window, self.DAY)
+        self.assertAlmostEqual(stats['mean_28'], 0.3)
+        self.assertAlmostEqual(stats['mean_7'], 0.3)
+
+    def test_severity_needs_both_deviation_and_drop(self):
+        noisy = self.window([0.29, 0.31] * 14)
+        self.assertIsNone(monitoring.severity(monitoring.score(0.285, noisy, self.DAY)))  # only 5% down
+        self.assertEqual(monitoring.severity(monitoring.score(0.265, noisy, self.DAY)), 'warning')
+        self.assertEqual(monitoring.severity(monitoring.score(0.2, noisy, self.DAY)), 'critical')
+
+    def test_flat_baseline_uses_deviation_floor(self):
+        flat = self.window([0.3] * 28)
+        stats = monitoring.score(0.297, flat, self.DAY)
+        self.assertAlmostEqual(stats['z_score'], -0.5)
+        self.assertIsNone(monitoring.severity(stats))
+
+
+class LayRateMonitorTests(TestCase):
+    START = date(2026, 1, 1)
+    DROP = date(2026, 1, 31)
+
+    def setUp(self):
+        self.flock = Flock.objects.create(name='House 1', date_acquired=self.START,
+                                          initial_count=100, current_count=100)
+        EggProductionLog.objects.bulk_create([
+            EggProductionLog(flock=self.flock, recorded_date=self.START + timedelta(days=offset),
+                             big_crates=Decimal('29' if offset % 2 else '31'))
+            for offset in range(30)
+        ])
+        self.drop = EggProductionLog.objects.create(flock=self.flock, recorded_date=self.DROP,
+                                                    big_crates=Decimal('15'))
+
+    def test_run_alerts_then_only_reads_new_days(self):
+        self.assertEqual(monitoring.run(until=self.DROP), (1, 31, 1))
+        alert = LayRateAlert.objects.get()
+        self.assertEqual((alert.date, alert.severity, alert.birds), (self.DROP, 'critical', 100))
+        self.assertEqual(monitoring.run(until=self.DROP), (0, 0, 0))
+        self.assertEqual(FlockLayRateState.objects.get().last_processed_date, self.DROP)
+
+    def test_rate_uses_birds_on_hand_that_day(self):
+        FlockEvent.objects.create(flock=self.flock, event_type='death', quantity=50, event_date=self.DROP)
+        self.assertEqual(monitoring.run(until=self.DROP), (1, 31, 0))
+
+    def test_edited_log_replays_and_clears_alert(self):
+        monitoring.run(until=self.DROP)
+        self.drop.big_crates = Decimal('30')
+        self.drop.save()
+        self.assertEqual(FlockLayRateState.objects.get().replay_from, self.DROP)
+        self.assertEqual(monitoring.run(until=self.DROP), (1, 1, 0))
+        self.assertFalse(LayRateAlert.objects.exists())
+        self.assertIsNone(FlockLayRateState.objects.get().replay_from)
+
+    def test_replay_keeps_acknowledged_alerts(self):
+        monitoring.run(until=self.DROP)
+        LayRateAlert.objects.update(acknowledged=True)
+        FlockEvent.objects.create(flock=self.flock, event_type='death', quantity=1, event_date=self.DROP)
+        self.assertEqual(monitoring.run(until=self.DROP), (1, 1, 1))
+        self.assertTrue(LayRateAlert.objects.get().acknowledged)
 
-# Create your tests here.
+    def test_replay_matches_a_fresh_run(self):
+        monitoring.run(until=self.DROP - timedelta(days=1))
+        EggProductionLog.objects.filter(recorded_date=self.DROP - timedelta(days=5)).update(big_crates=Decimal('31'))
+        monitoring.request_replay(self.flock.pk, self.DROP - timedelta(days=5))
+        monitoring.run(until=self.DROP)
+        replayed = FlockLayRateState.objects.get().window
+        FlockLayRateState.objects.all().delete()
+        monitoring.run(until=self.DROP)
+        self.assertEqual(FlockLayRateState.objects.get().window, replayed)
@@ -1,11 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import FlockViewSet, FlockEventViewSet, EggProductionLogViewSet
+from .views import (
+    FlockViewSet, FlockEventViewSet, EggProductionLogViewSet, FlockDailyPopulationViewSet,
+    LayRateAlertViewSet,
+)
 
 router = DefaultRouter()
 router.register(r'flocks', FlockViewSet, basename='flock')
 router.register(r'events', FlockEventViewSet, basename='flock-event')
 router.register(r'egg-production', EggProductionLogViewSet, basename='egg-production')
+router.register(r'population', FlockDailyPopulationViewSet, basename='flock-population')
+router.register(r'alerts', LayRateAlertViewSet, basename='lay-rate-alert')
 
 app_name = 'flock'
 
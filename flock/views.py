@@ -1,12 +1,21 @@
 from rest_framework import viewsets, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Flock, FlockEvent, EggProductionLog
-from .serializers import FlockSerializer, FlockEventSerializer, EggProductionLogSerializer
+from core.db_router import ReplicaReadMixin
+from .models import Flock, FlockEvent, EggProductionLog, FlockDailyPopulation, LayRateAlert
+from .population import extend_population
+from .serializers import (
+    FlockSerializer, FlockEventSerializer, EggProductionLogSerializer,
+    FlockDailyPopulationSerializer, LayRateAlertSerializer,
+)
 
 
-class FlockViewSet(viewsets.ModelViewSet):
+class FlockViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Flock.objects.prefetch_related('events', 'egg_logs').all()
     serializer_class = FlockSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -35,7 +44,7 @@ class FlockViewSet(viewsets.ModelViewSet):
         })
 
 
-class FlockEventViewSet(viewsets.ModelViewSet):
+class FlockEventViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = FlockEvent.objects.select_related('flock').all()
     serializer_class = FlockEventSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -45,11 +54,116 @@ class FlockEventViewSet(viewsets.ModelViewSet):
     ordering = ['-event_date']
 
 
-class EggProductionLogViewSet(viewsets.ModelViewSet):
+class EggProductionLogViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = EggProductionLog.objects.select_related('flock').all()
     serializer_class = EggProductionLogSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['flock', 'recorded_date']
     ordering_fields = ['recorded_date', 'created_at']
-    ordering = ['-recorded_date']
\ No newline at end of file
+    ordering = ['-recorded_date']
+
+
+class FlockDailyPopulationViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Daily head count per flock, with that day's egg production.
+    Query params: flock, date, start_date, end_date (YYYY-MM-DD).
+    """
+    serializer_class = FlockDailyPopulationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['flock', 'date']
+    ordering_fields = ['date', 'closing_count']
+    ordering = ['-date', 'flock']
+
+    def get_queryset(self):
+        extend_population()
+        crates = (
+            EggProductionLog.objects
+            .filter(flock=OuterRef('flock'), recorded_date=OuterRef('date'))
+            .annotate(total=ExpressionWrapper(
+                F('broken_crates') + F('small_crates') + F('medium_crates') + F('big_crates'),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ))
+            .values('total')[:1]
+        )
+        queryset = (
+            FlockDailyPopulation.objects
+            .select_related('flock')
+            .annotate(crates=Subquery(crates, output_field=DecimalField(max_digits=10, decimal_places=2)))
+        )
+        start_date = self.request.query_params.get('start_date')
+        end_date = self.request.query_params.get('end_date')
+        if start_date:
+            queryset = queryset.filter(date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(date__lte=end_date)
+        return queryset
+
+    @action(detail=False, methods=['get'], url_path='daily')
+    def daily(self, request):
+        """
+        Farm-wide totals per day: birds, mortality and crates per bird.
+        Query params: start_date, end_date (default: the last 30 days).
+        """
+        try:
+            end_date = date.fromisoformat(request.query_params.get('end_date') or timezone.localdate().isoformat())
+            start_date = date.fromisoformat(
+                request.query_params.get('start_date') or (end_date - timedelta(days=29)).isoformat()
+            )
+        except ValueError:
+            return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=400)
+        if start_date > end_date:
+            return Response({'error': 'start_date must be on or before end_date'}, status=400)
+
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .filter(date__range=[start_date, end_date])
+            .values('date')
+            .annotate(
+                opening_count=Sum('opening_count'),
+                purchases=Sum('purchases'),
+                deaths=Sum('deaths'),
+                culls=Sum('culls'),
+                removals=Sum('removals'),
+                closing_count=Sum('closing_count'),
+                crates=Sum('crates'),
+            )
+            .order_by('date')
+        )
+        days = []
+        for row in rows:
+            crates = Decimal(row['crates'] or 0).quantize(Decimal('0.01'))
+            days.append({
+                **row,
+                'crates': str(crates),
+                'crates_per_bird': (
+                    str((crates / row['closing_count']).quantize(Decimal('0.0001')))
+                    if row['closing_count'] else None
+                ),
+                'mortality_percent': (
+                    str((Decimal(row['deaths'] + row['culls']) / row['opening_count'] * 100).quantize(Decimal('0.01')))
+                    if row['opening_count'] else None
+                ),
+            })
+        return Response({'start_date': start_date, 'end_date': end_date, 'days': days})
+
+
+class LayRateAlertViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """Lay-rate anomalies raised by the production monitor (manage.py monitor_lay_rate)."""
+    queryset = LayRateAlert.objects.select_related('flock').all()
+    serializer_class = LayRateAlertSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['flock', 'severity', 'acknowledged', 'date']
+    ordering_fields = ['date', 'z_score', 'drop_percent']
+    ordering = ['-date']
+
+    @action(detail=True, methods=['post'], url_path='acknowledge')
+    def acknowledge(self, request, pk=None):
+        alert = self.get_object()
+        if not alert.acknowledged:
+            alert.acknowledged = True
+            alert.acknowledged_at = timezone.now()
+            alert.save(update_fields=['acknowledged', 'acknowledged_at'])
+        return Response(self.get_serializer(alert).data)
@@ -0,0 +1,84 @@
+"""
+Cached egg types and price tiers.
+
+Both tables are tiny and rarely change but are read on hot paths: the
+current-prices endpoint the sale form loads, and the by-name egg type
+lookups in reports. Each is one query into the 'lookups' cache, read
+from the primary so a lagging replica can't refill it with old rows, and
+dropped whenever an EggType or PriceTier is saved or deleted (see
+inventory/signals.py). warm() fills both at boot (core/startup.py).
+
+Pricing a sale item still queries PriceTier directly: with the default
+per-process cache another worker may hold a superseded price for up to
+LOOKUP_CACHE_TTL seconds, which is fine for display but not for money.
+"""
+from django.core.cache import caches
+
+from core.db_router import DEFAULT
+
+CACHE_ALIAS = 'lookups'
+
+EGG_TYPES_KEY = 'inventory:egg_types'
+PRICE_TIERS_KEY = 'inventory:price_tiers'
+
+
+def lookup_cache():
+    return caches[CACHE_ALIAS]
+
+
+def egg_types():
+    """Every egg type, in display order."""
+    from .models import EggType
+
+    cache = lookup_cache()
+    types = cache.get(EGG_TYPES_KEY)
+    if types is None:
+        types = list(EggType.objects.using(DEFAULT).order_by('order', 'name'))
+        cache.set(EGG_TYPES_KEY, types)
+    return types
+
+
+def active_egg_types():
+    return [egg_type for egg_type in egg_types() if egg_type.is_active]
+
+
+def egg_types_by_name():
+    return {egg_type.name: egg_type for egg_type in egg_types()}
+
+
+def price_history():
+    """{(tier, egg_type_id): [(effective_date, price_per_crate), ...]}, newest first; active tiers only."""
+    from .models import PriceTier
+
+    cache = lookup_cache()
+    history = cache.get(PRICE_TIERS_KEY)
+    if history is None:
+        history = {}
+        rows = (
+            PriceTier.objects.using(DEFAULT).filter(is_active=True)
+            .order_by('-effective_date')
+            .values_list('tier', 'egg_type_id', 'effective_date', 'price_per_crate')
+        )
+        for tier, egg_type_id, effective_date, price in rows:
+            history.setdefault((tier, egg_type_id), []).append((effective_date, price))
+        cache.set(PRICE_TIERS_KEY, history)
+    return history
+
+
+def current_price(tier, egg_type_id, on_date, history=None):
+    """The price in effect on `on_date`, or None when there is none yet."""
+    if history is None:
+        history = price_history()
+    for effective_date, price in history.get((tier, egg_type_id), ()):
+        if effective_date <= on_date:
+            return price
+    return None
+
+
+def invalidate():
+    lookup_cache().delete_many([EGG_TYPES_KEY, PRICE_TIERS_KEY])
+
+
+def warm():
+    egg_types()
+    price_history()
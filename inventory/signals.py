@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import lookups
+from .models import EggType, PriceTier
+
+
+@receiver(post_save, sender=EggType)
+@receiver(post_delete, sender=EggType)
+@receiver(post_save, sender=PriceTier)
+@receiver(post_delete, sender=PriceTier)
+def forget_lookups(sender, **kwargs):
+    # Again on commit: a request refilling the cache meanwhile still saw
+    # the old rows.
+    lookups.invalidate()
+    transaction.on_commit(lookups.invalidate)
@@ -2,12 +2,14 @@ from rest_framework import viewsets, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from core.db_router import ReplicaReadMixin
+from . import lookups
 from .models import EggType, PriceTier, IntakeLog
 from .serializers import EggTypeSerializer, PriceTierSerializer, IntakeLogSerializer
 from django.utils import timezone  # Added import for timezone
 
 
-class EggTypeViewSet(viewsets.ModelViewSet):
+class EggTypeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing egg types.
     """
@@ -20,7 +22,7 @@ class EggTypeViewSet(viewsets.ModelViewSet):
     ordering = ['order', 'name']
 
 
-class PriceTierViewSet(viewsets.ModelViewSet):
+class PriceTierViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing price tiers (retail & wholesale).
     """
@@ -47,28 +49,24 @@ class PriceTierViewSet(viewsets.ModelViewSet):
         else:  # wholesale
             tier = 'wholesale_base'
         
-        # Get the most recent active price for each egg type
+        # Get the most recent active price for each egg type (cached lookups)
         current_prices = []
-        egg_types = EggType.objects.filter(is_active=True)
+        history = lookups.price_history()
+        today = timezone.now().date()
         
-        for egg_type in egg_types:
-            current_price = PriceTier.objects.filter(
-                egg_type=egg_type,
-                tier=tier,
-                is_active=True,
-                effective_date__lte=timezone.now().date()
-            ).order_by('-effective_date').first()
+        for egg_type in lookups.active_egg_types():
+            current_price = lookups.current_price(tier, egg_type.id, today, history)
             
             current_prices.append({
                 'egg_type_id': egg_type.id,
                 'egg_type_name': egg_type.name,
-                'price_per_crate': float(current_price.price_per_crate) if current_price else 0.0
+                'price_per_crate': float(current_price) if current_price is not None else 0.0
             })
         
         return Response(current_prices)
 
 
-class IntakeLogViewSet(viewsets.ModelViewSet):
+class IntakeLogViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing daily intake logs.
     """
@@ -0,0 +1,147 @@
+"""
+Receivables aging for wholesale customers.
+
+A sale's open amount is its total less the upfront payment and the
+credit payments tied to it. Credit payments not tied to a sale (and any
+overpayment of a sale) settle the customer's oldest debt first, as
+CreditPaymentViewSet does when it records them.
+
+receivables_aging() costs two queries however long the credit history:
+
+  sales     grouped by customer and age bucket (a CASE on sale_datetime),
+            summing the open amounts, totals and upfront payments
+  payments  all credit payments per customer
+
+The bucket sums count each sale's open amount only when positive; the
+difference from the customer's net balance (purchases - upfront -
+payments) is the credit still to apply, which is taken from the oldest
+bucket down. Customers without sales up to `as_of` are left out.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import (
+    Case, CharField, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from core.concurrency import run_concurrently
+from sales.models import CreditPayment, Sale, local_date_bounds
+
+ZERO = Decimal('0.00')
+
+# (key, label, minimum age in days), youngest first. A sale's age is
+# as_of minus its local sale date.
+AGING_BUCKETS = (
+    ('days_0_30', '0-30 days', 0),
+    ('days_31_60', '31-60 days', 31),
+    ('days_61_90', '61-90 days', 61),
+    ('days_over_90', '90+ days', 91),
+)
+
+BUCKET_KEYS = [key for key, _, _ in AGING_BUCKETS]
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _cents(value):
+    # SQLite sums decimals in floating point; keep cents.
+    return Decimal(value or 0).quantize(ZERO)
+
+
+def _bucket_expression(as_of):
+    """CASE mapping sale_datetime to its bucket key."""
+    whens = []
+    for key, _, min_age in reversed(AGING_BUCKETS[1:]):
+        # Sold on or before as_of - min_age: strictly before the next day.
+        _, upper = local_date_bounds(as_of - timedelta(days=min_age))
+        whens.append(When(sale_datetime__lt=upper, then=Value(key)))
+    return Case(*whens, default=Value(BUCKET_KEYS[0]), output_field=CharField())
+
+
+def receivables_aging(as_of):
+    """
+    Outstanding wholesale balances as of the end of `as_of`, per customer
+    and age bucket, largest balance first.
+    """
+    _, upper = local_date_bounds(as_of)
+
+    tied_credit = (
+        CreditPayment.objects
+        .filter(sale=OuterRef('pk'), payment_date__lt=upper)
+        .values('sale')
+        .annotate(total=Sum('amount_paid'))
+        .values('total')
+    )
+    open_amount = ExpressionWrapper(
+        F('total_amount') - F('amount_paid') - Coalesce(Subquery(tied_credit), Value(ZERO), output_field=MONEY),
+        output_field=MONEY,
+    )
+
+    def sales_by_bucket():
+        return list(
+            Sale.objects
+            .filter(customer__isnull=False, sale_datetime__lt=upper)
+            .annotate(bucket=_bucket_expression(as_of))
+            .values('customer_id', 'customer__name', 'bucket')
+            .annotate(
+                open_amount=Sum(Greatest(open_amount, Value(ZERO), output_field=MONEY)),
+                purchased=Sum('total_amount'),
+                upfront=Sum('amount_paid'),
+            )
+            .order_by()
+        )
+
+    def credits_by_customer():
+        return {
+            row['customer_id']: row['total']
+            for row in (
+                CreditPayment.objects
+                .filter(payment_date__lt=upper)
+                .values('customer_id')
+                .annotate(total=Sum('amount_paid'))
+                .order_by()
+            )
+        }
+
+    rows, credits = run_concurrently(sales_by_bucket, credits_by_customer)
+
+    names = {}
+    buckets = defaultdict(lambda: dict.fromkeys(BUCKET_KEYS, ZERO))
+    net = defaultdict(lambda: ZERO)
+    for row in rows:
+        customer_id = row['customer_id']
+        names[customer_id] = row['customer__name']
+        buckets[customer_id][row['bucket']] += _cents(row['open_amount'])
+        net[customer_id] += _cents(row['purchased']) - _cents(row['upfront'])
+
+    customers = []
+    totals = dict.fromkeys(BUCKET_KEYS + ['total', 'unapplied_credit'], ZERO)
+    for customer_id, amounts in buckets.items():
+        balance = net[customer_id] - _cents(credits.get(customer_id))
+        credit = sum(amounts.values()) - balance
+        for key in reversed(BUCKET_KEYS):
+            applied = min(credit, amounts[key])
+            amounts[key] -= applied
+            credit -= applied
+        amounts['total'] = sum(amounts[key] for key in BUCKET_KEYS)
+        amounts['unapplied_credit'] = credit
+        if not amounts['total'] and not credit:
+            continue
+        for key, value in amounts.items():
+            totals[key] += value
+        customers.append({
+            'customer_id': customer_id,
+            'customer_name': names[customer_id],
+            **{key: str(value) for key, value in amounts.items()},
+        })
+    customers.sort(key=lambda c: (-Decimal(c['total']), c['customer_name']))
+
+    return {
+        'as_of': as_of.isoformat(),
+        'buckets': [{'key': key, 'label': label} for key, label, _ in AGING_BUCKETS],
+        'totals': {key: str(value) for key, value in totals.items()},
+        'customer_count': len(customers),
+        'customers': customers,
+    }
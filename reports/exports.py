@@ -0,0 +1,283 @@
+"""
+Bulk data export.
+
+Streams whole transactional tables for a local date range as CSV,
+gzip-compressed CSV or a typed columnar format. Rows come straight from
+``values_list(...).iterator()`` — a server-side cursor on PostgreSQL —
+so no model instances are built and a full-year extract is one pass.
+
+Formats:
+  csv      plain CSV, one header row of column names
+  csv.gz   the same, gzip-compressed on the fly
+  parquet  Apache Parquet (zstd) when pyarrow is installed; otherwise
+           falls back to tcsv.gz
+  tcsv.gz  typed CSV: header cells are ``name:type`` so a loader can cast
+           columns without guessing, gzip-compressed
+
+Used by the ``bulk-export`` report action and ``manage.py export_data``.
+"""
+import csv
+import io
+import zlib
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import date, datetime
+from itertools import islice
+
+from django.apps import apps
+from django.utils import timezone
+
+from sales.models import local_date_bounds
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+# Rows fetched per cursor round trip.
+FETCH_SIZE = 5000
+# Flush CSV output to the client in chunks of roughly this many characters.
+CSV_CHUNK_SIZE = 64 * 1024
+# Rows per Parquet row group.
+PARQUET_ROW_GROUP = 50000
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    lookup: str
+    type: str  # int | decimal | str | date | datetime | bool
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    model: str
+    date_lookup: str
+    columns: tuple
+    ordering: tuple
+    # True when date_lookup is a DateTimeField filtered by local dates.
+    local_datetime: bool = False
+
+    def rows(self, start_date, end_date):
+        """Tuples of raw column values for [start_date, end_date], in order."""
+        model = apps.get_model(self.model)
+        if self.local_datetime:
+            lower, upper = local_date_bounds(start_date, end_date)
+            filters = {f'{self.date_lookup}__gte': lower, f'{self.date_lookup}__lt': upper}
+        else:
+            filters = {f'{self.date_lookup}__range': (start_date, end_date)}
+        return (
+            model.objects
+            .filter(**filters)
+            .order_by(*self.ordering)
+            .values_list(*(c.lookup for c in self.columns))
+            .iterator(chunk_size=FETCH_SIZE)
+        )
+
+
+DATASETS = {d.name: d for d in (
+    # One row per sale item, with its sale header denormalised onto it.
+    Dataset('sales', 'sales.SaleItem', 'sale__sale_datetime', (
+        Column('sale_id', 'sale_id', 'int'),
+        Column('sale_datetime', 'sale__sale_datetime', 'datetime'),
+        Column('sale_type', 'sale__sale_type', 'str'),
+        Column('customer_id', 'sale__customer_id', 'int'),
+        Column('customer_name', 'sale__customer__name', 'str'),
+        Column('payment_status', 'sale__payment_status', 'str'),
+        Column('sale_total', 'sale__total_amount', 'decimal'),
+        Column('sale_amount_paid', 'sale__amount_paid', 'decimal'),
+        Column('item_id', 'id', 'int'),
+        Column('egg_type', 'egg_type__name', 'str'),
+        Column('quantity', 'quantity', 'int'),
+        Column('price_per_crate', 'price_per_crate', 'decimal'),
+        Column('line_total', 'line_total', 'decimal'),
+    ), ('sale__sale_datetime', 'sale_id', 'id'), local_datetime=True),
+
+    Dataset('credit_payments', 'sales.CreditPayment', 'payment_date', (
+        Column('id', 'id', 'int'),
+        Column('payment_date', 'payment_date', 'datetime'),
+        Column('customer_id', 'customer_id', 'int'),
+        Column('customer_name', 'customer__name', 'str'),
+        Column('sale_id', 'sale_id', 'int'),
+        Column('amount_paid', 'amount_paid', 'decimal'),
+        Column('notes', 'notes', 'str'),
+    ), ('payment_date', 'id'), local_datetime=True),
+
+    Dataset('expenses', 'expenses.Expense', 'date', (
+        Column('id', 'id', 'int'),
+        Column('date', 'date', 'date'),
+        Column('category', 'category__name', 'str'),
+        Column('description', 'description', 'str'),
+        Column('amount', 'amount', 'decimal'),
+        Column('payment_method', 'payment_method', 'str'),
+        Column('is_recurring', 'is_recurring', 'bool'),
+        Column('recurrence_pattern', 'recurrence_pattern', 'str'),
+        Column('notes', 'notes', 'str'),
+    ), ('date', 'id')),
+
+    Dataset('intake', 'inventory.IntakeLog', 'recorded_date', (
+        Column('id', 'id', 'int'),
+        Column('recorded_date', 'recorded_date', 'date'),
+        Column('broken_crates', 'broken_crates', 'int'),
+        Column('small_crates', 'small_crates', 'int'),
+        Column('medium_crates', 'medium_crates', 'int'),
+        Column('big_crates', 'big_crates', 'int'),
+        Column('notes', 'notes', 'str'),
+    ), ('recorded_date',)),
+
+    Dataset('egg_production', 'flock.EggProductionLog', 'recorded_date', (
+        Column('id', 'id', 'int'),
+        Column('flock_id', 'flock_id', 'int'),
+        Column('flock_name', 'flock__name', 'str'),
+        Column('recorded_date', 'recorded_date', 'date'),
+        Column('broken_crates', 'broken_crates', 'decimal'),
+        Column('small_crates', 'small_crates', 'decimal'),
+        Column('medium_crates', 'medium_crates', 'decimal'),
+        Column('big_crates', 'big_crates', 'decimal'),
+        Column('notes', 'notes', 'str'),
+    ), ('recorded_date', 'flock_id', 'id')),
+
+    Dataset('flock_events', 'flock.FlockEvent', 'event_date', (
+        Column('id', 'id', 'int'),
+        Column('flock_id', 'flock_id', 'int'),
+        Column('flock_name', 'flock__name', 'str'),
+        Column('event_type', 'event_type', 'str'),
+        Column('quantity', 'quantity', 'int'),
+        Column('event_date', 'event_date', 'date'),
+        Column('notes', 'notes', 'str'),
+    ), ('event_date', 'id')),
+)}
+
+FORMATS = ('csv', 'csv.gz', 'parquet', 'tcsv.gz')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'csv.gz': 'application/gzip',
+    'tcsv.gz': 'application/gzip',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+Export = namedtuple('Export', 'chunks format content_type filename')
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+def iter_csv(dataset, rows, typed=False):
+    """Encoded CSV chunks: a header row, then one row per tuple."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([f'{c.name}:{c.type}' if typed else c.name for c in dataset.columns])
+    for row in rows:
+        writer.writerow([_csv_value(v) for v in row])
+        if buffer.tell() >= CSV_CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a byte-chunk stream into a single gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes can be taken out."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_parquet(dataset, rows):
+    """Parquet file bytes, emitted as each row group is written."""
+    arrow_types = {
+        'int': pyarrow.int64(),
+        'decimal': pyarrow.decimal128(14, 2),
+        'str': pyarrow.string(),
+        'date': pyarrow.date32(),
+        'datetime': pyarrow.timestamp('us', tz='UTC'),
+        'bool': pyarrow.bool_(),
+    }
+    schema = pyarrow.schema([(c.name, arrow_types[c.type]) for c in dataset.columns])
+    sink = _DrainableSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        while True:
+            batch = list(islice(rows, PARQUET_ROW_GROUP))
+            if not batch:
+                break
+            arrays = [
+                pyarrow.array(values, type=field.type)
+                for values, field in zip(zip(*batch), schema)
+            ]
+            writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def resolve_format(fmt):
+    """The format actually produced for a requested one."""
+    if fmt == 'parquet' and pyarrow is None:
+        return 'tcsv.gz'
+    return fmt
+
+
+def export(dataset_name, start_date, end_date, fmt='csv'):
+    """
+    Lazily export one dataset. Raises ValueError for an unknown dataset
+    or format; no query runs until the chunks are consumed.
+    """
+    if dataset_name not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset_name}'. Choose from: {', '.join(DATASETS)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Choose from: {', '.join(FORMATS)}")
+
+    dataset = DATASETS[dataset_name]
+    fmt = resolve_format(fmt)
+    rows = dataset.rows(start_date, end_date)
+    if fmt == 'parquet':
+        chunks = iter_parquet(dataset, rows)
+    elif fmt == 'csv':
+        chunks = iter_csv(dataset, rows)
+    else:
+        chunks = gzip_chunks(iter_csv(dataset, rows, typed=fmt == 'tcsv.gz'))
+
+    filename = f'{dataset.name}_{start_date}_to_{end_date}.{fmt}'
+    return Export(chunks, fmt, CONTENT_TYPES[fmt], filename)
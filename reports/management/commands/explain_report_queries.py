@@ -0,0 +1,98 @@
+"""
+Print the query plans behind every ReportViewSet action.
+
+Each action is executed in-process with its SQL captured, then every
+SELECT it issued is run again under EXPLAIN (EXPLAIN ANALYZE on
+Postgres). Run it after migrations to spot index regressions:
+
+    python manage.py explain_report_queries --start-date 2026-01-01 --end-date 2026-03-31
+    python manage.py explain_report_queries --action sales_report --action customer_report
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from reports.views import ReportViewSet
+
+
+class Command(BaseCommand):
+    help = 'Run each report action and print EXPLAIN output for the queries it issues.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='Report range start (YYYY-MM-DD). Default: 30 days ago.')
+        parser.add_argument('--end-date', help='Report range end (YYYY-MM-DD). Default: today.')
+        parser.add_argument(
+            '--action', action='append', dest='actions',
+            help='Report action name (e.g. sales_report). Repeatable. Default: all.'
+        )
+        parser.add_argument(
+            '--no-analyze', action='store_true',
+            help='Plain EXPLAIN on Postgres (do not execute the queries).'
+        )
+        parser.add_argument('--max-sql', type=int, default=300, help='Truncate printed SQL to N chars.')
+
+    def handle(self, *args, **options):
+        end_date = options['end_date'] or timezone.localdate().isoformat()
+        start_date = options['start_date'] or (timezone.localdate() - timedelta(days=29)).isoformat()
+        params = {
+            'date': end_date,
+            'start_date': start_date,
+            'end_date': end_date,
+            'start': start_date,
+            'end': end_date,
+        }
+
+        available = {a.__name__: a for a in ReportViewSet.get_extra_actions()}
+        names = options['actions'] or sorted(available)
+        unknown = [n for n in names if n not in available]
+        if unknown:
+            raise CommandError(f"Unknown action(s): {', '.join(unknown)}. Choose from: {', '.join(sorted(available))}")
+
+        factory = APIRequestFactory()
+        user = User(username='explain', is_active=True)
+        analyze = connection.vendor == 'postgresql' and not options['no_analyze']
+
+        for name in names:
+            url_path = available[name].url_path
+            request = factory.get(f'/api/reports/{url_path}/', params)
+            force_authenticate(request, user=user)
+            view = ReportViewSet.as_view({'get': name})
+
+            with CaptureQueriesContext(connection) as ctx:
+                response = view(request)
+                if hasattr(response, 'render'):
+                    response.render()
+
+            selects = [q['sql'] for q in ctx.captured_queries if q['sql'].lstrip().upper().startswith('SELECT')]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"\n══ {name} (/api/reports/{url_path}/) — HTTP {response.status_code}, "
+                f"{len(ctx.captured_queries)} queries"
+            ))
+
+            for i, sql in enumerate(selects, start=1):
+                shown = sql if len(sql) <= options['max_sql'] else sql[:options['max_sql']] + ' …'
+                self.stdout.write(self.style.SQL_KEYWORD(f"\n[{i}] {shown}"))
+                for line in self._explain(sql, analyze):
+                    self.stdout.write(f"    {line}")
+
+    def _explain(self, sql, analyze):
+        if connection.vendor == 'postgresql':
+            prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if analyze else 'EXPLAIN '
+        elif connection.vendor == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN '
+        else:
+            prefix = 'EXPLAIN '
+
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            rows = cursor.fetchall()
+
+        if connection.vendor == 'sqlite':
+            # (id, parent, notused, detail)
+            return [row[-1] for row in rows]
+        return [' '.join(str(col) for col in row) for row in rows]
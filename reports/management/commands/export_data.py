@@ -0,0 +1,53 @@
+"""
+Write bulk exports of the transactional tables to files.
+
+    python manage.py export_data --start-date 2025-01-01 --end-date 2025-12-31
+    python manage.py export_data --dataset sales --dataset expenses --format parquet -o /tmp/extract
+"""
+from datetime import date
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.exports import DATASETS, FORMATS, export
+
+
+class Command(BaseCommand):
+    help = 'Export raw sales, payments, expenses, intake and flock data for a date range.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', required=True, help='Range start (YYYY-MM-DD).')
+        parser.add_argument('--end-date', required=True, help='Range end (YYYY-MM-DD), inclusive.')
+        parser.add_argument(
+            '--dataset', action='append', dest='datasets', choices=sorted(DATASETS),
+            help='Dataset to export. Repeatable. Default: all.'
+        )
+        parser.add_argument('--format', default='csv.gz', choices=FORMATS)
+        parser.add_argument('-o', '--output-dir', default='.', help='Directory for the files (created if missing).')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = date.fromisoformat(options['start_date'])
+            end_date = date.fromisoformat(options['end_date'])
+        except ValueError:
+            raise CommandError('Dates must be YYYY-MM-DD')
+        if start_date > end_date:
+            raise CommandError('--start-date cannot be after --end-date')
+
+        output_dir = Path(options['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        for name in options['datasets'] or DATASETS:
+            result = export(name, start_date, end_date, options['format'])
+            path = output_dir / result.filename
+            size = 0
+            with open(path, 'wb') as fh:
+                for chunk in result.chunks:
+                    fh.write(chunk)
+                    size += len(chunk)
+            self.stdout.write(f'{path}  {size / 1024:.1f} KiB')
+
+        if options['format'] != result.format:
+            self.stdout.write(self.style.WARNING(
+                f"pyarrow is not installed; wrote {result.format} instead of {options['format']}."
+            ))
@@ -0,0 +1,56 @@
+"""
+Generate wholesale customer statements for a period.
+
+Statements whose Sale/CreditPayment data is unchanged since the last run
+are skipped, so a month-end cron can simply rerun it after late entries.
+Download them from /api/reports/statements/<id>/download/.
+
+    python manage.py generate_statements                    # previous month
+    python manage.py generate_statements --month 2026-03 --processes 4
+    python manage.py generate_statements --start-date 2026-01-01 --end-date 2026-03-31 --customer 7 --force
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.statements import StatementsInProgress, generate_statements, month_period
+
+
+class Command(BaseCommand):
+    help = 'Create or refresh customer statements, re-rendering only those whose data changed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Statement month (YYYY-MM). Default: the previous month.')
+        parser.add_argument('--start-date', help='Period start (YYYY-MM-DD); use with --end-date instead of --month.')
+        parser.add_argument('--end-date', help='Period end (YYYY-MM-DD).')
+        parser.add_argument('--customer', type=int, action='append', dest='customers',
+                            help='Only these customer ids (repeatable).')
+        parser.add_argument('--force', action='store_true', help='Re-render even unchanged statements.')
+        parser.add_argument('--processes', type=int, default=settings.REPORT_EXCEL_PROCESSES,
+                            help='Worker processes for rendering (default: REPORT_EXCEL_PROCESSES).')
+
+    def handle(self, *args, **options):
+        try:
+            if options['start_date'] or options['end_date']:
+                if options['month']:
+                    raise CommandError('Use either --month or --start-date/--end-date')
+                start_date = date.fromisoformat(options['start_date'] or '')
+                end_date = date.fromisoformat(options['end_date'] or '')
+            else:
+                start_date, end_date = month_period(options['month'])
+        except ValueError:
+            raise CommandError('Months must be YYYY-MM and dates YYYY-MM-DD')
+        if start_date > end_date:
+            raise CommandError('--start-date cannot be after --end-date')
+
+        try:
+            generated, unchanged = generate_statements(
+                start_date, end_date, customer_ids=options['customers'],
+                force=options['force'], processes=options['processes'],
+            )
+        except StatementsInProgress as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f'{start_date} to {end_date}: {generated} statement(s) generated, {unchanged} unchanged.'
+        ))
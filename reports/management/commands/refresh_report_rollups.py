@@ -0,0 +1,55 @@
+"""
+Build or rebuild the daily production-and-cost rollups.
+
+Writes only flag the days they change stale (reports/signals.py) and
+analytics reads never build rollups. Run --pending every few minutes
+from cron or a scheduler: it rebuilds the flagged days and carries the
+series through today, and costs one query when nothing changed. Run
+the other forms to backfill history and after bulk imports (which
+bypass the signals).
+
+    python manage.py refresh_report_rollups --pending
+    python manage.py refresh_report_rollups --start-date 2025-01-01
+    python manage.py refresh_report_rollups --days 30
+    python manage.py refresh_report_rollups --stale-only --start-date 2024-01-01
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reports.rollups import ensure_daily_rollups, refresh_daily_rollups, refresh_pending_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute DailyProductionRollup / DailyEggTypeRollup for a date range.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='First day (YYYY-MM-DD). Default: --days before --end-date.')
+        parser.add_argument('--end-date', help='Last day (YYYY-MM-DD). Default: today.')
+        parser.add_argument('--days', type=int, default=7, help='Window size when --start-date is omitted (default: 7).')
+        parser.add_argument('--stale-only', action='store_true',
+                            help='Only refresh days that are missing or flagged stale.')
+        parser.add_argument('--pending', action='store_true',
+                            help='Refresh every stale day and extend the rollups through --end-date (default: today).')
+
+    def handle(self, *args, **options):
+        try:
+            end_date = date.fromisoformat(options['end_date']) if options['end_date'] else timezone.localdate()
+            start_date = (
+                date.fromisoformat(options['start_date']) if options['start_date']
+                else end_date - timedelta(days=options['days'] - 1)
+            )
+        except ValueError:
+            raise CommandError('Dates must be YYYY-MM-DD')
+        if start_date > end_date:
+            raise CommandError('--start-date cannot be after --end-date')
+
+        if options['pending']:
+            days = refresh_pending_rollups(end_date)
+            self.stdout.write(self.style.SUCCESS(f'Refreshed {days} pending day(s) through {end_date}.'))
+            return
+
+        refresh = ensure_daily_rollups if options['stale_only'] else refresh_daily_rollups
+        days = refresh(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {days} day(s) between {start_date} and {end_date}.'))
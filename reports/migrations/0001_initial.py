@@ -0,0 +1,48 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProductionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('crates_produced', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('bird_days', models.PositiveIntegerField(default=0, help_text='Birds on hand that day, summed over flocks')),
+                ('feed_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('other_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('is_stale', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['is_stale', 'date'], name='reports_daily_stale_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyEggTypeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('crates_produced', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('crates_sold', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('egg_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='inventory.eggtype')),
+            ],
+            options={
+                'ordering': ['date', 'egg_type'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'egg_type'), name='reports_unique_daily_egg_type')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:16
+
+import django.db.models.deletion
+import reports.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_delete_customerpriceoverride'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerStatement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('opening_balance', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('purchases', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('payments', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('closing_balance', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('file', models.FileField(max_length=255, upload_to=reports.models._statement_path)),
+                ('generated_at', models.DateTimeField()),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statements', to='customers.wholesalecustomer')),
+            ],
+            options={
+                'ordering': ['-period_end', 'customer__name'],
+                'indexes': [models.Index(fields=['period_end', 'period_start'], name='reports_statement_period_idx')],
+                'constraints': [models.UniqueConstraint(fields=('customer', 'period_start', 'period_end'), name='reports_unique_customer_statement')],
+            },
+        ),
+    ]
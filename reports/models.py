@@ -1,3 +1,82 @@
 from django.db import models
 
-# Create your models here.
+
+class DailyProductionRollup(models.Model):
+    """
+    Farm-wide production and cost totals for one local date, precomputed
+    from EggProductionLog, FlockEvent/Flock and Expense by
+    reports/rollups.py. reports/signals.py flags rows stale when their
+    source data changes; `refresh_report_rollups --pending` recomputes them.
+    """
+    date = models.DateField(unique=True)
+    crates_produced = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    bird_days = models.PositiveIntegerField(default=0, help_text='Birds on hand that day, summed over flocks')
+    feed_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    other_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    is_stale = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['is_stale', 'date'], name='reports_daily_stale_idx'),
+        ]
+
+    def __str__(self):
+        return f"Rollup {self.date}"
+
+
+class DailyEggTypeRollup(models.Model):
+    """Per-egg-type crates produced and sold, and sales revenue, for one local date."""
+    date = models.DateField()
+    egg_type = models.ForeignKey('inventory.EggType', on_delete=models.CASCADE, related_name='daily_rollups')
+    crates_produced = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    crates_sold = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['date', 'egg_type']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'egg_type'], name='reports_unique_daily_egg_type'),
+        ]
+
+    def __str__(self):
+        return f"Rollup {self.date} {self.egg_type_id}"
+
+
+def _statement_path(statement, filename):
+    return f'statements/{statement.period_end:%Y-%m}/{filename}'
+
+
+class CustomerStatement(models.Model):
+    """
+    One wholesale customer's account statement for a period, rendered by
+    reports/statements.py. content_hash covers everything printed on it,
+    so a run only re-renders statements whose Sale/CreditPayment data
+    (or customer details) changed since the last one.
+    """
+    customer = models.ForeignKey('customers.WholesaleCustomer', on_delete=models.CASCADE, related_name='statements')
+    period_start = models.DateField()
+    period_end = models.DateField()
+    opening_balance = models.DecimalField(max_digits=14, decimal_places=2)
+    purchases = models.DecimalField(max_digits=14, decimal_places=2)
+    payments = models.DecimalField(max_digits=14, decimal_places=2)
+    closing_balance = models.DecimalField(max_digits=14, decimal_places=2)
+    transaction_count = models.PositiveIntegerField(default=0)
+    content_hash = models.CharField(max_length=64)
+    file = models.FileField(upload_to=_statement_path, max_length=255)
+    generated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-period_end', 'customer__name']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['customer', 'period_start', 'period_end'], name='reports_unique_customer_statement',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['period_end', 'period_start'], name='reports_statement_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"Statement {self.customer_id} {self.period_start} – {self.period_end}"
@@ -0,0 +1,209 @@
+"""
+Daily production-and-cost rollups behind the production analytics report.
+
+refresh_daily_rollups() recomputes DailyProductionRollup and
+DailyEggTypeRollup for a date range from a fixed number of grouped
+queries (production logs, daily flock population, expenses, sale items).
+ensure_daily_rollups() refreshes only the dates in a range that are
+missing or flagged stale.
+
+Reports only read the rollups, and writes only flag the days they touch
+stale (reports/signals.py). refresh_pending_rollups(), run every few
+minutes by `manage.py refresh_report_rollups --pending`, rebuilds those
+days and extends the series through today; its cost grows with the
+number of days rebuilt, never with request traffic. The same command
+without --pending backfills history (nothing is built before the first
+rollup).
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.db_router import stick_to_primary
+
+from .models import DailyEggTypeRollup, DailyProductionRollup
+
+# EggProductionLog column prefixes, matched to EggType by lower-cased name.
+PRODUCTION_FIELDS = ('broken', 'small', 'medium', 'big')
+
+
+def _dates(start_date, end_date):
+    day = start_date
+    while day <= end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+def daily_bird_counts(start_date, end_date):
+    """{date: birds on hand across all flocks} for [start_date, end_date]."""
+    from flock.models import FlockDailyPopulation
+    from flock.population import extend_population
+
+    extend_population(end_date)
+    return dict(
+        FlockDailyPopulation.objects
+        .filter(date__range=[start_date, end_date])
+        .values_list('date')
+        .annotate(birds=Sum('closing_count'))
+        .order_by()
+    )
+
+
+def refresh_daily_rollups(start_date, end_date):
+    """Recompute rollups for every date in [start_date, end_date]."""
+    # Rollups are computed from these reads; never a lagging replica.
+    stick_to_primary()
+    with transaction.atomic():
+        # A write flagging one of these days stale meanwhile waits for this
+        # refresh to commit, so its flag survives for the next run.
+        list(
+            DailyProductionRollup.objects.select_for_update()
+            .filter(date__range=[start_date, end_date]).values_list('pk', flat=True)
+        )
+        return _refresh_daily_rollups(start_date, end_date)
+
+
+def _refresh_daily_rollups(start_date, end_date):
+    from expenses.models import Expense
+    from flock.models import EggProductionLog
+    from inventory.models import EggType
+    from sales.models import SaleItem, local_date_bounds
+
+    egg_types = {et.name.lower(): et for et in EggType.objects.all()}
+
+    production = {
+        row['recorded_date']: row
+        for row in (
+            EggProductionLog.objects
+            .filter(recorded_date__range=[start_date, end_date])
+            .values('recorded_date')
+            .annotate(**{name: Sum(f'{name}_crates') for name in PRODUCTION_FIELDS})
+            .order_by()
+        )
+    }
+
+    feed_category = settings.REPORTS_FEED_CATEGORY
+    costs = {
+        row['date']: row
+        for row in (
+            Expense.objects
+            .filter(date__range=[start_date, end_date])
+            .values('date')
+            .annotate(
+                total=Sum('amount'),
+                feed=Sum('amount', filter=Q(category__name__iexact=feed_category)),
+            )
+            .order_by()
+        )
+    }
+
+    lower, upper = local_date_bounds(start_date, end_date)
+    sold = defaultdict(dict)
+    sale_rows = (
+        SaleItem.objects
+        .filter(sale__sale_datetime__gte=lower, sale__sale_datetime__lt=upper)
+        .annotate(day=TruncDate('sale__sale_datetime'))
+        .values('day', 'egg_type_id')
+        .annotate(crates=Sum('quantity'), revenue=Sum('line_total'))
+        .order_by()
+    )
+    for row in sale_rows:
+        sold[row['day']][row['egg_type_id']] = row
+
+    birds = daily_bird_counts(start_date, end_date)
+
+    daily, by_type = [], []
+    for day in _dates(start_date, end_date):
+        produced = production.get(day, {})
+        cost = costs.get(day, {})
+        total_cost = cost.get('total') or Decimal('0.00')
+        feed_cost = cost.get('feed') or Decimal('0.00')
+        daily.append(DailyProductionRollup(
+            date=day,
+            crates_produced=sum((produced.get(name) or Decimal('0')) for name in PRODUCTION_FIELDS),
+            bird_days=birds.get(day, 0),
+            feed_cost=feed_cost,
+            other_cost=total_cost - feed_cost,
+        ))
+
+        day_sales = sold.get(day, {})
+        for name, et in egg_types.items():
+            crates_produced = (produced.get(name) or Decimal('0')) if name in PRODUCTION_FIELDS else Decimal('0')
+            sale = day_sales.get(et.id, {})
+            if not (crates_produced or sale):
+                continue
+            by_type.append(DailyEggTypeRollup(
+                date=day,
+                egg_type=et,
+                crates_produced=crates_produced,
+                crates_sold=sale.get('crates') or 0,
+                revenue=sale.get('revenue') or Decimal('0.00'),
+            ))
+
+    DailyProductionRollup.objects.filter(date__range=[start_date, end_date]).delete()
+    DailyEggTypeRollup.objects.filter(date__range=[start_date, end_date]).delete()
+    DailyProductionRollup.objects.bulk_create(daily, batch_size=1000)
+    DailyEggTypeRollup.objects.bulk_create(by_type, batch_size=1000)
+    return len(daily)
+
+
+def ensure_daily_rollups(start_date, end_date):
+    """
+    Refresh the dates in [start_date, end_date] whose rollup is missing or
+    stale. Costs one indexed query when the range is already current.
+    """
+    stick_to_primary()
+    current = set(
+        DailyProductionRollup.objects
+        .filter(date__range=[start_date, end_date], is_stale=False)
+        .values_list('date', flat=True)
+    )
+    pending = [day for day in _dates(start_date, end_date) if day not in current]
+    if not pending:
+        return 0
+    # One refresh over the span of pending dates; cheaper than one per date.
+    return refresh_daily_rollups(pending[0], pending[-1])
+
+
+def refresh_pending_rollups(until=None):
+    """
+    Rebuild stale days and carry the series forward through `until`
+    (default: today). Costs one indexed query when everything is
+    current, and otherwise a fixed number of grouped queries plus the
+    batched INSERTs, however long the stale span.
+    """
+    until = until or timezone.localdate()
+    stick_to_primary()
+    bounds = DailyProductionRollup.objects.aggregate(
+        first_stale=Min('date', filter=Q(is_stale=True)),
+        last_stale=Max('date', filter=Q(is_stale=True)),
+        last=Max('date'),
+    )
+    if bounds['last'] is None:
+        return 0
+    starts = [day for day in (bounds['first_stale'], bounds['last'] + timedelta(days=1)) if day]
+    start_date, end_date = min(starts), max(until, bounds['last_stale'] or until)
+    if start_date > end_date:
+        return 0
+    return ensure_daily_rollups(start_date, end_date)
+
+
+def mark_stale(start_date, end_date=None):
+    """Flag rollups for a date (or every date from start_date to end_date) as stale."""
+    rollups = DailyProductionRollup.objects.filter(is_stale=False)
+    if end_date is None:
+        rollups = rollups.filter(date=start_date)
+    else:
+        rollups = rollups.filter(date__range=[start_date, end_date])
+    rollups.update(is_stale=True)
+
+
+def mark_stale_from(start_date):
+    """Flag every rollup on or after start_date as stale (flock history changes)."""
+    DailyProductionRollup.objects.filter(is_stale=False, date__gte=start_date).update(is_stale=True)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .models import CustomerStatement
 
 # ===== NESTED SERIALIZERS FOR STRUCTURED RESPONSES =====
 class PeriodSerializer(serializers.Serializer):
@@ -93,6 +94,20 @@ class InventoryStatusSerializer(serializers.Serializer):
     )
 
 
+class CustomerStatementSerializer(serializers.ModelSerializer):
+    """Stored statement; the file itself is served by the download action."""
+    customer_name = serializers.CharField(source='customer.name', read_only=True)
+
+    class Meta:
+        model = CustomerStatement
+        fields = [
+            'id', 'customer', 'customer_name', 'period_start', 'period_end',
+            'opening_balance', 'purchases', 'payments', 'closing_balance',
+            'transaction_count', 'content_hash', 'generated_at',
+        ]
+        read_only_fields = fields
+
+
 # ===== UNUSED (Preserved for potential future use) =====
 class ExpenseReportSerializer(serializers.Serializer):
     """
@@ -0,0 +1,76 @@
+"""
+Flag precomputed report rollups as stale when their source rows change.
+
+Each receiver costs one UPDATE; the days are rebuilt off the request
+path by `manage.py refresh_report_rollups --pending` (see
+reports/rollups.py).
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from expenses.models import Expense
+from flock.models import EggProductionLog, Flock, FlockEvent
+from sales.models import Sale, SaleItem
+from .rollups import mark_stale, mark_stale_from
+
+
+@receiver(pre_save, sender=Sale)
+def remember_sale_date(sender, instance, update_fields=None, **kwargs):
+    """Stash the stored sale_datetime so a moved sale marks both dates."""
+    instance._previous_sale_datetime = None
+    if instance.pk and (update_fields is None or 'sale_datetime' in update_fields):
+        instance._previous_sale_datetime = (
+            Sale.objects.filter(pk=instance.pk).values_list('sale_datetime', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Sale)
+def sale_saved(sender, instance, created, **kwargs):
+    # New sales have no items yet; their SaleItem saves mark the date.
+    previous = getattr(instance, '_previous_sale_datetime', None)
+    if previous and previous != instance.sale_datetime:
+        mark_stale(timezone.localdate(previous))
+        mark_stale(timezone.localdate(instance.sale_datetime))
+
+
+@receiver(post_delete, sender=Sale)
+def sale_deleted(sender, instance, **kwargs):
+    mark_stale(timezone.localdate(instance.sale_datetime))
+
+
+@receiver([post_save, post_delete], sender=SaleItem)
+def sale_item_changed(sender, instance, **kwargs):
+    try:
+        sale = instance.sale
+    except Sale.DoesNotExist:
+        return  # Deleted along with its sale; sale_deleted covers the date.
+    # Items of one sale share its date: mark it once per sale instance.
+    if getattr(sale, '_rollup_marked', False):
+        return
+    mark_stale(timezone.localdate(sale.sale_datetime))
+    sale._rollup_marked = True
+
+
+@receiver([post_save, post_delete], sender=Expense)
+def expense_changed(sender, instance, **kwargs):
+    mark_stale(instance.date)
+
+
+@receiver([post_save, post_delete], sender=EggProductionLog)
+def production_changed(sender, instance, **kwargs):
+    mark_stale(instance.recorded_date)
+
+
+@receiver([post_save, post_delete], sender=FlockEvent)
+def flock_event_changed(sender, instance, **kwargs):
+    # Bird counts carry forward, so every later day changes too.
+    mark_stale_from(instance.event_date)
+
+
+@receiver([post_save, post_delete], sender=Flock)
+def flock_changed(sender, instance, update_fields=None, **kwargs):
+    # FlockEvent signals save current_count only; that never affects history.
+    if update_fields and set(update_fields) <= {'current_count', 'updated_at'}:
+        return
+    mark_stale_from(instance.date_acquired)
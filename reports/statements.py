@@ -0,0 +1,249 @@
+"""
+Wholesale customer account statements.
+
+generate_statements() builds every statement for a period from five bulk
+queries, whatever the number of customers:
+
+  opening balance   purchases - upfront payments - credit payments
+                    before the period
+  lines             in-period sales (debit the total, credit the upfront
+                    payment) and credit payments, in time order
+  closing balance   opening + purchases - payments
+
+A statement's content_hash is the SHA-256 of its data as canonical JSON
+plus FORMAT_VERSION. Statements whose stored hash still matches are left
+as they are; the others are rendered to XLSX (through the
+reports.utils process pool when processes > 1) and saved to default
+storage, replacing the previous file.
+
+Rendering happens outside any transaction. The rows are then locked, or
+inserted, before any file is written, and the files replaced are
+deleted only once the run commits; a run that fails deletes the files
+it wrote. A run that finds another one writing the same period raises
+StatementsInProgress instead of overwriting it.
+"""
+import hashlib
+import json
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import Exists, OuterRef, Q, Sum
+from django.utils import timezone
+
+from core.db_router import replica_reads
+from customers.models import WholesaleCustomer
+from sales.models import CreditPayment, Sale, local_date_bounds
+
+from .models import CustomerStatement
+from .utils import customer_statement_bytes, pool_map
+
+# Part of every content hash: bump when the rendered layout changes so
+# the next run regenerates all statements.
+FORMAT_VERSION = 1
+
+ZERO = Decimal('0.00')
+
+
+class StatementsInProgress(Exception):
+    """Another generate_statements() run is writing the same period."""
+
+    def __init__(self, start_date, end_date):
+        super().__init__(f'Statements for {start_date} to {end_date} are being generated by another run')
+
+
+def statement_customers(start_date, end_date, customer_ids=None):
+    """Active customers, plus inactive ones with sales or payments in the period."""
+    in_range = Q(is_active=True)
+    for queryset in (Sale.objects.in_local_dates(start_date, end_date),
+                     CreditPayment.objects.in_local_dates(start_date, end_date)):
+        in_range |= Q(Exists(queryset.filter(customer=OuterRef('pk'))))
+    customers = WholesaleCustomer.objects.filter(in_range)
+    if customer_ids is not None:
+        customers = customers.filter(pk__in=customer_ids)
+    return list(customers.order_by('name').values('id', 'name', 'contact_person', 'phone', 'address'))
+
+
+def build_statements(start_date, end_date, customer_ids=None):
+    """Statement data for each statement_customers() customer, in name order."""
+    customers = statement_customers(start_date, end_date, customer_ids)
+    lower, _ = local_date_bounds(start_date)
+    scope = {'customer_id__in': customer_ids} if customer_ids is not None else {'customer__isnull': False}
+
+    opening = defaultdict(lambda: ZERO)
+    for row in (Sale.objects.filter(sale_datetime__lt=lower, **scope)
+                .values('customer_id').annotate(total=Sum('total_amount'), paid=Sum('amount_paid'))):
+        opening[row['customer_id']] += row['total'] - row['paid']
+    for row in (CreditPayment.objects.filter(payment_date__lt=lower, **scope)
+                .values('customer_id').annotate(paid=Sum('amount_paid'))):
+        opening[row['customer_id']] -= row['paid']
+    # SQLite sums decimals in floating point; keep cents.
+    opening = defaultdict(lambda: ZERO, {cid: value.quantize(ZERO) for cid, value in opening.items()})
+
+    # (moment, kind, id, description, debit, credit): sales sort before
+    # payments made at the same moment.
+    entries = defaultdict(list)
+    sales = (
+        Sale.objects.in_local_dates(start_date, end_date).filter(**scope)
+        .values_list('customer_id', 'id', 'sale_datetime', 'total_amount', 'amount_paid')
+    )
+    for customer_id, sale_id, moment, total, paid in sales:
+        entries[customer_id].append((moment, 0, sale_id, f'Sale #{sale_id}', total, paid))
+    payments = (
+        CreditPayment.objects.in_local_dates(start_date, end_date).filter(**scope)
+        .values_list('customer_id', 'id', 'payment_date', 'amount_paid', 'sale_id', 'notes')
+    )
+    for customer_id, payment_id, moment, paid, sale_id, notes in payments:
+        description = f'Payment against sale #{sale_id}' if sale_id else 'Payment'
+        if notes:
+            description = f'{description} ({notes})'
+        entries[customer_id].append((moment, 1, payment_id, description, ZERO, paid))
+
+    period = {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()}
+    statements = []
+    for customer in customers:
+        balance = opening[customer['id']]
+        purchases = payments_total = ZERO
+        lines = []
+        for moment, _, _, description, debit, credit in sorted(entries[customer['id']]):
+            balance += debit - credit
+            purchases += debit
+            payments_total += credit
+            lines.append({
+                'date': timezone.localdate(moment).isoformat(),
+                'description': description,
+                'debit': str(debit) if debit else '',
+                'credit': str(credit) if credit else '',
+                'balance': str(balance),
+            })
+        statements.append({
+            'customer': customer,
+            'period': period,
+            'opening_balance': str(opening[customer['id']]),
+            'purchases': str(purchases),
+            'payments': str(payments_total),
+            'closing_balance': str(balance),
+            'lines': lines,
+        })
+    return statements
+
+
+def content_hash(statement):
+    payload = json.dumps([FORMAT_VERSION, statement], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def generate_statements(start_date, end_date, customer_ids=None, force=False, processes=0):
+    """
+    Create or refresh the period's statements. Returns (generated,
+    unchanged) counts; `force` re-renders even when the hash matches.
+    """
+    # The source data may come from the read replica; the stored hashes
+    # below decide what to write, so they are read from the primary.
+    with replica_reads():
+        statements = build_statements(start_date, end_date, customer_ids)
+    existing = {
+        s.customer_id: s
+        for s in CustomerStatement.objects.filter(
+            period_start=start_date, period_end=end_date,
+            customer_id__in=[statement['customer']['id'] for statement in statements],
+        )
+    }
+
+    changed = []
+    for statement in statements:
+        digest = content_hash(statement)
+        current = existing.get(statement['customer']['id'])
+        if force or current is None or current.content_hash != digest:
+            changed.append((statement, digest))
+    if not changed:
+        return 0, len(statements)
+
+    contents = pool_map(processes, customer_statement_bytes, [statement for statement, _ in changed])
+
+    # Existing rows as read, for _claim() to check nobody rewrote them since.
+    seen = {row.pk: row.generated_at for row in existing.values()}
+    now = timezone.now()
+    rows, replaced_files, saved_files = [], [], []
+    for statement, digest in changed:
+        customer_id = statement['customer']['id']
+        row = existing.get(customer_id)
+        if row is None:
+            row = CustomerStatement(customer_id=customer_id, period_start=start_date, period_end=end_date)
+        else:
+            replaced_files.append(row.file.name)
+        row.opening_balance = Decimal(statement['opening_balance'])
+        row.purchases = Decimal(statement['purchases'])
+        row.payments = Decimal(statement['payments'])
+        row.closing_balance = Decimal(statement['closing_balance'])
+        row.transaction_count = len(statement['lines'])
+        row.content_hash = digest
+        row.generated_at = now
+        rows.append(row)
+
+    try:
+        with transaction.atomic():
+            _claim(start_date, end_date, seen, [row for row in rows if row.pk is None])
+            # Files only once every row is locked or newly inserted, so a
+            # run that loses the race to a concurrent one writes none.
+            for row, (_, digest), content in zip(rows, changed, contents):
+                row.file.save(
+                    f'statement-{row.customer_id}-{start_date:%Y%m%d}-{end_date:%Y%m%d}-{digest[:12]}.xlsx',
+                    ContentFile(content), save=False,
+                )
+                saved_files.append(row.file.name)
+            CustomerStatement.objects.bulk_update(rows, [
+                'opening_balance', 'purchases', 'payments', 'closing_balance',
+                'transaction_count', 'content_hash', 'file', 'generated_at',
+            ])
+            transaction.on_commit(lambda: _delete_files(replaced_files), robust=True)
+    except BaseException:
+        _delete_files(saved_files)
+        raise
+    return len(changed), len(statements) - len(changed)
+
+
+def _claim(start_date, end_date, seen, new_rows):
+    """
+    Lock the period's existing statements, which must still be as this
+    run read them (`seen`: pk -> generated_at), and insert the new ones.
+    Raises StatementsInProgress when a concurrent run holds or has
+    rewritten one, or inserted one first.
+    """
+    try:
+        locked = dict(
+            CustomerStatement.objects.select_for_update(nowait=True)
+            .filter(pk__in=list(seen)).values_list('pk', 'generated_at')
+        )
+    except OperationalError:
+        raise StatementsInProgress(start_date, end_date)
+    if locked != seen:
+        raise StatementsInProgress(start_date, end_date)
+    try:
+        CustomerStatement.objects.bulk_create(new_rows)
+    except IntegrityError:
+        raise StatementsInProgress(start_date, end_date)
+
+
+def _delete_files(names):
+    storage = CustomerStatement._meta.get_field('file').storage
+    for name in names:
+        if name:
+            storage.delete(name)
+
+
+def month_period(month=None):
+    """
+    (first day, last day) of a 'YYYY-MM' month; default the previous
+    calendar month. Raises ValueError for a malformed month.
+    """
+    if month is None:
+        first = timezone.localdate().replace(day=1) - timedelta(days=1)
+    else:
+        year, _, number = month.partition('-')
+        first = date(int(year), int(number), 1)
+    start = first.replace(day=1)
+    end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start, end
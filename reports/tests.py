@@ -1,3 +1,274 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import audit
+from customers.models import WholesaleCustomer
+from expenses.models import Expense, ExpenseCategory
+from flock.models import EggProductionLog, Flock, FlockEvent
+from sales.models import CreditPayment, Sale
+
+from . import statements
+from .aging import receivables_aging
+from .models import CustomerStatement, DailyProductionRollup
+from .rollups import refresh_daily_rollups, refresh_pending_rollups
+from .statements import StatementsInProgress, generate_statements
+
+PERIOD = (date(2026, 3, 1), date(2026, 3, 31))
+
+
+class GenerateStatementsTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = CustomerStatement._meta.get_field('file').storage
+        self.customers = [WholesaleCustomer.objects.create(name=name) for name in ('Acme', 'Bravo')]
+
+    def stored_files(self):
+        _, files = self.storage.listdir('statements/2026-03')
+        return sorted(files)
+
+    def during_render(self, other_run):
+        """Patch rendering so `other_run` completes while this run renders."""
+        render = statements.pool_map
+
+        def pool_map(*args):
+            with mock.patch.object(statements, 'pool_map', render):
+                other_run()
+            return render(*args)
+        return mock.patch.object(statements, 'pool_map', pool_map)
+
+    def test_generates_then_skips_unchanged(self):
+        self.assertEqual(generate_statements(*PERIOD), (2, 0))
+        self.assertEqual(generate_statements(*PERIOD), (0, 2))
+        self.assertEqual(len(self.stored_files()), 2)
+
+    def test_forced_run_deletes_replaced_files_on_commit(self):
+        generate_statements(*PERIOD)
+        before = self.stored_files()
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_statements(*PERIOD, force=True)
+        after = self.stored_files()
+        self.assertEqual(len(after), 2)
+        self.assertFalse(set(before) & set(after))
+
+    def test_concurrent_first_run_conflicts_without_orphan_files(self):
+        with self.during_render(lambda: generate_statements(*PERIOD)):
+            with self.assertRaises(StatementsInProgress):
+                generate_statements(*PERIOD)
+        self.assertEqual(CustomerStatement.objects.count(), 2)
+        self.assertEqual(self.stored_files(), sorted(
+            name.rsplit('/', 1)[1] for name in CustomerStatement.objects.values_list('file', flat=True)
+        ))
+
+    def test_concurrent_rewrite_conflicts(self):
+        generate_statements(*PERIOD)
+        with self.during_render(lambda: generate_statements(*PERIOD, force=True)):
+            with self.assertRaises(StatementsInProgress):
+                generate_statements(*PERIOD, force=True)
+        self.assertEqual(len(self.stored_files()), 4)  # the other run's replaced files go on its commit
+
+    def test_failed_run_deletes_its_files(self):
+        with mock.patch.object(CustomerStatement.objects, 'bulk_update', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                generate_statements(*PERIOD)
+        self.assertEqual(self.stored_files(), [])
+        self.assertFalse(CustomerStatement.objects.exists())
+
+    def test_generate_endpoint_answers_409_on_concurrent_run(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('clerk'))
+        with mock.patch.object(statements, 'generate_statements', side_effect=StatementsInProgress(*PERIOD)):
+            response = client.post('/api/reports/statements/generate/', {'month': '2026-03'}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('error', response.data)
+
+
+class PendingRollupTests(TestCase):
+    """Writes only flag days; refresh_pending_rollups() rebuilds them at a fixed query cost."""
+
+    TODAY = date(2026, 3, 31)
+
+    def setUp(self):
+        self.flock = Flock.objects.create(
+            name='House 1', date_acquired=self.TODAY - timedelta(days=400), initial_count=500, current_count=500,
+        )
+        refresh_daily_rollups(self.TODAY - timedelta(days=365), self.TODAY)
+
+    @staticmethod
+    def non_inserts(context):
+        return len([query for query in context.captured_queries if not query['sql'].startswith('INSERT')])
+
+    def stale_days(self):
+        return list(DailyProductionRollup.objects.filter(is_stale=True).values_list('date', flat=True))
+
+    def test_write_only_flags_its_day(self):
+        day = self.TODAY - timedelta(days=3)
+        # Entries queued by executed on_commit callbacks go into this test's transaction.
+        self.addCleanup(audit.buffer.flush)
+        with self.captureOnCommitCallbacks(execute=True):
+            EggProductionLog.objects.create(flock=self.flock, recorded_date=day, big_crates=Decimal('4'))
+        self.assertEqual(self.stale_days(), [day])
+        self.assertEqual(DailyProductionRollup.objects.get(date=day).crates_produced, 0)
+
+    def test_refresh_rebuilds_stale_days(self):
+        day = self.TODAY - timedelta(days=3)
+        EggProductionLog.objects.create(flock=self.flock, recorded_date=day, big_crates=Decimal('4'))
+        self.assertEqual(refresh_pending_rollups(self.TODAY), 1)
+        self.assertEqual(self.stale_days(), [])
+        self.assertEqual(DailyProductionRollup.objects.get(date=day).crates_produced, 4)
+
+    def test_refresh_extends_series_to_today(self):
+        self.assertEqual(refresh_pending_rollups(self.TODAY + timedelta(days=2)), 2)
+        self.assertTrue(DailyProductionRollup.objects.filter(date=self.TODAY + timedelta(days=2)).exists())
+
+    def test_refresh_when_current_costs_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(refresh_pending_rollups(self.TODAY), 0)
+
+    def test_refresh_cost_does_not_grow_with_the_stale_span(self):
+        FlockEvent.objects.create(flock=self.flock, event_type='death', quantity=1,
+                                  event_date=self.TODAY - timedelta(days=2))
+        with CaptureQueriesContext(connection) as short:
+            self.assertEqual(refresh_pending_rollups(self.TODAY), 3)
+        FlockEvent.objects.create(flock=self.flock, event_type='death', quantity=1,
+                                  event_date=self.TODAY - timedelta(days=300))
+        with CaptureQueriesContext(connection) as long:
+            self.assertEqual(refresh_pending_rollups(self.TODAY), 301)
+        # Only the INSERTs are batched by row count (SQLite caps parameters per statement).
+        self.assertEqual(self.non_inserts(long), self.non_inserts(short))
+        self.assertEqual(DailyProductionRollup.objects.get(date=self.TODAY).bird_days, 498)
+
+
+class SalesTrendTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('clerk')
+        for moment, amount in [
+            ((2026, 3, 8, 23, 59), '10.00'),  # Sunday: last moment of the week of Mar 2
+            ((2026, 3, 9, 0, 0), '20.00'),    # Monday: first of the week of Mar 9
+            ((2026, 3, 17, 12, 0), '5.00'),
+            ((2026, 1, 31, 23, 59), '7.00'),
+            ((2026, 2, 1, 0, 0), '3.00'),
+        ]:
+            Sale.objects.create(sale_type='retail', total_amount=Decimal(amount),
+                                sale_datetime=timezone.make_aware(datetime(*moment)))
+        category = ExpenseCategory.objects.create(name='Feed')
+        Expense.objects.create(category=category, description='Mash', amount=Decimal('4.00'), date=date(2026, 2, 28))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def trend(self, **params):
+        return self.client.get('/api/reports/sales-trend/', params)
+
+    @staticmethod
+    def amounts(values):
+        return [Decimal(value) for value in values]
+
+    def test_week_buckets_start_on_monday(self):
+        data = self.trend(granularity='week', start='2026-03-04', end='2026-03-17').data
+        self.assertEqual(data['categories'], ['2026-03-02', '2026-03-09', '2026-03-16'])
+        self.assertEqual(self.amounts(data['values']), [10, 20, 5])
+        self.assertEqual(data['days'], 14)
+
+    def test_month_buckets_fill_empty_months(self):
+        data = self.trend(granularity='month', start='2026-01-31', end='2026-04-01', include='expenses').data
+        self.assertEqual(data['categories'], ['2026-01-01', '2026-02-01', '2026-03-01', '2026-04-01'])
+        self.assertEqual(self.amounts(data['values']), [7, 3, 35, 0])
+        self.assertEqual(self.amounts(data['series']['expenses']), [0, 4, 0, 0])
+
+    def test_day_buckets_split_at_local_midnight(self):
+        data = self.trend(start='2026-01-31', end='2026-02-01').data
+        self.assertEqual(self.amounts(data['values']), [7, 3])
+
+    def test_range_checks(self):
+        self.assertEqual(self.trend(start='2025-01-01', end='2026-03-01').status_code, 400)
+        self.assertEqual(self.trend(granularity='week', start='2025-01-01', end='2026-03-01').status_code, 200)
+        self.assertEqual(self.trend(start='2026-03-02', end='2026-03-01').status_code, 400)
+        self.assertEqual(self.trend(granularity='hour').status_code, 400)
+
+
+class ReceivablesAgingTests(TestCase):
+    AS_OF = date(2026, 3, 31)
+
+    def setUp(self):
+        self.acme = WholesaleCustomer.objects.create(name='Acme')
+
+    def sell(self, age, amount='100.00', paid='0.00', customer=None, at=(12, 0)):
+        day = self.AS_OF - timedelta(days=age)
+        return Sale.objects.create(
+            sale_type='wholesale', customer=customer or self.acme,
+            total_amount=Decimal(amount), amount_paid=Decimal(paid),
+            sale_datetime=timezone.make_aware(datetime(day.year, day.month, day.day, *at)),
+        )
+
+    def pay(self, amount, sale=None, age=0):
+        day = self.AS_OF - timedelta(days=age)
+        CreditPayment.objects.create(customer=self.acme, sale=sale, amount_paid=Decimal(amount),
+                                     payment_date=timezone.make_aware(datetime(day.year, day.month, day.day, 12)))
+
+    def buckets(self, customer='Acme'):
+        report = receivables_aging(self.AS_OF)
+        row = next((c for c in report['customers'] if c['customer_name'] == customer), None)
+        if row is None:
+            return None
+        return [Decimal(row[key]) for key in ('days_0_30', 'days_31_60', 'days_61_90', 'days_over_90',
+                                              'unapplied_credit')]
+
+    def test_bucket_edges(self):
+        self.sell(0, at=(23, 59))
+        self.sell(30, at=(23, 59))
+        self.sell(31, at=(0, 0))
+        self.sell(60)
+        self.sell(61)
+        self.sell(90)
+        self.sell(91)
+        self.sell(-1, at=(0, 0))  # after as_of
+        self.assertEqual(self.buckets(), [200, 200, 200, 100, 0])
+
+    def test_tied_and_upfront_payments_reduce_their_sale(self):
+        self.sell(10, paid='30.00')
+        sale = self.sell(40)
+        self.pay('60.00', sale=sale)
+        self.pay('40.00', sale=sale, age=-1)  # after as_of
+        self.assertEqual(self.buckets(), [70, 40, 0, 0, 0])
+
+    def test_untied_credit_settles_oldest_first(self):
+        self.sell(5)
+        self.sell(45)
+        self.sell(100)
+        self.pay('150.00')
+        self.assertEqual(self.buckets(), [100, 50, 0, 0, 0])
+
+    def test_overpaid_sale_credits_oldest_debt(self):
+        self.sell(100)
+        sale = self.sell(5)
+        self.pay('130.00', sale=sale)
+        self.assertEqual(self.buckets(), [0, 0, 0, 70, 0])
+
+    def test_surplus_credit_is_reported_unapplied(self):
+        self.sell(5)
+        self.pay('125.00')
+        self.assertEqual(self.buckets(), [0, 0, 0, 0, 25])
+
+    def test_settled_customers_are_left_out(self):
+        sale = self.sell(5)
+        self.pay('100.00', sale=sale)
+        self.assertIsNone(self.buckets())
+        self.assertEqual(receivables_aging(self.AS_OF)['customer_count'], 0)
@@ -1,9 +1,10 @@
 # reports/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ReportViewSet
+from .views import CustomerStatementViewSet, ReportViewSet
 
 router = DefaultRouter()
+router.register(r'statements', CustomerStatementViewSet, basename='statement')
 router.register(r'', ReportViewSet, basename='report')  # ✅ CRITICAL: Changed from r'reports' to r''
 
 app_name = 'reports'
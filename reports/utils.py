@@ -1,9 +1,16 @@
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, Color
 from openpyxl.utils import get_column_letter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from decimal import Decimal
+from itertools import repeat
+import io
+import multiprocessing
+import os
 import re
+import zipfile
 
 
 # ═════════════════════════════════════════════════════════════════════════
@@ -353,7 +360,48 @@ def create_customer_excel_report(report_data):
     customers = report_data['customers']
 
     # ── Sheet 1: Summary ────────────────────────────────────────────────
-    ws = wb.create_sheet('Summary')
+    _write_customer_summary_sheet(wb.create_sheet('Summary'), report_data)
+
+    # ── Per-customer sheets ─────────────────────────────────────────────
+    for sheet_name, c in zip(_customer_sheet_names(customers), customers):
+        cws = wb.create_sheet(sheet_name)
+        _write_customer_sheet(cws, c, period)
+        _adjust_column_widths(cws)
+
+    return wb
+
+
+def save_customer_excel_report(report_data, fileobj):
+    """Save the create_customer_excel_report() workbook to `fileobj`."""
+    create_customer_excel_report(report_data).save(fileobj)
+
+
+def save_customer_excel_zip(report_data, fileobj, processes=0):
+    """
+    Write a zip of Summary.xlsx plus one workbook per customer to `fileobj`.
+    Each customer workbook holds that customer's sheet from
+    create_customer_excel_report(); with processes > 1 they are built and
+    saved in a process pool.
+    """
+    period = report_data['period']
+    customers = report_data['customers']
+    names = _customer_sheet_names(customers)
+
+    summary = Workbook()
+    summary.active.title = 'Summary'
+    _write_customer_summary_sheet(summary.active, report_data)
+
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_STORED) as archive:
+        # xlsx files are already deflated; storing them keeps the zip cheap.
+        with archive.open('Summary.xlsx', 'w') as member:
+            summary.save(member)
+        workbooks = pool_map(processes, _customer_workbook_bytes, customers, repeat(period), names)
+        for name, content in zip(names, workbooks):
+            archive.writestr(f'{name}.xlsx', content)
+
+
+def _write_customer_summary_sheet(ws, report_data):
+    period = report_data['period']
     ws['A1'] = 'POULTRY FARM - CUSTOMER REPORT'
     ws['A1'].font = TITLE_FONT
     ws['A1'].alignment = Alignment(horizontal='center')
@@ -367,7 +415,7 @@ def create_customer_excel_report(report_data):
         'Total Purchased', 'Total Paid (range)', 'Outstanding Balance'
     ])
 
-    for i, c in enumerate(customers, start=7):
+    for i, c in enumerate(report_data['customers'], start=7):
         s = c['summary']
         ws.cell(row=i, column=1, value=c['customer_name'])
         ws.cell(row=i, column=2, value=c.get('phone', ''))
@@ -383,23 +431,85 @@ def create_customer_excel_report(report_data):
 
     _adjust_column_widths(ws)
 
-    # ── Per-customer sheets ─────────────────────────────────────────────
+
+def _customer_sheet_names(customers):
+    """Unique sheet names, in customer order."""
+    names = []
     seen_names = {}
     for c in customers:
         base = _safe_sheet_name(c['customer_name'])
         # Handle duplicate names
         if base in seen_names:
             seen_names[base] += 1
-            sheet_name = f"{base[:28]}_{seen_names[base]}"
+            names.append(f"{base[:28]}_{seen_names[base]}")
         else:
             seen_names[base] = 1
-            sheet_name = base
+            names.append(base)
+    return names
+
+
+# ─── Parallel generation ────────────────────────────────────────────────
+#
+# openpyxl is pure Python, so writing and serialising ~300 customer
+# workbooks is CPU bound. Work is split by whole file (a customer's
+# workbook in the zip export, a statement): each worker builds and saves
+# one with openpyxl's public API and returns its bytes.
+
+# Below this many customers the pool's overhead outweighs the work.
+PARALLEL_MIN_CUSTOMERS = 20
+
+_pool = None
+
+def _process_pool(processes):
+    """Per-process pool of `processes` workers, started on first use."""
+    global _pool
+    if _pool is not None and (_pool[0] != os.getpid() or _pool[1] != processes):
+        # A pool inherited through fork() isn't ours to shut down.
+        if _pool[0] == os.getpid():
+            _pool[2].shutdown(wait=False)
+        _pool = None
+    if _pool is None:
+        # forkserver: forking a threaded server process is unsafe, and
+        # preloading this module spares each worker the openpyxl import.
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        _pool = (os.getpid(), processes, ProcessPoolExecutor(max_workers=processes, mp_context=context))
+    return _pool[2]
+
+
+def pool_map(processes, fn, items, *args):
+    """
+    [fn(item, *args) ...] in order, computed in the pool when processes > 1
+    and there are at least PARALLEL_MIN_CUSTOMERS items, else in-process.
+    fn must be a module-level function.
+    """
+    global _pool
+    if processes < 2 or len(items) < PARALLEL_MIN_CUSTOMERS:
+        return list(map(fn, items, *args))
+    try:
+        return list(_process_pool(processes).map(
+            fn, items, *args, chunksize=max(1, len(items) // (processes * 4)),
+        ))
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); start a fresh pool next time.
+        if _pool is not None:
+            _pool[2].shutdown(wait=False)
+        _pool = None
+        raise
+
+
+def _customer_workbook(customer_data, period, sheet_name):
+    wb = Workbook()
+    wb.active.title = sheet_name
+    _write_customer_sheet(wb.active, customer_data, period)
+    _adjust_column_widths(wb.active)
+    return wb
 
-        cws = wb.create_sheet(sheet_name)
-        _write_customer_sheet(cws, c, period)
-        _adjust_column_widths(cws)
 
-    return wb
+def _customer_workbook_bytes(customer_data, period, sheet_name):
+    buffer = io.BytesIO()
+    _customer_workbook(customer_data, period, sheet_name).save(buffer)
+    return buffer.getvalue()
 
 
 def _write_customer_sheet(ws, customer_data, period):
@@ -489,4 +599,118 @@ def _write_customer_sheet(ws, customer_data, period):
             ws.cell(row=row, column=2, value=f"₵{cp['amount']}")
             ws.cell(row=row, column=3, value=cp.get('sale_id') or 'General')
             ws.cell(row=row, column=4, value=cp.get('notes', ''))
-            row += 1
\ No newline at end of file
+            row += 1
+
+# ═════════════════════════════════════════════════════════════════════════
+# RECEIVABLES AGING EXCEL
+# ═════════════════════════════════════════════════════════════════════════
+
+def create_receivables_aging_excel(report_data):
+    """Aging table from reports.aging.receivables_aging()."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Receivables Aging'
+
+    ws['A1'] = 'POULTRY FARM - RECEIVABLES AGING'
+    ws['A1'].font = TITLE_FONT
+    ws['A3'] = 'As of:'
+    ws['B3'] = report_data['as_of']
+    ws['A4'] = 'Customers:'
+    ws['B4'] = report_data['customer_count']
+
+    keys = [bucket['key'] for bucket in report_data['buckets']] + ['total', 'unapplied_credit']
+    _write_headers(ws, 6, ['Customer'] + [bucket['label'] for bucket in report_data['buckets']]
+                   + ['Total Outstanding', 'Unapplied Credit'])
+    row = 7
+    for customer in report_data['customers']:
+        ws.cell(row=row, column=1, value=customer['customer_name'])
+        for col, key in enumerate(keys, start=2):
+            ws.cell(row=row, column=col, value=f"₵{customer[key]}")
+        row += 1
+
+    totals = report_data['totals']
+    for col, val in enumerate(['TOTAL'] + [f"₵{totals[key]}" for key in keys], start=1):
+        ws.cell(row=row, column=col, value=val).font = HEADER_FONT
+
+    _adjust_column_widths(ws)
+    return wb
+
+
+# ═════════════════════════════════════════════════════════════════════════
+# CUSTOMER STATEMENT EXCEL
+# ═════════════════════════════════════════════════════════════════════════
+
+def create_customer_statement_excel(statement):
+    """One customer's account statement (see reports/statements.py)."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Statement'
+    customer = statement['customer']
+    period = statement['period']
+
+    ws['A1'] = 'POULTRY FARM - CUSTOMER STATEMENT'
+    ws['A1'].font = TITLE_FONT
+
+    row = 3
+    for label, val in [
+        ('Customer:', customer['name']),
+        ('Contact:', customer['contact_person']),
+        ('Phone:', customer['phone']),
+        ('Address:', customer['address']),
+        ('Statement Period:', f"{period['start_date']} to {period['end_date']}"),
+    ]:
+        ws.cell(row=row, column=1, value=label)
+        ws.cell(row=row, column=2, value=val)
+        row += 1
+
+    # ── Summary ─────────────────────────────────────────────────────────
+    row += 1
+    ws.cell(row=row, column=1, value='SUMMARY').font = SECTION_FONT
+    row += 1
+    for label, val in [
+        ('Opening Balance', statement['opening_balance']),
+        ('Purchases', statement['purchases']),
+        ('Payments', statement['payments']),
+        ('Closing Balance', statement['closing_balance']),
+    ]:
+        ws.cell(row=row, column=1, value=label)
+        ws.cell(row=row, column=2, value=f"₵{val}")
+        row += 1
+    closing_font = RED_FONT if Decimal(statement['closing_balance']) > 0 else GREEN_FONT
+    ws.cell(row=row - 1, column=1).font = closing_font
+    ws.cell(row=row - 1, column=2).font = closing_font
+
+    # ── Transactions ────────────────────────────────────────────────────
+    row += 1
+    ws.cell(row=row, column=1, value='TRANSACTIONS').font = SECTION_FONT
+    row += 1
+    _write_headers(ws, row, ['Date', 'Description', 'Debit', 'Credit', 'Balance'])
+    row += 1
+    ws.cell(row=row, column=1, value=period['start_date'])
+    ws.cell(row=row, column=2, value='Opening balance')
+    ws.cell(row=row, column=5, value=f"₵{statement['opening_balance']}")
+    row += 1
+    for line in statement['lines']:
+        ws.cell(row=row, column=1, value=line['date'])
+        ws.cell(row=row, column=2, value=line['description'])
+        if line['debit']:
+            ws.cell(row=row, column=3, value=f"₵{line['debit']}")
+        if line['credit']:
+            ws.cell(row=row, column=4, value=f"₵{line['credit']}")
+        ws.cell(row=row, column=5, value=f"₵{line['balance']}")
+        row += 1
+    for col, val in enumerate([
+        period['end_date'], 'Closing balance', f"₵{statement['purchases']}",
+        f"₵{statement['payments']}", f"₵{statement['closing_balance']}",
+    ], start=1):
+        ws.cell(row=row, column=col, value=val).font = HEADER_FONT
+
+    _adjust_column_widths(ws)
+    return wb
+
+
+def customer_statement_bytes(statement):
+    """Rendered statement as .xlsx bytes; a pool_map() worker function."""
+    buffer = io.BytesIO()
+    create_customer_statement_excel(statement).save(buffer)
+    return buffer.getvalue()
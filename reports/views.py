@@ -1,20 +1,83 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Sum
+from django.db.models import Count, Q, Sum, DateField
+from django.db.models.functions import TruncDate, TruncDay, TruncWeek, TruncMonth
 from datetime import date, timedelta
 from decimal import Decimal
 from django.core.exceptions import ValidationError
-from inventory.models import EggType
-from sales.models import SaleItem
-
-
-class ReportViewSet(viewsets.ViewSet):
+from django.utils import timezone
+from inventory import lookups
+from sales.models import SaleItem, local_date_bounds
+from core.concurrency import run_concurrently
+from core.db_router import ReplicaReadMixin
+from core.streaming import StreamingJSONResponse, wants_streaming
+from django_filters.rest_framework import DjangoFilterBackend
+from .models import CustomerStatement
+from .serializers import CustomerStatementSerializer
+
+
+TREND_TRUNCATORS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+# Upper bound on buckets per trend response (a year of days, ~7 years of weeks).
+MAX_TREND_POINTS = 366
+
+# Customers whose sales/payments are fetched together in customer_report.
+CUSTOMER_REPORT_BATCH = 50
+
+
+def _trend_buckets(start_date, end_date, granularity):
+    """Bucket start dates covering [start_date, end_date] for the granularity."""
+    if granularity == 'week':
+        current = start_date - timedelta(days=start_date.weekday())
+    elif granularity == 'month':
+        current = start_date.replace(day=1)
+    else:
+        current = start_date
+
+    buckets = []
+    while current <= end_date:
+        buckets.append(current)
+        if granularity == 'week':
+            current += timedelta(days=7)
+        elif granularity == 'month':
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=1)
+        if len(buckets) > MAX_TREND_POINTS:
+            break
+    return buckets
+
+
+def _ratio(numerator, denominator, places='0.01'):
+    """numerator / denominator as a string, or None when undefined."""
+    if numerator is None or not denominator:
+        return None
+    return str((Decimal(numerator) / Decimal(denominator)).quantize(Decimal(places)))
+
+
+def _money(value):
+    return str(Decimal(value).quantize(Decimal('0.01')))
+
+
+def _margin(revenue_per_unit, cost_per_unit):
+    """Difference of two _ratio() strings, or None when either is undefined."""
+    if revenue_per_unit is None or cost_per_unit is None:
+        return None
+    return str(Decimal(revenue_per_unit) - Decimal(cost_per_unit))
+
+
+class ReportViewSet(ReplicaReadMixin, viewsets.ViewSet):
     """
     ViewSet for aggregated reports and analytics.
     ALL QUANTITIES ARE IN CRATES (confirmed by Sales model).
     """
     permission_classes = [permissions.IsAuthenticated]
+    replica_actions = '__all__'
 
     def _parse_date(self, date_str, param_name):
         if not date_str:
@@ -31,19 +94,20 @@ class ReportViewSet(viewsets.ViewSet):
         from sales.models import Sale
         from expenses.models import Expense
 
-        report_date_str = request.query_params.get('date', date.today().isoformat())
+        report_date_str = request.query_params.get('date', timezone.localdate().isoformat())
         try:
             report_date = self._parse_date(report_date_str, 'date')
         except ValidationError as e:
             return Response({'error': str(e)}, status=400)
 
-        sales = Sale.objects.filter(sale_datetime__date=report_date)
-        total_revenue = sales.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
-        total_sales_count = sales.count()
-
-        expenses = Expense.objects.filter(date=report_date)
-        total_expenses_amount = expenses.aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00')
-        total_expenses_count = expenses.count()
+        sales, expenses = run_concurrently(
+            lambda: Sale.objects.in_local_dates(report_date).aggregate(total=Sum('total_amount'), count=Count('id')),
+            lambda: Expense.objects.filter(date=report_date).aggregate(total=Sum('amount'), count=Count('id')),
+        )
+        total_revenue = sales['total'] or Decimal('0.00')
+        total_sales_count = sales['count']
+        total_expenses_amount = expenses['total'] or Decimal('0.00')
+        total_expenses_count = expenses['count']
 
         profit = total_revenue - total_expenses_amount
         profit_margin = (profit / total_revenue * 100) if total_revenue > 0 else Decimal('0.00')
@@ -62,48 +126,115 @@ class ReportViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=['get'], url_path='sales-trend')
     def sales_trend(self, request):
-        from sales.models import Sale
-        from django.db.models import Sum
+        """
+        Revenue trend bucketed by day, week or month.
 
-        try:
-            days = int(request.query_params.get('days', 7))
-            days = max(1, min(days, 30))
-        except (ValueError, TypeError):
-            days = 7
+        Query params:
+          granularity  day | week | month (default: day)
+          start, end   YYYY-MM-DD range; falls back to the last `days` days
+          days         legacy window size when no range is given (default: 7)
+          include      comma list of extra series: crates, expenses
 
-        today = date.today()
-        start_date = today - timedelta(days=days - 1)
+        Each series is a single grouped query; empty buckets are filled
+        server-side so the payload is always one value per bucket.
+        """
+        from sales.models import Sale, SaleItem
+        from expenses.models import Expense
 
-        sales_data = Sale.objects.filter(
-            sale_datetime__date__range=[start_date, today]
-        ).values('sale_datetime__date').annotate(
-            total=Sum('total_amount')
-        ).order_by('sale_datetime__date')
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in TREND_TRUNCATORS:
+            return Response({'error': "granularity must be one of: day, week, month"}, status=400)
+
+        start_str = request.query_params.get('start')
+        end_str = request.query_params.get('end')
+        if start_str or end_str:
+            try:
+                start_date = self._parse_date(start_str, 'start')
+                end_date = self._parse_date(end_str, 'end')
+                if start_date > end_date:
+                    return Response({'error': 'start cannot be after end'}, status=400)
+            except ValidationError as e:
+                return Response({'error': str(e)}, status=400)
+        else:
+            try:
+                days = int(request.query_params.get('days', 7))
+                days = max(1, min(days, 30))
+            except (ValueError, TypeError):
+                days = 7
+            end_date = timezone.localdate()
+            start_date = end_date - timedelta(days=days - 1)
+
+        buckets = _trend_buckets(start_date, end_date, granularity)
+        if len(buckets) > MAX_TREND_POINTS:
+            return Response({
+                'error': f'Range produces more than {MAX_TREND_POINTS} {granularity} buckets. '
+                         'Use a coarser granularity or a shorter range.'
+            }, status=400)
+
+        include = {
+            part.strip() for part in request.query_params.get('include', '').split(',') if part.strip()
+        }
+        trunc = TREND_TRUNCATORS[granularity]
 
-        revenue_map = {
-            item['sale_datetime__date'].isoformat(): str(item['total'] or Decimal('0.00'))
-            for item in sales_data
+        sales_data = (
+            Sale.objects
+            .in_local_dates(start_date, end_date)
+            .annotate(bucket=trunc('sale_datetime', output_field=DateField()))
+            .values('bucket')
+            .annotate(total=Sum('total_amount'))
+            .order_by('bucket')
+        )
+        revenue_map = {row['bucket']: row['total'] or Decimal('0.00') for row in sales_data}
+
+        response = {
+            'categories': [b.isoformat() for b in buckets],
+            'values': [str(revenue_map.get(b, Decimal('0.00'))) for b in buckets],
+            'days': (end_date - start_date).days + 1,
+            'granularity': granularity,
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
         }
 
-        categories = []
-        values = []
-        for i in range(days):
-            d = (start_date + timedelta(days=i)).isoformat()
-            categories.append(d)
-            values.append(revenue_map.get(d, '0.00'))
+        series = {}
+        if 'crates' in include:
+            lower, upper = local_date_bounds(start_date, end_date)
+            crate_rows = (
+                SaleItem.objects
+                .filter(sale__sale_datetime__gte=lower, sale__sale_datetime__lt=upper)
+                .annotate(bucket=trunc('sale__sale_datetime', output_field=DateField()))
+                .values('bucket', 'egg_type__name')
+                .annotate(crates=Sum('quantity'))
+                .order_by('egg_type__name', 'bucket')
+            )
+            crates_map = {}
+            for row in crate_rows:
+                crates_map.setdefault(row['egg_type__name'], {})[row['bucket']] = row['crates'] or 0
+            series['crates'] = {
+                name: [by_bucket.get(b, 0) for b in buckets]
+                for name, by_bucket in crates_map.items()
+            }
+
+        if 'expenses' in include:
+            expense_rows = (
+                Expense.objects
+                .filter(date__range=[start_date, end_date])
+                .annotate(bucket=trunc('date'))
+                .values('bucket')
+                .annotate(total=Sum('amount'))
+                .order_by('bucket')
+            )
+            expense_map = {row['bucket']: row['total'] or Decimal('0.00') for row in expense_rows}
+            series['expenses'] = [str(expense_map.get(b, Decimal('0.00'))) for b in buckets]
 
-        return Response({
-            'categories': categories,
-            'values': values,
-            'days': days
-        })
+        if series:
+            response['series'] = series
+        return Response(response)
 
     # ─── SALES REPORT ───────────────────────────────────────────────────
 
     @action(detail=False, methods=['get'], url_path='sales-report')
     def sales_report(self, request):
         from sales.models import Sale, SaleItem
-        from inventory.models import EggType
 
         try:
             start_date = self._parse_date(request.query_params.get('start_date'), 'start_date')
@@ -113,18 +244,19 @@ class ReportViewSet(viewsets.ViewSet):
         except ValidationError as e:
             return Response({'error': str(e)}, status=400)
 
-        sales = Sale.objects.filter(sale_datetime__date__range=[start_date, end_date])
+        sales = Sale.objects.in_local_dates(start_date, end_date)
         total_revenue = sales.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
 
         retail_sales = sales.filter(sale_type='retail')
         wholesale_sales = sales.filter(sale_type='wholesale')
 
+        by_name = lookups.egg_types_by_name()
         try:
-            broken_type = EggType.objects.get(name='Broken')
-            small_type = EggType.objects.get(name='Small')
-            medium_type = EggType.objects.get(name='Medium')
-            big_type = EggType.objects.get(name='Big')
-        except EggType.DoesNotExist:
+            broken_type = by_name['Broken']
+            small_type = by_name['Small']
+            medium_type = by_name['Medium']
+            big_type = by_name['Big']
+        except KeyError:
             broken_type = small_type = medium_type = big_type = None
 
         quantities = {'broken': 0, 'small': 0, 'medium': 0, 'big': 0}
@@ -163,7 +295,7 @@ class ReportViewSet(viewsets.ViewSet):
         except ValidationError as e:
             return Response({'error': str(e)}, status=400)
 
-        sales = Sale.objects.filter(sale_datetime__date__range=[start_date, end_date])
+        sales = Sale.objects.in_local_dates(start_date, end_date)
         expenses = Expense.objects.filter(date__range=[start_date, end_date])
 
         total_revenue = sales.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
@@ -194,7 +326,7 @@ class ReportViewSet(viewsets.ViewSet):
         from inventory.models import IntakeLog
         from sales.models import Sale, SaleItem
 
-        today = date.today()
+        today = timezone.localdate()
 
         intake_logs = IntakeLog.objects.filter(recorded_date__lte=today)
         if not intake_logs.exists():
@@ -205,15 +337,16 @@ class ReportViewSet(viewsets.ViewSet):
         total_medium_intake = intake_logs.aggregate(Sum('medium_crates'))['medium_crates__sum'] or 0
         total_big_intake = intake_logs.aggregate(Sum('big_crates'))['big_crates__sum'] or 0
 
+        by_name = lookups.egg_types_by_name()
         try:
-            broken_type = EggType.objects.get(name='Broken')
-            small_type = EggType.objects.get(name='Small')
-            medium_type = EggType.objects.get(name='Medium')
-            big_type = EggType.objects.get(name='Big')
-        except EggType.DoesNotExist:
+            broken_type = by_name['Broken']
+            small_type = by_name['Small']
+            medium_type = by_name['Medium']
+            big_type = by_name['Big']
+        except KeyError:
             return Response({'error': 'Egg types not configured.'}, status=404)
 
-        sales = Sale.objects.filter(sale_datetime__date__lte=today)
+        sales = Sale.objects.up_to_local_date(today)
         sale_items = SaleItem.objects.filter(sale__in=sales)
 
         total_broken_sold = sale_items.filter(egg_type=broken_type).aggregate(Sum('quantity'))['quantity__sum'] or 0
@@ -255,8 +388,6 @@ class ReportViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=['get'], url_path='expenses-report')
     def expenses_report(self, request):
-        from expenses.models import Expense, ExpenseCategory
-
         try:
             start_date = self._parse_date(request.query_params.get('start_date'), 'start_date')
             end_date = self._parse_date(request.query_params.get('end_date'), 'end_date')
@@ -265,48 +396,68 @@ class ReportViewSet(viewsets.ViewSet):
         except ValidationError as e:
             return Response({'error': str(e)}, status=400)
 
-        expenses = Expense.objects.filter(date__range=[start_date, end_date])
-        total_expenses = expenses.aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00')
-        number_of_days = (end_date - start_date).days + 1
-        average_per_day = (total_expenses / number_of_days).quantize(Decimal('0.01')) if number_of_days > 0 else Decimal('0.00')
+        # With ?stream=1 the item lists are read lazily while the response
+        # is being written rather than built up front.
+        if wants_streaming(request):
+            return StreamingJSONResponse(self._expenses_report_data(start_date, end_date, streaming=True))
+        return Response(self._expenses_report_data(start_date, end_date))
 
-        category_breakdown = []
-        categories = ExpenseCategory.objects.filter(is_active=True)
-        for category in categories:
-            cat_expenses = expenses.filter(category=category)
-            cat_total = cat_expenses.aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00')
-            if cat_total > 0:
-                category_breakdown.append({
-                    'category': category.name,
-                    'total': str(cat_total),
-                    'count': cat_expenses.count(),
-                    'items': [{
-                        'id': e.id, 'date': str(e.date),
-                        'description': e.description, 'amount': str(e.amount),
-                        'notes': e.notes or ''
-                    } for e in cat_expenses]
-                })
+    def _expenses_report_data(self, start_date, end_date, streaming=False):
+        """Report payload shared by the JSON and Excel endpoints."""
+        from expenses.services import ExpenseAggregation
 
-        daily_expenses = {}
-        current_date = start_date
-        while current_date <= end_date:
-            day_total = expenses.filter(date=current_date).aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00')
-            daily_expenses[str(current_date)] = str(day_total)
-            current_date += timedelta(days=1)
+        aggregation = ExpenseAggregation(start_date, end_date)
+        total_expenses = aggregation.total_amount
+        number_of_days = aggregation.number_of_days
+        average_per_day = (total_expenses / number_of_days).quantize(Decimal('0.01')) if number_of_days > 0 else Decimal('0.00')
 
-        return Response({
+        # Breakdown lists active categories with spend; totals include all.
+        reported = [
+            row for row in aggregation.category_totals
+            if row['category__is_active'] and row['total'] > 0
+        ]
+
+        def item_entry(e):
+            return {
+                'id': e.id, 'date': str(e.date),
+                'description': e.description, 'amount': str(e.amount),
+                'notes': e.notes or ''
+            }
+
+        def category_entry(row, items):
+            return {
+                'category': row['category__name'],
+                'total': str(row['total']),
+                'count': row['count'],
+                'items': items,
+            }
+
+        if streaming:
+            def category_breakdown():
+                rows = {row['category_id']: row for row in reported}
+                for category_id, group in aggregation.iter_items_by_category():
+                    if category_id in rows:
+                        yield category_entry(rows[category_id], map(item_entry, group))
+            breakdown = category_breakdown()
+        else:
+            items = aggregation.items_by_category
+            breakdown = [
+                category_entry(row, [item_entry(e) for e in items.get(row['category_id'], [])])
+                for row in reported
+            ]
+
+        return {
             'period': {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()},
             'total_expenses': str(total_expenses),
             'average_expense_per_day': str(average_per_day),
             'number_of_days': number_of_days,
-            'category_breakdown': category_breakdown,
-            'daily_expenses': daily_expenses,
-            'expense_count': expenses.count()
-        })
+            'category_breakdown': breakdown,
+            'daily_expenses': {str(day): str(total) for day, total in aggregation.daily_totals().items()},
+            'expense_count': aggregation.count,
+        }
 
     @action(detail=False, methods=['get'], url_path='expenses-report/excel')
     def expenses_report_excel(self, request):
-        from expenses.models import Expense, ExpenseCategory
         from .utils import create_expenses_excel_report
         from django.http import HttpResponse
 
@@ -318,44 +469,7 @@ class ReportViewSet(viewsets.ViewSet):
         except ValidationError as e:
             return Response({'error': str(e)}, status=400)
 
-        expenses = Expense.objects.filter(date__range=[start_date, end_date])
-        total_expenses = expenses.aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00')
-        number_of_days = (end_date - start_date).days + 1
-        average_per_day = (total_expenses / number_of_days).quantize(Decimal('0.01')) if number_of_days > 0 else Decimal('0.00')
-
-        category_breakdown = []
-        categories = ExpenseCategory.objects.filter(is_active=True)
-        for category in categories:
-            cat_expenses = expenses.filter(category=category)
-            cat_total = cat_expenses.aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00')
-            if cat_total > 0:
-                category_breakdown.append({
-                    'category': category.name,
-                    'total': str(cat_total),
-                    'count': cat_expenses.count(),
-                    'items': [{
-                        'id': e.id, 'date': str(e.date),
-                        'description': e.description, 'amount': str(e.amount),
-                        'notes': e.notes or ''
-                    } for e in cat_expenses]
-                })
-
-        daily_expenses = {}
-        current_date = start_date
-        while current_date <= end_date:
-            day_total = expenses.filter(date=current_date).aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00')
-            daily_expenses[str(current_date)] = str(day_total)
-            current_date += timedelta(days=1)
-
-        report_data = {
-            'period': {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()},
-            'total_expenses': str(total_expenses),
-            'average_expense_per_day': str(average_per_day),
-            'number_of_days': number_of_days,
-            'category_breakdown': category_breakdown,
-            'daily_expenses': daily_expenses,
-            'expense_count': expenses.count()
-        }
+        report_data = self._expenses_report_data(start_date, end_date)
 
         wb = create_expenses_excel_report(report_data)
         response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
@@ -368,8 +482,6 @@ class ReportViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path='sales-report/excel')
     def sales_report_excel(self, request):
         from sales.models import Sale, SaleItem
-        from inventory.models import EggType
-        from customers.models import WholesaleCustomer
         from .utils import create_sales_excel_report
         from django.http import HttpResponse
 
@@ -381,51 +493,70 @@ class ReportViewSet(viewsets.ViewSet):
         except ValidationError as e:
             return Response({'error': str(e)}, status=400)
 
-        sales = Sale.objects.filter(sale_datetime__date__range=[start_date, end_date])
-        total_revenue = sales.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
-        total_sales = sales.count()
-        retail_sales = sales.filter(sale_type='retail')
-        wholesale_sales = sales.filter(sale_type='wholesale')
+        sales = Sale.objects.in_local_dates(start_date, end_date)
+        sale_items = SaleItem.objects.filter(sale__in=sales)
 
-        egg_types = {
-            'Broken': EggType.objects.filter(name='Broken').first(),
-            'Small': EggType.objects.filter(name='Small').first(),
-            'Medium': EggType.objects.filter(name='Medium').first(),
-            'Big': EggType.objects.filter(name='Big').first(),
+        # One grouped query per breakdown, rather than one per customer,
+        # day and egg type.
+        by_type = {
+            row['sale_type']: row
+            for row in sales.values('sale_type').annotate(count=Count('id'), revenue=Sum('total_amount')).order_by()
         }
 
-        sale_items = SaleItem.objects.filter(sale__in=sales).select_related('egg_type', 'sale__customer')
-
-        customer_breakdown = []
-        customers = WholesaleCustomer.objects.filter(is_active=True)
-        for customer in customers:
-            c_sales = sales.filter(customer=customer)
-            if c_sales.exists():
-                c_total = c_sales.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
-                customer_breakdown.append({
-                    'customer': customer.name,
-                    'total': str(c_total),
-                    'transaction_count': c_sales.count(),
-                })
-
+        def type_totals(*sale_types):
+            rows = [by_type[sale_type] for sale_type in sale_types if sale_type in by_type]
+            return sum(row['count'] for row in rows), _money(sum(row['revenue'] or 0 for row in rows))
+
+        total_sales, total_revenue = type_totals(*by_type)
+        retail_count, retail_revenue = type_totals('retail')
+        wholesale_count, wholesale_revenue = type_totals('wholesale')
+
+        customer_breakdown = [
+            {'customer': row['customer__name'], 'total': _money(row['total']), 'transaction_count': row['count']}
+            for row in (
+                sales.filter(customer__is_active=True)
+                .values('customer_id', 'customer__name')
+                .annotate(total=Sum('total_amount'), count=Count('id'))
+                .order_by('customer__name', 'customer_id')
+            )
+        ]
+
+        by_day = {
+            row['day']: row
+            for row in (
+                sales.annotate(day=TruncDate('sale_datetime'))
+                .values('day')
+                .annotate(count=Count('id'), revenue=Sum('total_amount'))
+                .order_by()
+            )
+        }
         daily_sales = {}
         current_date = start_date
         while current_date <= end_date:
-            day_sales = sales.filter(sale_datetime__date=current_date)
-            day_revenue = day_sales.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
-            daily_sales[str(current_date)] = {'count': day_sales.count(), 'revenue': str(day_revenue)}
+            row = by_day.get(current_date, {'count': 0, 'revenue': 0})
+            daily_sales[str(current_date)] = {'count': row['count'], 'revenue': _money(row['revenue'])}
             current_date += timedelta(days=1)
 
+        by_egg_type = {
+            row['egg_type_id']: row
+            for row in sale_items.values('egg_type_id').annotate(crates=Sum('quantity'), revenue=Sum('line_total')).order_by()
+        }
+        by_name = lookups.egg_types_by_name()
+        egg_types = {name: by_name.get(name) for name in ('Broken', 'Small', 'Medium', 'Big')}
+
+        def egg_type_totals(egg_type):
+            row = by_egg_type.get(egg_type.pk) if egg_type else None
+            return (row['crates'] or 0, row['revenue'] or 0) if row else (0, 0)
+
         egg_type_breakdown = []
         for egg_name, egg_type in egg_types.items():
             if egg_type:
-                type_items = sale_items.filter(egg_type=egg_type)
-                total_crates = type_items.aggregate(Sum('quantity'))['quantity__sum'] or 0
-                type_revenue = sum(item.line_total for item in type_items)
+                total_crates, type_revenue = egg_type_totals(egg_type)
                 egg_type_breakdown.append({
-                    'egg_type': egg_name, 'total_crates': total_crates, 'revenue': str(type_revenue),
+                    'egg_type': egg_name, 'total_crates': total_crates, 'revenue': _money(type_revenue),
                 })
 
+        sale_items = sale_items.select_related('egg_type', 'sale__customer')
         transactions = []
         for item in sale_items:
             transactions.append({
@@ -442,16 +573,13 @@ class ReportViewSet(viewsets.ViewSet):
         report_data = {
             'period': {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()},
             'total_sales': total_sales,
-            'total_revenue': str(total_revenue),
-            'retail_count': retail_sales.count(),
-            'retail_revenue': str(retail_sales.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')),
-            'wholesale_count': wholesale_sales.count(),
-            'wholesale_revenue': str(wholesale_sales.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')),
+            'total_revenue': total_revenue,
+            'retail_count': retail_count,
+            'retail_revenue': retail_revenue,
+            'wholesale_count': wholesale_count,
+            'wholesale_revenue': wholesale_revenue,
             'quantities': {
-                'broken': sale_items.filter(egg_type=egg_types.get('Broken')).aggregate(Sum('quantity'))['quantity__sum'] or 0,
-                'small': sale_items.filter(egg_type=egg_types.get('Small')).aggregate(Sum('quantity'))['quantity__sum'] or 0,
-                'medium': sale_items.filter(egg_type=egg_types.get('Medium')).aggregate(Sum('quantity'))['quantity__sum'] or 0,
-                'big': sale_items.filter(egg_type=egg_types.get('Big')).aggregate(Sum('quantity'))['quantity__sum'] or 0,
+                name.lower(): egg_type_totals(egg_type)[0] for name, egg_type in egg_types.items()
             },
             'customer_breakdown': customer_breakdown,
             'daily_sales': daily_sales,
@@ -482,7 +610,7 @@ class ReportViewSet(viewsets.ViewSet):
         except ValidationError as e:
             return Response({'error': str(e)}, status=400)
 
-        sales = Sale.objects.filter(sale_datetime__date__range=[start_date, end_date])
+        sales = Sale.objects.in_local_dates(start_date, end_date)
         expenses = Expense.objects.filter(date__range=[start_date, end_date])
 
         total_revenue = sales.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
@@ -526,14 +654,21 @@ class ReportViewSet(viewsets.ViewSet):
         Per-customer breakdown: egg types, daily history (active days only),
         credit payment history, outstanding balance.
 
+        Query params (besides start_date / end_date):
+          mode         full (default) | summary — summary returns ranked
+                       per-customer totals only, paginated
+          page, page_size
+                       summary pagination (default 1 / 50, max 200)
+          customer_id  drill-down: full nested detail for one customer
+          stream       1 → chunked JSON, customers encoded as they are built
+
         Optimised: bulk-fetches all data in a handful of queries instead of
         N+1 per customer.
         """
-        from sales.models import Sale, SaleItem, CreditPayment
+        return self._customer_report(request, streaming=wants_streaming(request))
+
+    def _customer_report(self, request, streaming=False):
         from customers.models import WholesaleCustomer
-        from inventory.models import EggType
-        from django.db.models import F
-        from collections import defaultdict
 
         try:
             start_date = self._parse_date(request.query_params.get('start_date'), 'start_date')
@@ -543,172 +678,331 @@ class ReportViewSet(viewsets.ViewSet):
         except ValidationError as e:
             return Response({'error': str(e)}, status=400)
 
-        # ── 1. All-time balance aggregates (2 queries) ──────────────────
-        alltime_sales_agg = (
-            Sale.objects
-            .filter(customer__isnull=False)
-            .values('customer_id')
+        mode = request.query_params.get('mode', 'full')
+        if mode not in ('full', 'summary'):
+            return Response({'error': "mode must be 'full' or 'summary'"}, status=400)
+
+        customer_id = request.query_params.get('customer_id')
+        if customer_id:
+            try:
+                customer = WholesaleCustomer.objects.get(pk=int(customer_id))
+            except (ValueError, TypeError):
+                return Response({'error': 'customer_id must be an integer'}, status=400)
+            except WholesaleCustomer.DoesNotExist:
+                return Response({'error': 'Customer not found'}, status=404)
+        elif mode == 'summary':
+            return self._customer_report_summary(request, start_date, end_date)
+        else:
+            customer = None
+
+        period = {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()}
+        if streaming:
+            # customer_count is omitted: it is only known once the list is done.
+            return StreamingJSONResponse({
+                'period': period,
+                'customers': self._iter_customer_report(start_date, end_date, customer=customer),
+            })
+
+        customers_data = self._customer_report_detail(start_date, end_date, customer=customer)
+        return Response({
+            'period': period,
+            'customer_count': len(customers_data),
+            'customers': customers_data,
+        })
+
+    def _customer_report_summary(self, request, start_date, end_date):
+        """
+        Customers with in-range sales, ranked by all-time outstanding balance
+        in SQL. One count query plus one page query, no nested detail.
+        """
+        from sales.models import Sale, CreditPayment
+        from customers.models import WholesaleCustomer
+        from django.db.models import Count, Exists, OuterRef, Subquery, Value, DecimalField
+        from django.db.models.functions import Coalesce
+
+        try:
+            page = max(1, int(request.query_params.get('page', 1)))
+            page_size = max(1, min(int(request.query_params.get('page_size', 50)), 200))
+        except (ValueError, TypeError):
+            return Response({'error': 'page and page_size must be integers'}, status=400)
+
+        money = DecimalField(max_digits=14, decimal_places=2)
+        zero = Value(Decimal('0.00'), output_field=money)
+
+        def per_customer(queryset, expression):
+            return Coalesce(Subquery(
+                queryset.filter(customer=OuterRef('pk'))
+                .order_by().values('customer')
+                .annotate(v=expression).values('v')[:1],
+                output_field=money,
+            ), zero)
+
+        range_sales = Sale.objects.in_local_dates(start_date, end_date)
+        customers = (
+            WholesaleCustomer.objects
+            .filter(is_active=True)
+            .filter(Exists(range_sales.filter(customer=OuterRef('pk'))))
             .annotate(
-                total_purchased=Sum('total_amount'),
-                total_upfront=Sum('amount_paid'),
+                total_purchased_in_range=per_customer(range_sales, Sum('total_amount')),
+                total_paid_in_range=per_customer(range_sales, Sum('amount_paid')),
+                transaction_count=Coalesce(Subquery(
+                    range_sales.filter(customer=OuterRef('pk'))
+                    .order_by().values('customer')
+                    .annotate(n=Count('id')).values('n')[:1]
+                ), Value(0)),
+                outstanding_balance=(
+                    per_customer(Sale.objects.all(), Sum('total_amount'))
+                    - per_customer(Sale.objects.all(), Sum('amount_paid'))
+                    - per_customer(CreditPayment.objects.all(), Sum('amount_paid'))
+                ),
             )
+            .order_by('-outstanding_balance', 'name')
         )
-        alltime_map = {
-            row['customer_id']: row for row in alltime_sales_agg
-        }
 
-        alltime_credit_agg = (
-            CreditPayment.objects
-            .values('customer_id')
-            .annotate(total_credit=Sum('amount_paid'))
-        )
-        credit_alltime_map = {
-            row['customer_id']: row['total_credit'] for row in alltime_credit_agg
-        }
+        total = customers.count()
+        offset = (page - 1) * page_size
+        rows = customers.values(
+            'id', 'name', 'phone', 'total_purchased_in_range', 'total_paid_in_range',
+            'transaction_count', 'outstanding_balance',
+        )[offset:offset + page_size]
 
-        # ── 2. In-range sales (1 query, prefetch items) ────────────────
-        range_sales = list(
-            Sale.objects
-            .filter(
-                customer__isnull=False,
-                sale_datetime__date__range=[start_date, end_date],
-            )
-            .select_related('customer')
-            .prefetch_related('items__egg_type')
-            .order_by('customer_id', 'sale_datetime')
-        )
+        return Response({
+            'period': {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()},
+            'mode': 'summary',
+            'customer_count': total,
+            'page': page,
+            'page_size': page_size,
+            'num_pages': (total + page_size - 1) // page_size,
+            'customers': [{
+                'customer_id': row['id'],
+                'customer_name': row['name'],
+                'phone': row['phone'],
+                'summary': {
+                    'total_purchased_in_range': str(row['total_purchased_in_range']),
+                    'total_paid_in_range': str(row['total_paid_in_range']),
+                    'transaction_count': row['transaction_count'],
+                    'outstanding_balance_alltime': str(row['outstanding_balance']),
+                },
+            } for row in rows],
+        })
 
-        # Group sales by customer
-        sales_by_customer = defaultdict(list)
-        for sale in range_sales:
-            sales_by_customer[sale.customer_id].append(sale)
+    def _customer_report_detail(self, start_date, end_date, customer=None):
+        """Materialised list of _iter_customer_report() entries."""
+        return list(self._iter_customer_report(start_date, end_date, customer=customer))
 
-        # ── 3. In-range credit payments (1 query) ──────────────────────
-        range_credits = list(
-            CreditPayment.objects
-            .filter(payment_date__date__range=[start_date, end_date])
-            .order_by('customer_id', 'payment_date')
-        )
-        credits_by_customer = defaultdict(list)
-        for cp in range_credits:
-            credits_by_customer[cp.customer_id].append(cp)
+    def _iter_customer_report(self, start_date, end_date, customer=None):
+        """
+        Yield full nested report entries (egg breakdown, daily history,
+        credit payments), ordered by outstanding balance descending.
+
+        Customers are ranked up front from the all-time aggregates; sales,
+        items and credit payments are then fetched for CUSTOMER_REPORT_BATCH
+        customers at a time via .iterator(), so memory stays bounded by the
+        batch rather than the whole report. When `customer` is given every
+        query is restricted to that customer and it is always returned.
+        """
+        from sales.models import Sale, SaleItem, CreditPayment
+        from customers.models import WholesaleCustomer
+        from django.db.models import Exists, OuterRef, Prefetch
+        from collections import defaultdict
 
-        # ── 4. Active egg types (1 query) ──────────────────────────────
-        active_egg_types = list(EggType.objects.filter(is_active=True).order_by('order'))
+        customer_filter = {'customer_id': customer.id} if customer else {}
+
+        # ── 1. All-time balances, ranked customers and active egg types
+        #       (4 independent queries, run concurrently) ──────────────
+        def alltime_sales():
+            return {
+                row['customer_id']: row
+                for row in (
+                    Sale.objects
+                    .filter(customer__isnull=False, **customer_filter)
+                    .values('customer_id')
+                    .annotate(
+                        total_purchased=Sum('total_amount'),
+                        total_upfront=Sum('amount_paid'),
+                    )
+                )
+            }
+
+        def alltime_credits():
+            return {
+                row['customer_id']: row['total_credit']
+                for row in (
+                    CreditPayment.objects
+                    .filter(**customer_filter)
+                    .values('customer_id')
+                    .annotate(total_credit=Sum('amount_paid'))
+                )
+            }
+
+        def report_customers():
+            # Only include customers that have sales in the range
+            if customer:
+                return [customer]
+            in_range = Sale.objects.in_local_dates(start_date, end_date).filter(customer=OuterRef('pk'))
+            return list(
+                WholesaleCustomer.objects
+                .filter(is_active=True)
+                .filter(Exists(in_range))
+                .only('id', 'name', 'phone')
+                .order_by('name')
+            )
 
-        # ── 5. Build response per customer ──────────────────────────────
-        # Only include customers that have sales in the range
-        customer_ids_with_sales = set(sales_by_customer.keys())
-        customers_qs = (
-            WholesaleCustomer.objects
-            .filter(is_active=True, id__in=customer_ids_with_sales)
-            .order_by('name')
+        alltime_map, credit_alltime_map, customers, active_egg_types = run_concurrently(
+            alltime_sales,
+            alltime_credits,
+            report_customers,
+            lookups.active_egg_types,
         )
 
-        customers_data = []
-        for customer in customers_qs:
-            cid = customer.id
-            c_sales = sales_by_customer.get(cid, [])
-
-            # All-time balance
+        def outstanding_for(cid):
             at = alltime_map.get(cid, {})
-            total_purchased_alltime = at.get('total_purchased') or Decimal('0.00')
-            total_upfront_alltime = at.get('total_upfront') or Decimal('0.00')
-            total_credit_alltime = credit_alltime_map.get(cid) or Decimal('0.00')
-            outstanding_balance = total_purchased_alltime - total_upfront_alltime - total_credit_alltime
-
-            # In-range totals
-            range_total = sum(s.total_amount for s in c_sales)
-            range_paid = sum(s.amount_paid for s in c_sales)
-
-            # Egg type breakdown (from prefetched items)
-            egg_qty = defaultdict(int)
-            egg_rev = defaultdict(Decimal)
-            for sale in c_sales:
-                for item in sale.items.all():  # already prefetched
-                    egg_qty[item.egg_type_id] += item.quantity
-                    egg_rev[item.egg_type_id] += item.line_total
-
-            egg_breakdown = []
-            for et in active_egg_types:
-                qty = egg_qty.get(et.id, 0)
-                if qty > 0:
-                    egg_breakdown.append({
-                        'egg_type': et.name,
-                        'crates': qty,
-                        'revenue': str(egg_rev.get(et.id, Decimal('0.00'))),
-                    })
-
-            # Daily purchase history
-            running_balance = Decimal('0.00')
-            daily_history = []
-            for sale in c_sales:
-                sale_balance = sale.total_amount - sale.amount_paid
-                running_balance += sale_balance
-
-                items_detail = [{
-                    'egg_type': item.egg_type.name,
-                    'crates': item.quantity,
-                    'price_per_crate': str(item.price_per_crate or Decimal('0.00')),
-                    'line_total': str(item.line_total),
-                } for item in sale.items.all()]
-
-                daily_history.append({
-                    'date': sale.sale_datetime.date().isoformat(),
-                    'sale_id': sale.id,
-                    'items': items_detail,
-                    'sale_total': str(sale.total_amount),
-                    'amount_paid': str(sale.amount_paid),
-                    'payment_status': sale.payment_status,
-                    'running_balance': str(running_balance),
+            return (
+                (at.get('total_purchased') or Decimal('0.00'))
+                - (at.get('total_upfront') or Decimal('0.00'))
+                - (credit_alltime_map.get(cid) or Decimal('0.00'))
+            )
+
+        # ── 2. Rank by balance ─────────────────────────────────────────
+        # Stable sort keeps name order among equal balances.
+        customers.sort(key=lambda c: outstanding_for(c.id), reverse=True)
+
+        # ── 3. Per batch: in-range sales + items, credit payments ───────
+        for offset in range(0, len(customers), CUSTOMER_REPORT_BATCH):
+            batch = customers[offset:offset + CUSTOMER_REPORT_BATCH]
+            batch_ids = [c.id for c in batch]
+
+            def batch_sales():
+                sales_by_customer = defaultdict(list)
+                range_sales = (
+                    Sale.objects
+                    .in_local_dates(start_date, end_date)
+                    .filter(customer_id__in=batch_ids)
+                    .prefetch_related(Prefetch('items', queryset=SaleItem.objects.select_related('egg_type')))
+                    .order_by('customer_id', 'sale_datetime')
+                )
+                for sale in range_sales.iterator(chunk_size=2000):
+                    sales_by_customer[sale.customer_id].append(sale)
+                return sales_by_customer
+
+            def batch_credits():
+                credits_by_customer = defaultdict(list)
+                range_credits = (
+                    CreditPayment.objects
+                    .in_local_dates(start_date, end_date)
+                    .filter(customer_id__in=batch_ids)
+                    .order_by('customer_id', 'payment_date')
+                )
+                for cp in range_credits.iterator(chunk_size=2000):
+                    credits_by_customer[cp.customer_id].append(cp)
+                return credits_by_customer
+
+            sales_by_customer, credits_by_customer = run_concurrently(batch_sales, batch_credits)
+
+            for c in batch:
+                yield self._customer_report_entry(
+                    c, sales_by_customer.pop(c.id, []), credits_by_customer.pop(c.id, []),
+                    outstanding_for(c.id), active_egg_types,
+                )
+
+    def _customer_report_entry(self, customer, c_sales, c_credits, outstanding_balance, active_egg_types):
+        """Build one customer's nested report entry from pre-fetched rows."""
+        from collections import defaultdict
+
+        # In-range totals
+        range_total = sum(s.total_amount for s in c_sales)
+        range_paid = sum(s.amount_paid for s in c_sales)
+
+        # Egg type breakdown (from prefetched items)
+        egg_qty = defaultdict(int)
+        egg_rev = defaultdict(Decimal)
+        for sale in c_sales:
+            for item in sale.items.all():  # already prefetched
+                egg_qty[item.egg_type_id] += item.quantity
+                egg_rev[item.egg_type_id] += item.line_total
+
+        egg_breakdown = []
+        for et in active_egg_types:
+            qty = egg_qty.get(et.id, 0)
+            if qty > 0:
+                egg_breakdown.append({
+                    'egg_type': et.name,
+                    'crates': qty,
+                    'revenue': str(egg_rev.get(et.id, Decimal('0.00'))),
                 })
 
-            # Credit payment history
-            credit_history = [{
-                'id': cp.id,
-                'date': cp.payment_date.date().isoformat(),
-                'amount': str(cp.amount_paid),
-                'sale_id': cp.sale_id,
-                'notes': cp.notes,
-            } for cp in credits_by_customer.get(cid, [])]
-
-            customers_data.append({
-                'customer_id': cid,
-                'customer_name': customer.name,
-                'phone': customer.phone,
-                'summary': {
-                    'total_purchased_in_range': str(range_total),
-                    'total_paid_in_range': str(range_paid),
-                    'transaction_count': len(c_sales),
-                    'outstanding_balance_alltime': str(outstanding_balance),
-                },
-                'egg_breakdown': egg_breakdown,
-                'daily_history': daily_history,
-                'credit_payments': credit_history,
-            })
+        # Daily purchase history
+        running_balance = Decimal('0.00')
+        daily_history = []
+        for sale in c_sales:
+            sale_balance = sale.total_amount - sale.amount_paid
+            running_balance += sale_balance
 
-        # Sort by outstanding balance descending
-        customers_data.sort(
-            key=lambda x: Decimal(x['summary']['outstanding_balance_alltime']),
-            reverse=True
-        )
+            items_detail = [{
+                'egg_type': item.egg_type.name,
+                'crates': item.quantity,
+                'price_per_crate': str(item.price_per_crate or Decimal('0.00')),
+                'line_total': str(item.line_total),
+            } for item in sale.items.all()]
+
+            daily_history.append({
+                'date': sale.sale_datetime.date().isoformat(),
+                'sale_id': sale.id,
+                'items': items_detail,
+                'sale_total': str(sale.total_amount),
+                'amount_paid': str(sale.amount_paid),
+                'payment_status': sale.payment_status,
+                'running_balance': str(running_balance),
+            })
 
-        return Response({
-            'period': {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()},
-            'customer_count': len(customers_data),
-            'customers': customers_data,
-        })
+        # Credit payment history
+        credit_history = [{
+            'id': cp.id,
+            'date': cp.payment_date.date().isoformat(),
+            'amount': str(cp.amount_paid),
+            'sale_id': cp.sale_id,
+            'notes': cp.notes,
+        } for cp in c_credits]
+
+        return {
+            'customer_id': customer.id,
+            'customer_name': customer.name,
+            'phone': customer.phone,
+            'summary': {
+                'total_purchased_in_range': str(range_total),
+                'total_paid_in_range': str(range_paid),
+                'transaction_count': len(c_sales),
+                'outstanding_balance_alltime': str(outstanding_balance),
+            },
+            'egg_breakdown': egg_breakdown,
+            'daily_history': daily_history,
+            'credit_payments': credit_history,
+        }
 
     # ─── CUSTOMER REPORT EXCEL ──────────────────────────────────────────
 
     @action(detail=False, methods=['get'], url_path='customer-report/excel')
     def customer_report_excel(self, request):
-        """Export customer report as Excel — reuses the optimised JSON logic."""
-        from .utils import create_customer_excel_report
+        """
+        Export customer report as Excel — reuses the optimised JSON logic.
+
+        file_format: xlsx (default) — one workbook, a sheet per customer;
+        zip — Summary.xlsx plus one workbook per customer, built in
+        REPORT_EXCEL_PROCESSES worker processes when that is above 1.
+        """
+        from .utils import save_customer_excel_report, save_customer_excel_zip
+        from django.conf import settings
         from django.http import HttpResponse
 
+        file_format = request.query_params.get('file_format', 'xlsx')
+        if file_format not in ('xlsx', 'zip'):
+            return Response({'error': "file_format must be 'xlsx' or 'zip'"}, status=400)
+        # The workbook is laid out for full per-customer detail.
+        if request.query_params.get('mode', 'full') != 'full':
+            return Response({'error': "mode must be 'full' for the Excel export"}, status=400)
+
         # Reuse the JSON endpoint to build report_data
-        json_response = self.customer_report(request)
+        json_response = self._customer_report(request, streaming=False)
         if json_response.status_code != 200:
             return json_response
 
@@ -721,8 +1015,282 @@ class ReportViewSet(viewsets.ViewSet):
             start_date = 'report'
             end_date = 'report'
 
-        wb = create_customer_excel_report(report_data)
+        processes = settings.REPORT_EXCEL_PROCESSES
+        if file_format == 'zip':
+            response = HttpResponse(content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename=customer_report_{start_date}_to_{end_date}.zip'
+            save_customer_excel_zip(report_data, response, processes=processes)
+            return response
+
         response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
         response['Content-Disposition'] = f'attachment; filename=customer_report_{start_date}_to_{end_date}.xlsx'
+        save_customer_excel_report(report_data, response)
+        return response
+    # ─── RECEIVABLES AGING ──────────────────────────────────────────────
+
+    @action(detail=False, methods=['get'], url_path='receivables-aging')
+    def receivables_aging(self, request):
+        """
+        Outstanding wholesale balances per customer in 0-30 / 31-60 /
+        61-90 / 90+ day buckets, as of `as_of` (default today).
+        See reports/aging.py.
+        """
+        from .aging import receivables_aging
+
+        as_of_str = request.query_params.get('as_of', timezone.localdate().isoformat())
+        try:
+            as_of = self._parse_date(as_of_str, 'as_of')
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(receivables_aging(as_of))
+
+    @action(detail=False, methods=['get'], url_path='receivables-aging/excel')
+    def receivables_aging_excel(self, request):
+        from .utils import create_receivables_aging_excel
+        from django.http import HttpResponse
+
+        json_response = self.receivables_aging(request)
+        if json_response.status_code != 200:
+            return json_response
+        report_data = json_response.data
+
+        wb = create_receivables_aging_excel(report_data)
+        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        response['Content-Disposition'] = f"attachment; filename=receivables_aging_{report_data['as_of']}.xlsx"
         wb.save(response)
-        return response
\ No newline at end of file
+        return response
+
+    # ─── BULK EXPORT ────────────────────────────────────────────────────
+
+    @action(detail=False, methods=['get'], url_path='bulk-export')
+    def bulk_export(self, request):
+        """
+        Stream one raw table for a date range (see reports/exports.py).
+
+        Query params: dataset (sales | credit_payments | expenses | intake |
+        egg_production | flock_events), start_date, end_date,
+        file_format (csv | csv.gz | parquet | tcsv.gz, default csv.gz;
+        not 'format', which DRF reserves for renderer selection).
+        parquet falls back to tcsv.gz when pyarrow is not installed.
+        """
+        from .exports import export
+        from django.http import StreamingHttpResponse
+
+        try:
+            start_date = self._parse_date(request.query_params.get('start_date'), 'start_date')
+            end_date = self._parse_date(request.query_params.get('end_date'), 'end_date')
+            if start_date > end_date:
+                return Response({'error': 'start_date cannot be after end_date'}, status=400)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=400)
+
+        try:
+            result = export(
+                request.query_params.get('dataset', ''),
+                start_date, end_date,
+                request.query_params.get('file_format', 'csv.gz'),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        response = StreamingHttpResponse(result.chunks, content_type=result.content_type)
+        response['Content-Disposition'] = f'attachment; filename={result.filename}'
+        return response
+
+    # ─── PRODUCTION ANALYTICS ───────────────────────────────────────────
+
+    @action(detail=False, methods=['get'], url_path='production-analytics')
+    def production_analytics(self, request):
+        """
+        Cost per crate, feed cost per bird-day, and revenue / margin per
+        crate by egg type, bucketed by day, week or month.
+
+        Query params: start_date, end_date, granularity (day | week | month).
+
+        Reads the precomputed daily rollups (reports/rollups.py), which
+        `refresh_report_rollups --pending` keeps current; pending_days
+        counts days in the range whose rollup is missing or still stale. Production cost is all
+        expenses, feed cost is the REPORTS_FEED_CATEGORY category.
+        """
+        from django.conf import settings
+        from .models import DailyEggTypeRollup, DailyProductionRollup
+
+        try:
+            start_date = self._parse_date(request.query_params.get('start_date'), 'start_date')
+            end_date = self._parse_date(request.query_params.get('end_date'), 'end_date')
+            if start_date > end_date:
+                return Response({'error': 'start_date cannot be after end_date'}, status=400)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=400)
+
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in TREND_TRUNCATORS:
+            return Response({'error': "granularity must be one of: day, week, month"}, status=400)
+        buckets = _trend_buckets(start_date, end_date, granularity)
+        if len(buckets) > MAX_TREND_POINTS:
+            return Response({
+                'error': f'Range produces more than {MAX_TREND_POINTS} {granularity} buckets. '
+                         'Use a coarser granularity or a shorter range.'
+            }, status=400)
+
+        trunc = TREND_TRUNCATORS[granularity]
+
+        daily_rows = (
+            DailyProductionRollup.objects
+            .filter(date__range=[start_date, end_date])
+            .annotate(bucket=trunc('date'))
+            .values('bucket')
+            .annotate(
+                crates_produced=Sum('crates_produced'),
+                bird_days=Sum('bird_days'),
+                feed_cost=Sum('feed_cost'),
+                other_cost=Sum('other_cost'),
+                current_days=Count('pk', filter=Q(is_stale=False)),
+            )
+            .order_by('bucket')
+        )
+        daily_map = {row['bucket']: row for row in daily_rows}
+        current_days = sum(row['current_days'] for row in daily_map.values())
+
+        egg_rows = (
+            DailyEggTypeRollup.objects
+            .filter(date__range=[start_date, end_date])
+            .annotate(bucket=trunc('date'))
+            .values('bucket', 'egg_type__name', 'egg_type__order')
+            .annotate(
+                crates_produced=Sum('crates_produced'),
+                crates_sold=Sum('crates_sold'),
+                revenue=Sum('revenue'),
+            )
+            .order_by('bucket', 'egg_type__order', 'egg_type__name')
+        )
+        egg_map = {}
+        for row in egg_rows:
+            egg_map.setdefault(row['bucket'], []).append(row)
+
+        zero = Decimal('0.00')
+
+        def metrics(daily, egg_types):
+            produced = daily.get('crates_produced') or zero
+            feed_cost = daily.get('feed_cost') or zero
+            total_cost = feed_cost + (daily.get('other_cost') or zero)
+            bird_days = daily.get('bird_days') or 0
+            cost_per_crate = _ratio(total_cost, produced)
+            revenue = sum((row['revenue'] or zero for row in egg_types), zero)
+            crates_sold = sum(row['crates_sold'] or 0 for row in egg_types)
+            revenue_per_crate = _ratio(revenue, crates_sold)
+
+            by_type = []
+            for row in egg_types:
+                type_revenue_per_crate = _ratio(row['revenue'], row['crates_sold'])
+                by_type.append({
+                    'egg_type': row['egg_type__name'],
+                    'crates_produced': _money(row['crates_produced'] or zero),
+                    'crates_sold': row['crates_sold'] or 0,
+                    'revenue': _money(row['revenue'] or zero),
+                    'revenue_per_crate': type_revenue_per_crate,
+                    'margin_per_crate': _margin(type_revenue_per_crate, cost_per_crate),
+                })
+
+            return {
+                'crates_produced': _money(produced),
+                'crates_sold': crates_sold,
+                'revenue': _money(revenue),
+                'bird_days': bird_days,
+                'feed_cost': _money(feed_cost),
+                'total_cost': _money(total_cost),
+                'cost_per_crate': cost_per_crate,
+                'feed_cost_per_crate': _ratio(feed_cost, produced),
+                'feed_cost_per_bird_day': _ratio(feed_cost, bird_days, '0.0001'),
+                'revenue_per_crate': revenue_per_crate,
+                'margin_per_crate': _margin(revenue_per_crate, cost_per_crate),
+                'egg_types': by_type,
+            }
+
+        periods = []
+        for bucket in buckets:
+            periods.append({'period_start': bucket.isoformat(),
+                            **metrics(daily_map.get(bucket, {}), egg_map.get(bucket, []))})
+
+        # Whole-range totals from the bucket rows already fetched.
+        total_daily = {
+            key: sum((row[key] or 0 for row in daily_map.values()), 0)
+            for key in ('crates_produced', 'bird_days', 'feed_cost', 'other_cost')
+        }
+        total_types = {}
+        for rows in egg_map.values():
+            for row in rows:
+                agg = total_types.setdefault(row['egg_type__name'], {
+                    'egg_type__name': row['egg_type__name'], 'egg_type__order': row['egg_type__order'],
+                    'crates_produced': zero, 'crates_sold': 0, 'revenue': zero,
+                })
+                agg['crates_produced'] += row['crates_produced'] or zero
+                agg['crates_sold'] += row['crates_sold'] or 0
+                agg['revenue'] += row['revenue'] or zero
+        total_type_rows = sorted(total_types.values(), key=lambda r: (r['egg_type__order'], r['egg_type__name']))
+
+        return Response({
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'granularity': granularity,
+            'feed_category': settings.REPORTS_FEED_CATEGORY,
+            'pending_days': (end_date - start_date).days + 1 - current_days,
+            'totals': metrics(total_daily, total_type_rows),
+            'periods': periods,
+        })
+
+
+class CustomerStatementViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """Stored customer statements (reports/statements.py)."""
+    queryset = CustomerStatement.objects.select_related('customer')
+    serializer_class = CustomerStatementSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['customer', 'period_start', 'period_end']
+    ordering_fields = ['period_end', 'closing_balance', 'generated_at']
+
+    @action(detail=True, methods=['get'], url_path='download')
+    def download(self, request, pk=None):
+        from django.http import FileResponse
+
+        statement = self.get_object()
+        if not statement.file or not statement.file.storage.exists(statement.file.name):
+            return Response({'error': 'Statement file is missing; regenerate the period'}, status=404)
+        filename = f'statement_{statement.customer.name}_{statement.period_start}_to_{statement.period_end}.xlsx'
+        return FileResponse(statement.file.open('rb'), as_attachment=True, filename=filename)
+
+    @action(detail=False, methods=['post'], url_path='generate')
+    def generate(self, request):
+        """
+        Generate the period's statements: month=YYYY-MM, or start_date and
+        end_date (default: the previous month). Only statements whose data
+        changed since the last run are re-rendered unless force=true.
+        Answers 409 while another run is writing the same period.
+        """
+        from django.conf import settings
+        from .statements import StatementsInProgress, generate_statements, month_period
+
+        data = request.data
+        try:
+            if data.get('start_date') or data.get('end_date'):
+                start_date = date.fromisoformat(data.get('start_date') or '')
+                end_date = date.fromisoformat(data.get('end_date') or '')
+            else:
+                start_date, end_date = month_period(data.get('month'))
+        except (ValueError, TypeError):
+            return Response({'error': 'Give month=YYYY-MM, or start_date and end_date as YYYY-MM-DD'}, status=400)
+        if start_date > end_date:
+            return Response({'error': 'start_date cannot be after end_date'}, status=400)
+
+        force = str(data.get('force', '')).lower() in ('1', 'true')
+        try:
+            generated, unchanged = generate_statements(
+                start_date, end_date, force=force, processes=settings.REPORT_EXCEL_PROCESSES,
+            )
+        except StatementsInProgress as exc:
+            return Response({'error': str(exc)}, status=409)
+        return Response({
+            'period': {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()},
+            'generated': generated,
+            'unchanged': unchanged,
+        })
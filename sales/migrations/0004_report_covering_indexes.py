@@ -0,0 +1,55 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_delete_customerpriceoverride'),
+        ('inventory', '0001_initial'),
+        ('sales', '0003_sale_credit_system'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='sale',
+            name='sales_sale_sale_da_958b5b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='sale',
+            name='sales_sale_custome_f0dcab_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='saleitem',
+            name='sales_salei_sale_id_92a698_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='creditpayment',
+            new_name='sales_credi_custome_a735b0_idx',
+            old_name='sales_credi_custome_a1b2c3_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='sale',
+            new_name='sales_sale_payment_f41ab8_idx',
+            old_name='sales_sale_payment_8e3f4a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='creditpayment',
+            index=models.Index(fields=['payment_date'], include=('customer', 'amount_paid'), name='sales_credit_date_cov_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['sale_datetime', 'sale_type'], include=('total_amount',), name='sales_sale_dt_type_cov_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['customer', 'sale_datetime'], include=('total_amount', 'amount_paid'), name='sales_sale_cust_dt_cov_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='saleitem',
+            index=models.Index(fields=['sale', 'egg_type'], include=('quantity', 'line_total'), name='sales_item_sale_egg_cov_idx'),
+        ),
+    ]
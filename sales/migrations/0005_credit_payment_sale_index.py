@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_delete_customerpriceoverride'),
+        ('sales', '0004_report_covering_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='creditpayment',
+            index=models.Index(fields=['sale', 'payment_date'], include=('amount_paid',), name='sales_credit_sale_cov_idx'),
+        ),
+    ]
@@ -1,9 +1,52 @@
 from django.db import models
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 
 
+def local_date_bounds(start_date, end_date=None):
+    """
+    Convert an inclusive range of local (TIME_ZONE) dates into half-open
+    aware datetime bounds: [start 00:00, day-after-end 00:00).
+
+    Filtering with these bounds keeps the datetime column bare in the
+    WHERE clause, so its index can be used (unlike ``__date`` lookups).
+    """
+    if end_date is None:
+        end_date = start_date
+    tz = timezone.get_current_timezone()
+    lower = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    upper = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+    return lower, upper
+
+
+class LocalDateQuerySet(models.QuerySet):
+    """QuerySet with local-date range filters on the model's datetime field."""
+    date_field = None
+
+    def in_local_dates(self, start_date, end_date=None):
+        """Rows whose datetime falls on a local date in [start_date, end_date]."""
+        lower, upper = local_date_bounds(start_date, end_date)
+        return self.filter(**{
+            f'{self.date_field}__gte': lower,
+            f'{self.date_field}__lt': upper,
+        })
+
+    def up_to_local_date(self, end_date):
+        """Rows whose datetime falls on or before the local end_date."""
+        _, upper = local_date_bounds(end_date)
+        return self.filter(**{f'{self.date_field}__lt': upper})
+
+
+class SaleQuerySet(LocalDateQuerySet):
+    date_field = 'sale_datetime'
+
+
+class CreditPaymentQuerySet(LocalDateQuerySet):
+    date_field = 'payment_date'
+
+
 class Sale(models.Model):
     """
     Record of egg sales (retail or wholesale).
@@ -43,14 +86,26 @@ class Sale(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SaleQuerySet.as_manager()
+
     class Meta:
         ordering = ['-sale_datetime']
         verbose_name = 'Sale'
         verbose_name_plural = 'Sales'
         indexes = [
-            models.Index(fields=['sale_datetime']),
+            # Date-range reports: revenue totals split by sale_type.
+            models.Index(
+                fields=['sale_datetime', 'sale_type'],
+                include=['total_amount'],
+                name='sales_sale_dt_type_cov_idx',
+            ),
+            # Per-customer balances and in-range customer history.
+            models.Index(
+                fields=['customer', 'sale_datetime'],
+                include=['total_amount', 'amount_paid'],
+                name='sales_sale_cust_dt_cov_idx',
+            ),
             models.Index(fields=['sale_type']),
-            models.Index(fields=['customer']),
             models.Index(fields=['payment_status']),
         ]
 
@@ -152,7 +207,12 @@ class SaleItem(models.Model):
         verbose_name = 'Sale Item'
         verbose_name_plural = 'Sale Items'
         indexes = [
-            models.Index(fields=['sale', 'egg_type']),
+            # Crate and revenue breakdowns per egg type for a set of sales.
+            models.Index(
+                fields=['sale', 'egg_type'],
+                include=['quantity', 'line_total'],
+                name='sales_item_sale_egg_cov_idx',
+            ),
         ]
 
     def __str__(self):
@@ -215,12 +275,26 @@ class CreditPayment(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CreditPaymentQuerySet.as_manager()
+
     class Meta:
         ordering = ['-payment_date']
         verbose_name = 'Credit Payment'
         verbose_name_plural = 'Credit Payments'
         indexes = [
             models.Index(fields=['customer', '-payment_date']),
+            # In-range credit payments for the customer report.
+            models.Index(
+                fields=['payment_date'],
+                include=['customer', 'amount_paid'],
+                name='sales_credit_date_cov_idx',
+            ),
+            # Credit tied to each sale, for the receivables aging report.
+            models.Index(
+                fields=['sale', 'payment_date'],
+                include=['amount_paid'],
+                name='sales_credit_sale_cov_idx',
+            ),
         ]
 
     def __str__(self):
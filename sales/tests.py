@@ -1,3 +1,47 @@
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import Sale, local_date_bounds
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class LocalDateBoundsTests(TestCase):
+
+    def test_bounds_are_local_midnights(self):
+        lower, upper = local_date_bounds(date(2026, 3, 1), date(2026, 3, 31))
+        self.assertEqual((lower, upper), (utc(2026, 3, 1), utc(2026, 4, 1)))
+        self.assertEqual(local_date_bounds(date(2026, 3, 1)), (utc(2026, 3, 1), utc(2026, 3, 2)))
+
+    def test_bounds_follow_dst_changes(self):
+        with timezone.override('Europe/London'):
+            lower, upper = local_date_bounds(date(2026, 3, 29))
+            self.assertEqual((lower, upper), (utc(2026, 3, 29), utc(2026, 3, 29, 23)))
+            lower, upper = local_date_bounds(date(2026, 10, 25))
+            self.assertEqual((lower, upper), (utc(2026, 10, 24, 23), utc(2026, 10, 26)))
 
-# Create your tests here.
+    def test_filters_match_local_dates(self):
+        moments = [utc(2026, 3, 28, 23, 30), utc(2026, 3, 29, 22, 59), utc(2026, 3, 29, 23, 0),
+                   utc(2026, 10, 24, 22, 59), utc(2026, 10, 25, 23, 59)]
+        Sale.objects.bulk_create([
+            Sale(sale_type='retail', sale_datetime=moment, total_amount=Decimal('1.00')) for moment in moments
+        ])
+        with timezone.override('Europe/London'):
+            for day in (date(2026, 3, 28), date(2026, 3, 29), date(2026, 3, 30),
+                        date(2026, 10, 24), date(2026, 10, 25)):
+                with self.subTest(day=day):
+                    self.assertQuerySetEqual(
+                        Sale.objects.in_local_dates(day).order_by('pk'),
+                        Sale.objects.filter(sale_datetime__date=day).order_by('pk'),
+                    )
+                    self.assertQuerySetEqual(
+                        Sale.objects.up_to_local_date(day).order_by('pk'),
+                        Sale.objects.filter(sale_datetime__date__lte=day).order_by('pk'),
+                    )
+            self.assertEqual(Sale.objects.in_local_dates(date(2026, 3, 29)).count(), 1)
+            self.assertEqual(Sale.objects.in_local_dates(date(2026, 10, 25)).count(), 1)
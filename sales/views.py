@@ -3,14 +3,16 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Sum, Count, Q
-from datetime import date
+from django.utils import timezone
 from decimal import Decimal
 
 from .models import Sale, CreditPayment
 from .serializers import SaleSerializer, CreditPaymentSerializer
+from core.db_router import ReplicaReadMixin
+from core.streaming import StreamingListMixin
 
 
-class SaleViewSet(viewsets.ModelViewSet):
+class SaleViewSet(ReplicaReadMixin, StreamingListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing sales (retail and wholesale).
     Total amount is auto-calculated on save.
@@ -37,8 +39,8 @@ class SaleViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='daily-summary')
     def daily_summary(self, request):
-        today = date.today()
-        sales_today = Sale.objects.filter(sale_datetime__date=today)
+        today = timezone.localdate()
+        sales_today = Sale.objects.in_local_dates(today)
 
         summary_data = sales_today.aggregate(
             total_sales=Count('id'),
@@ -98,7 +100,7 @@ class SaleViewSet(viewsets.ModelViewSet):
         })
 
 
-class CreditPaymentViewSet(viewsets.ModelViewSet):
+class CreditPaymentViewSet(ReplicaReadMixin, StreamingListMixin, viewsets.ModelViewSet):
     """
     ViewSet for recording and listing credit payments.
     POST to record a payment, GET to list all / filter by customer.
@@ -3,11 +3,23 @@
 # Exit on error
 set -e
 
-# Run database migrations
-python manage.py migrate --noinput
+# FAST_BOOT (the default) cuts cold-start time: migrate and collectstatic
+# only run when migrations or static files changed (manage.py fast_boot),
+# and gunicorn loads and warms the app once before forking its workers
+# (--preload; hooks in config/gunicorn.conf.py). Measure with
+# `manage.py profile_startup --first-response`.
+FAST_BOOT="${FAST_BOOT:-True}"
+GUNICORN_ARGS=""
+if [ "$FAST_BOOT" = "True" ]; then
+    python manage.py fast_boot
+    GUNICORN_ARGS="-c config/gunicorn.conf.py --preload"
+else
+    # Run database migrations
+    python manage.py migrate --noinput
 
-# Collect static files (for Whitenoise)
-python manage.py collectstatic --noinput --clear
+    # Collect static files (for Whitenoise)
+    python manage.py collectstatic --noinput --clear
+fi
 
 # Create superuser ONLY if CREATE_SUPERUSER=1 is set in Render env vars
 if [ "$CREATE_SUPERUSER" = "1" ]; then
@@ -23,5 +35,17 @@ else:
 EOF
 fi
 
-# Start Gunicorn (production server)
-exec gunicorn config.wsgi:application --bind 0.0.0.0:$PORT --workers 3 --threads 2 --timeout 60
\ No newline at end of file
+# Start Gunicorn (production server).
+# SERVER_MODE=asgi serves config.asgi with uvicorn workers instead: requests
+# are no longer capped at workers x threads, each runs on its own thread, so
+# persistent DB connections are disabled (see CONN_MAX_AGE in settings); on
+# PostgreSQL connections come from the per-worker pool either way (DB_POOL).
+# Streamed bodies (?stream=1, bulk exports) are sent chunk by chunk there
+# too: core.middleware.AsyncStreamingMiddleware produces each chunk on the
+# request's sync thread, which stays busy until the body is finished.
+if [ "$SERVER_MODE" = "asgi" ]; then
+    export CONN_MAX_AGE="${CONN_MAX_AGE:-0}"
+    exec gunicorn config.asgi:application $GUNICORN_ARGS --bind 0.0.0.0:$PORT --workers 3 \
+        --worker-class uvicorn_worker.UvicornWorker --timeout 60
+fi
+exec gunicorn config.wsgi:application $GUNICORN_ARGS --bind 0.0.0.0:$PORT --workers 3 --threads 2 --timeout 60
\ No newline at end of file